@@ -8,45 +8,53 @@ materials, and exports the finished globe to assets/3d/globe_interactive.glb.
 Run from Blender's Python environment, e.g.
 
   bpy.ops.script.python_file_run(filepath="scripts/build_globe.py")
+
+or from the command line, where --no-normals leaves normals out of the GLB so
+the shader derives them from the position (they are just the normalised
+position on a sphere):
+
+  blender --background --python scripts/build_globe.py -- --50m --no-normals
+
+Pass --iso followed by ISO codes to rebuild only those countries in the
+current scene; only their records are read from the shapefile. The scene
+must already hold the full globe (open a .blend with GLOBE_Countries and its
+GEO-* children), otherwise the export would replace globe_interactive.glb
+with just those countries, so --iso is refused on an empty scene.
+
+pyshp and mapbox_earcut are not installed on the fly; lay out the pinned
+wheels for Blender's interpreter once (no network needed once the wheels
+are cached, see globe_deps.py):
+
+  blender --background --python scripts/globe_deps.py -- install
 """
 
 from __future__ import annotations
 
-import math
 import os
 import pathlib
+import sys
 import tempfile
-import urllib.request
-import zipfile
-import io
+import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
-import bpy
+SCRIPT_STARTED = time.perf_counter()
 
+import bpy  # noqa: E402
 
-def ensure_packages() -> None:
-  """Install shapefile/numpy/mapbox-earcut inside Blender if missing."""
-
-  def pip_install(*packages: str) -> None:
-    import subprocess
-    import sys
-
-    subprocess.check_call([sys.executable, "-m", "pip", "install", *packages])
-
-  try:
-    import shapefile  # type: ignore
-    import numpy  # type: ignore
-    import mapbox_earcut  # type: ignore
-  except ImportError:
-    pip_install("pyshp", "numpy", "mapbox-earcut")
-
+# Blender does not put the script's directory on sys.path.
+if "__file__" in globals():
+  sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
 
-ensure_packages()
+import globe_deps  # noqa: E402
 
-import numpy as np  # type: ignore  # noqa: E402
-import shapefile  # type: ignore  # noqa: E402
-import mapbox_earcut as earcut  # type: ignore  # noqa: E402
+# pyshp and mapbox_earcut come from the vendored site (see globe_deps.py), numpy from Blender.
+# None of them runs until first use, so download_dataset alone never loads them.
+globe_deps.activate()
+np = globe_deps.lazy_import("numpy")
+shapefile = globe_deps.lazy_import("shapefile")
+earcut = globe_deps.lazy_import("mapbox_earcut")
+STARTUP_MS = (time.perf_counter() - SCRIPT_STARTED) * 1000
 
 
 DATASETS = {
@@ -73,6 +81,10 @@ def download_dataset(resolution: str = "110m") -> pathlib.Path:
   if shapefile_path.exists():
     return shapefile_path
 
+  import io
+  import urllib.request
+  import zipfile
+
   cache_root.mkdir(parents=True, exist_ok=True)
   url = DATASETS[resolution]
   print(f"Downloading Natural Earth {resolution} dataset…")
@@ -134,16 +146,37 @@ def classify_rings(rings: List[Ring]) -> None:
       assign(ring, 0)
 
 
-def project_to_sphere(lon: float, lat: float, radius: float) -> Tuple[float, float, float]:
-  lon_rad = math.radians(lon)
-  lat_rad = math.radians(lat)
-  x = radius * math.cos(lat_rad) * math.cos(lon_rad)
-  y = radius * math.cos(lat_rad) * math.sin(lon_rad)
-  z = radius * math.sin(lat_rad)
-  return x, y, z
+def project_array_to_sphere(lonlat: np.ndarray, radius: float) -> np.ndarray:
+  lon_rad = np.radians(lonlat[:, 0])
+  lat_rad = np.radians(lonlat[:, 1])
+  cos_lat = np.cos(lat_rad)
+  return radius * np.column_stack([cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)])
+
+
+def orient_faces_outward(verts: np.ndarray, faces: np.ndarray) -> np.ndarray:
+  """Flip triangles wound clockwise seen from outside (negative triple product a . (b x c))."""
+  a, b, c = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+  inward = np.einsum("ij,ij->i", a, np.cross(b, c)) < 0
+  oriented = faces.copy()
+  oriented[inward] = faces[inward][:, [0, 2, 1]]
+  return oriented
+
+
+def assign_sphere_normals(mesh: bpy.types.Mesh) -> None:
+  """Smooth-shade and set custom split normals to the normalised vertex positions."""
+  coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+  mesh.vertices.foreach_get("co", coords)
+  coords = coords.reshape(-1, 3)
+  normals = coords / np.linalg.norm(coords, axis=1, keepdims=True)
+  mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+  if hasattr(mesh, "use_auto_smooth"):
+    mesh.use_auto_smooth = True  # Blender < 4.1 ignores custom normals without it
+  mesh.normals_split_custom_set_from_vertices(normals)
 
 
-def ensure_scene_objects() -> Tuple[bpy.types.Object, bpy.types.Object, bpy.types.Material]:
+def ensure_scene_objects(
+  replace_isos: Optional[Set[str]] = None,
+) -> Tuple[bpy.types.Object, bpy.types.Object, bpy.types.Material]:
   scene = bpy.context.scene
   root = bpy.data.objects.get("GLOBE_Root")
   if root is None:
@@ -166,7 +199,9 @@ def ensure_scene_objects() -> Tuple[bpy.types.Object, bpy.types.Object, bpy.type
     countries_parent.parent = root
   else:
     for child in list(countries_parent.children):
-      if child.name.startswith("GEO-"):
+      if not child.name.startswith("GEO-"):
+        continue
+      if replace_isos is None or child.name[len("GEO-"):] in replace_isos:
         bpy.data.objects.remove(child, do_unlink=True)
 
   country_mat = bpy.data.materials.get("MAT_UnvisitedCountry")
@@ -189,27 +224,6 @@ def ensure_scene_objects() -> Tuple[bpy.types.Object, bpy.types.Object, bpy.type
   return root, ocean, countries_parent, country_mat
 
 
-def enforce_normals_and_shading(obj: bpy.types.Object) -> None:
-  if obj.type != "MESH":
-    return
-
-  bpy.ops.object.select_all(action="DESELECT")
-  obj.select_set(True)
-  bpy.context.view_layer.objects.active = obj
-  bpy.ops.object.shade_smooth()
-  entered_edit = False
-  try:
-    bpy.ops.object.mode_set(mode="EDIT")
-    entered_edit = True
-    bpy.ops.mesh.select_all(action="SELECT")
-    bpy.ops.mesh.normals_make_consistent(inside=False)
-  except RuntimeError:
-    pass
-  finally:
-    if entered_edit:
-      bpy.ops.object.mode_set(mode="OBJECT")
-
-
 def build_country_mesh(
   iso_code: str,
   country_name: str,
@@ -241,8 +255,9 @@ def build_country_mesh(
 
   classify_rings(rings)
 
-  verts: List[Tuple[float, float, float]] = []
-  faces: List[Tuple[int, int, int]] = []
+  verts: List[np.ndarray] = []
+  faces: List[np.ndarray] = []
+  vertex_count = 0
   triangle_count = 0
 
   for ring in rings:
@@ -272,34 +287,21 @@ def build_country_mesh(
       print(f"Warning: Earcut produced no triangles for {iso_code}; skipped one polygon")
       continue
 
-    start_index = len(verts)
-    for lon, lat in verts2d:
-      verts.append(project_to_sphere(lon, lat, sphere_radius))
-
-    tris = tri_idx.tolist()
-    for a, b, c in zip(tris[0::3], tris[1::3], tris[2::3]):
-      faces.append((start_index + a, start_index + b, start_index + c))
-    triangle_count += len(tris) // 3
+    verts.append(project_array_to_sphere(verts2d, sphere_radius))
+    faces.append(tri_idx.reshape(-1, 3).astype(np.int64) + vertex_count)
+    vertex_count += len(verts2d)
+    triangle_count += len(tri_idx) // 3
 
   if not faces:
     return 0
 
+  all_verts = np.concatenate(verts)
+  all_faces = orient_faces_outward(all_verts, np.concatenate(faces))
   mesh = bpy.data.meshes.new(f"GEO-{iso_code}_Mesh")
-  mesh.from_pydata(verts, [], faces)
+  mesh.from_pydata(all_verts, [], all_faces)
   mesh.validate(verbose=False)
   mesh.update(calc_edges=True)
-  try:
-    mesh.calc_loop_triangles()
-  except AttributeError:
-    pass
-  try:
-    mesh.calc_normals_split()
-    mesh.normals_split_custom_set(None)
-  except AttributeError:
-    try:
-      mesh.calc_normals()
-    except AttributeError:
-      pass
+  assign_sphere_normals(mesh)
 
   obj = bpy.data.objects.new(f"GEO-{iso_code}", mesh)
   obj["country_code"] = iso_code
@@ -307,23 +309,49 @@ def build_country_mesh(
   obj.parent = parent
   bpy.context.scene.collection.objects.link(obj)
 
-  for poly in mesh.polygons:
-    poly.use_smooth = True
-
   if mesh.materials:
     mesh.materials[0] = country_mat
   else:
     mesh.materials.append(country_mat)
 
-  if hasattr(obj.data, "use_auto_smooth"):
-    obj.data.use_auto_smooth = False
-  enforce_normals_and_shading(obj)
-
   print(f"{iso_code}: {triangle_count} tris")
   return triangle_count
 
 
-def build_globe(use_50m: bool = False) -> None:
+def iter_shape_records(
+  reader: shapefile.Reader,
+  iso_field: str,
+  iso_filter: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[list, shapefile._Shape]]:  # type: ignore
+  if not iso_filter:
+    for shape_rec in reader.iterShapeRecords():
+      yield shape_rec.record, shape_rec.shape
+    return
+  # Scan just the ISO column of the .dbf, then seek to matching shapes via the .shx.
+  wanted = {code.upper() for code in iso_filter}
+  for index, record in enumerate(reader.iterRecords(fields=[iso_field])):
+    if str(record[0]).strip().upper() in wanted:
+      yield reader.record(index), reader.shape(index)
+
+
+def scene_has_countries() -> bool:
+  countries_parent = bpy.data.objects.get("GLOBE_Countries")
+  return countries_parent is not None and any(
+    child.name.startswith("GEO-") for child in countries_parent.children
+  )
+
+
+def build_globe(
+  use_50m: bool = False,
+  export_normals: bool = True,
+  iso_filter: Optional[Sequence[str]] = None,
+) -> None:
+  if iso_filter and not scene_has_countries():
+    raise RuntimeError(
+      "--iso rebuilds countries in an existing globe, but GLOBE_Countries has no GEO-* children; "
+      "open the globe .blend first or run a full build without --iso"
+    )
+
   shapefile_path = download_dataset("50m" if use_50m else "110m")
   reader = shapefile.Reader(str(shapefile_path))
 
@@ -341,22 +369,25 @@ def build_globe(use_50m: bool = False) -> None:
 
   grouped: Dict[str, Dict[str, object]] = {}
   skipped: List[str] = []
-  for shape_rec in reader.iterShapeRecords():
-    iso_code = str(shape_rec.record[iso_idx]).strip()
+  for record, shape in iter_shape_records(reader, field_names[iso_idx], iso_filter):
+    iso_code = str(record[iso_idx]).strip()
     if iso_code in {"", "-99"}:
-      skipped.append(shape_rec.record[name_idx])
+      skipped.append(record[name_idx])
       continue
     bucket = grouped.setdefault(
       iso_code,
-      {"name": shape_rec.record[name_idx], "shapes": []},
+      {"name": record[name_idx], "shapes": []},
     )
-    bucket["shapes"].append(shape_rec.shape)  # type: ignore[arg-type]
+    bucket["shapes"].append(shape)  # type: ignore[arg-type]
 
-  root, ocean, countries_parent, country_mat = ensure_scene_objects()
+  replace_isos = {code.upper() for code in iso_filter} if iso_filter else None
+  root, ocean, countries_parent, country_mat = ensure_scene_objects(replace_isos)
 
   sphere_radius = 10.05
   total_triangles = 0
   critical_countries = {"USA", "BRA", "RUS", "CHN"}
+  if replace_isos is not None:
+    critical_countries &= replace_isos
   critical_stats: Dict[str, int] = {}
   for iso_code, data in grouped.items():
     tris = build_country_mesh(
@@ -394,6 +425,7 @@ def build_globe(use_50m: bool = False) -> None:
     export_format="GLB",
     export_apply=True,
     export_yup=True,
+    export_normals=export_normals,
     use_selection=False,
   )
   size_bytes = export_path.stat().st_size
@@ -403,6 +435,7 @@ def build_globe(use_50m: bool = False) -> None:
     else f"{size_bytes / 1024:.1f} KB"
   )
   print(f"Exported GLB to {export_path} ({size_label})")
+  print(globe_deps.startup_report(STARTUP_MS))
 
 
 def resolve_project_root() -> pathlib.Path:
@@ -438,4 +471,11 @@ def find_repo_root(start: pathlib.Path) -> Optional[pathlib.Path]:
 
 
 if __name__ == "__main__":
-  build_globe(use_50m=False)
+  # Blender passes its own flags first; script arguments follow a bare "--".
+  script_args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+  iso_args = script_args[script_args.index("--iso") + 1:] if "--iso" in script_args else []
+  build_globe(
+    use_50m="--50m" in script_args,
+    export_normals="--no-normals" not in script_args,
+    iso_filter=[arg for arg in iso_args if not arg.startswith("--")] or None,
+  )
@@ -0,0 +1,284 @@
+"""
+Build per-country admin-1 (state/province) mesh bundles.
+
+Natural Earth admin-1 at 10m is roughly 4,500 features, an order of magnitude
+more geometry than the admin-0 globe, so it is never loaded whole. Only the
+attribute table is scanned up front to group subdivisions by parent ADM0_A3;
+each country's features are then read on their own with an attribute filter,
+cleaned, triangulated and tessellated with the same stages as
+build_globe_meshes.py, written out and dropped before the next country. Peak
+memory is one country (per worker), and countries can be spread over worker
+processes with --workers.
+
+Each country becomes assets/3d/admin1/<ISO>.glb with one node per
+subdivision (extras: subdivision code, name, parent ISO, area), sized for the
+app to fetch lazily when the user zooms into or selects that country. An
+index.json lists every bundle with its subdivisions and size.
+"""
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+
+from build_globe_meshes import (
+    BASE_DIR,
+    DEFAULT_CHORD_TOLERANCE,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SNAPSHOT_DIR,
+    LakesIndex,
+    add_pipeline_input_arguments,
+    build_centroid_lookup,
+    build_enclave_host_map,
+    load_prepared_lakes,
+    make_valid_geometry,
+    prepare_country_geometry,
+    tessellate_spherical_mesh,
+    triangulate_geometry,
+)
+from globe_adjacency import derive_enclave_pairs
+from globe_glb import GlbBuilder, to_gltf_yup
+
+ADMIN1_SHAPEFILE = Path('/Users/joe/Desktop/ne_admin1_10m/ne_10m_admin_1_states_provinces.shp')
+ADMIN1_OUTPUT_DIR = BASE_DIR / 'assets/3d/admin1'
+ADMIN1_INDEX = 'index.json'
+ADMIN1_VERSION = 1
+DEFAULT_ADMIN1_SIMPLIFY_TOLERANCE = DEFAULT_SIMPLIFY_TOLERANCE / 2  # subdivisions are seen zoomed in
+PARENT_COLUMNS = ('adm0_a3', 'ADM0_A3')
+CODE_COLUMNS = ('iso_3166_2', 'adm1_code', 'ISO_3166_2', 'ADM1_CODE')
+NAME_COLUMNS = ('name', 'NAME', 'name_en')
+
+# Set per worker process by init_worker so the lakes index is built once per process.
+_WORKER_LAKES: Optional[LakesIndex] = None
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def pick_column(columns: Sequence[str], candidates: Sequence[str], what: str) -> str:
+    column = next((col for col in candidates if col in columns), None)
+    if column is None:
+        raise ValueError(f'Could not find a {what} column in the admin-1 shapefile')
+    return column
+
+
+def scan_admin1_index(path: Path) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """Feature counts per parent ISO and the column names, from the .dbf alone."""
+    columns = list(gpd.read_file(path, rows=1, ignore_geometry=True).columns)
+    names = {
+        'parent': pick_column(columns, PARENT_COLUMNS, 'parent ISO'),
+        'code': pick_column(columns, CODE_COLUMNS, 'subdivision code'),
+        'name': pick_column(columns, NAME_COLUMNS, 'name'),
+    }
+    parents = gpd.read_file(path, ignore_geometry=True, columns=[names['parent']])[names['parent']]
+    counts = parents[parents != '-99'].value_counts().sort_index()
+    return {str(iso): int(count) for iso, count in counts.items()}, names
+
+
+def read_country_subdivisions(path: Path, parent_iso: str, columns: Dict[str, str]) -> gpd.GeoDataFrame:
+    gdf = gpd.read_file(path, where=f""""{columns['parent']}" = '{parent_iso.replace("'", "''")}'""")
+    # Some subdivisions have no ISO 3166-2 code; fall back to adm1_code when present.
+    codes = gdf[columns['code']].astype(str)
+    if 'adm1_code' in gdf.columns:
+        codes = codes.where(~codes.isin(['-99', '', 'None']), gdf['adm1_code'].astype(str))
+    gdf = gdf.assign(subdivision_code=codes)
+    dissolved = gdf.dissolve(by='subdivision_code', aggfunc='first').reset_index()
+    dissolved['geometry'] = dissolved['geometry'].apply(make_valid_geometry)
+    return dissolved
+
+
+def init_worker(lakes_shapefile: Optional[Path], snapshot_dir: Optional[Path]) -> None:
+    global _WORKER_LAKES
+    _WORKER_LAKES = load_prepared_lakes(lakes_shapefile, snapshot_dir)
+
+
+def build_country_bundle(
+    parent_iso: str,
+    admin1_path: Path,
+    columns: Dict[str, str],
+    output_dir: Path,
+    simplify_tolerance: float,
+    chord_tolerance: float,
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    gdf = read_country_subdivisions(admin1_path, parent_iso, columns)
+    codes = gdf['subdivision_code'].tolist()
+    centroid_lookup = build_centroid_lookup(gdf, 'subdivision_code')
+    # Enclaved subdivisions (Berlin in Brandenburg, the ACT in New South Wales) keep their holes.
+    enclave_host_map = build_enclave_host_map(
+        derive_enclave_pairs(codes, np.asarray(gdf.geometry, dtype=object), centroid_lookup)
+    )
+
+    builder = GlbBuilder()
+    children: List[int] = []
+    skipped: List[str] = []
+    vertices = faces = 0
+    for row in gdf.itertuples(index=False):
+        code = row.subdivision_code
+        cleaned, diag = prepare_country_geometry(
+            iso=code,
+            geom=row.geometry,
+            centroid_lookup=centroid_lookup,
+            enclave_host_map=enclave_host_map,
+            simplify_tolerance=simplify_tolerance,
+            lakes_index=_WORKER_LAKES,
+        )
+        mesh = None if cleaned.is_empty else triangulate_geometry(cleaned, iso=code)
+        if mesh is None:
+            skipped.append(code)
+            continue
+        mesh = tessellate_spherical_mesh(mesh, chord_tolerance)
+        positions = to_gltf_yup(mesh.positions)
+        normals = positions / np.linalg.norm(positions, axis=1, keepdims=True)
+        primitive = builder.add_primitive(positions, mesh.indices, normals=normals)
+        mesh_idx = builder.add_mesh(f'Mesh_{code}', [primitive])
+        children.append(builder.add_node(
+            f'ADM1-{code}',
+            mesh=mesh_idx,
+            root=False,
+            extras={
+                'subdivision_code': code,
+                'subdivision_name': getattr(row, columns['name']),
+                'country_code': parent_iso,
+                'area_km2': round(diag['final_area_km2'], 1),
+            },
+        ))
+        vertices += mesh.vertex_count
+        faces += mesh.face_count
+
+    stats: Dict[str, Any] = {
+        'iso': parent_iso,
+        'subdivisions': [code for code in codes if code not in skipped],
+        'skipped': skipped,
+        'vertices': vertices,
+        'faces': faces,
+        'bytes': 0,
+    }
+    if children:
+        builder.add_node(f'ADM1_{parent_iso}', children=children, extras={'country_code': parent_iso})
+        path = output_dir / f'{parent_iso}.glb'
+        stats['bytes'] = builder.write(path)
+        stats['file'] = path.name
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def build_admin1_data(
+    admin1_path: Path = ADMIN1_SHAPEFILE,
+    output_dir: Path = ADMIN1_OUTPUT_DIR,
+    iso_filter: Optional[Sequence[str]] = None,
+    simplify_tolerance: float = DEFAULT_ADMIN1_SIMPLIFY_TOLERANCE,
+    chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+    workers: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    counts, columns = scan_admin1_index(admin1_path)
+    parents = sorted(counts)
+    if iso_filter:
+        wanted = {code.upper() for code in iso_filter}
+        parents = [iso for iso in parents if iso in wanted]
+    logging.info(
+        'Admin-1: %d subdivisions across %d countries to build',
+        sum(counts[iso] for iso in parents),
+        len(parents),
+    )
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Largest countries first so one slow country does not trail at the end of a parallel run.
+    parents.sort(key=lambda iso: -counts[iso])
+    args = (admin1_path, columns, output_dir, simplify_tolerance, chord_tolerance)
+    results: Dict[str, Dict[str, Any]] = {}
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker,
+            initargs=(lakes_shapefile, snapshot_dir),
+        ) as pool:
+            futures = {iso: pool.submit(build_country_bundle, iso, *args) for iso in parents}
+            for iso, future in futures.items():
+                results[iso] = future.result()
+                logging.info('%s: %d subdivisions, %.1f KB', iso, len(results[iso]['subdivisions']),
+                             results[iso]['bytes'] / 1024)
+    else:
+        init_worker(lakes_shapefile, snapshot_dir)
+        for iso in parents:
+            results[iso] = build_country_bundle(iso, *args)
+            logging.info('%s: %d subdivisions, %.1f KB', iso, len(results[iso]['subdivisions']),
+                         results[iso]['bytes'] / 1024)
+
+    index_path = output_dir / ADMIN1_INDEX
+    index: Dict[str, Any] = {'version': ADMIN1_VERSION, 'countries': {}}
+    if iso_filter and index_path.exists():
+        with index_path.open() as f:
+            index = json.load(f)
+    for iso, stats in sorted(results.items()):
+        if 'file' in stats:
+            index['countries'][iso] = {
+                'file': stats['file'],
+                'bytes': stats['bytes'],
+                'subdivisions': stats['subdivisions'],
+            }
+        for code in stats['skipped']:
+            logging.warning('%s: skipped subdivision %s (empty after cleaning or triangulation failed)', iso, code)
+    with index_path.open('w') as f:
+        json.dump(index, f, indent=2)
+    logging.info(
+        'Wrote %d admin-1 bundles (%.1f MB) and %s',
+        sum(1 for stats in results.values() if 'file' in stats),
+        sum(stats['bytes'] for stats in results.values()) / (1024 * 1024),
+        index_path,
+    )
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build lazily loadable admin-1 mesh bundles per country.')
+    # Subdivisions come from --admin1-shapefile; the admin-0 countries are never read.
+    add_pipeline_input_arguments(
+        parser, countries=False, enclaves=False, simplify_tolerance=DEFAULT_ADMIN1_SIMPLIFY_TOLERANCE
+    )
+    parser.add_argument(
+        '--admin1-shapefile',
+        type=Path,
+        default=ADMIN1_SHAPEFILE,
+        help='Natural Earth admin-1 states/provinces shapefile (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        default=ADMIN1_OUTPUT_DIR,
+        help='Directory for per-country GLBs and index.json (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--iso',
+        nargs='*',
+        help='Optional parent ADM0_A3 codes to limit processing; other index entries are kept.',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes; each holds one country at a time (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_admin1_data(
+        admin1_path=args.admin1_shapefile,
+        output_dir=args.output_dir,
+        iso_filter=args.iso,
+        simplify_tolerance=args.simplify_tolerance,
+        chord_tolerance=args.chord_tolerance,
+        lakes_shapefile=args.lakes_shapefile,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+        workers=args.workers,
+    )
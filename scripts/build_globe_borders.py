@@ -0,0 +1,326 @@
+"""
+Extract deduplicated country border lines as a single indexed line buffer.
+
+Borders are read from the hole-filtered, make-valid'd country geometry before
+per-country simplification, so a border shared by two countries has identical
+vertices on both sides and is emitted exactly once. Each unique arc is then
+simplified to the mesh tolerance, densified where its chords would sag below
+the sphere, lifted slightly above COUNTRY_RADIUS and written to a GLB with one
+LINES primitive (one draw call). Per-segment country pairs are stored in an
+extra accessor referenced from the mesh extras.
+"""
+
+import argparse
+import logging
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from shapely.geometry import LineString
+from shapely.geometry.base import BaseGeometry
+
+from build_globe_meshes import (
+    BASE_DIR,
+    COUNTRY_RADIUS,
+    DEFAULT_CHORD_TOLERANCE,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SNAPSHOT_DIR,
+    PipelineInputs,
+    add_pipeline_input_arguments,
+    cleaned_border_geometries,
+    load_pipeline_inputs,
+    normalize_ring,
+)
+from globe_glb import MODE_LINES, GlbBuilder, to_gltf_yup
+
+BORDERS_OUTPUT = BASE_DIR / 'assets/3d/globe_borders.glb'
+BORDER_LIFT = 0.01  # world units above COUNTRY_RADIUS to avoid z-fighting with country fills
+COAST_ID = 0xFFFF  # pair partner for outlines that border no other country
+COORD_PRECISION = 7  # decimal degrees used to match shared vertices
+
+Point = Tuple[float, float]
+SegmentKey = Tuple[Point, Point]
+CountryPair = Tuple[str, Optional[str]]
+
+
+def iter_rings(geom: BaseGeometry):
+    if geom.is_empty:
+        return
+    polygons = [geom] if geom.geom_type == 'Polygon' else getattr(geom, 'geoms', [])
+    for poly in polygons:
+        if poly.geom_type != 'Polygon' or poly.is_empty:
+            continue
+        yield poly.exterior.coords
+        for interior in poly.interiors:
+            yield interior.coords
+
+
+def is_artificial_edge(p: Point, q: Point) -> bool:
+    """Edges along the antimeridian or a pole are cuts in the data, not borders."""
+    if abs(p[0]) == 180.0 and p[0] == q[0]:
+        return True
+    return abs(p[1]) == 90.0 and p[1] == q[1]
+
+
+def collect_border_segments(geometries: Dict[str, BaseGeometry]) -> Tuple[Dict[SegmentKey, Set[str]], int]:
+    """Map every undirected outline segment to the countries that own it.
+
+    Also returns the number of segments a naive per-country outline would draw.
+    """
+    owners: Dict[SegmentKey, Set[str]] = defaultdict(set)
+    naive_segments = 0
+    for iso, geom in geometries.items():
+        for coords in iter_rings(geom):
+            ring = [
+                (round(lon, COORD_PRECISION), round(lat, COORD_PRECISION))
+                for lon, lat in normalize_ring(coords)
+            ]
+            for i, p in enumerate(ring):
+                q = ring[(i + 1) % len(ring)]
+                if p == q or is_artificial_edge(p, q):
+                    continue
+                naive_segments += 1
+                owners[(p, q) if p < q else (q, p)].add(iso)
+    return owners, naive_segments
+
+
+def group_by_pair(owners: Dict[SegmentKey, Set[str]]) -> Dict[CountryPair, List[SegmentKey]]:
+    groups: Dict[CountryPair, List[SegmentKey]] = defaultdict(list)
+    for key, isos in owners.items():
+        ordered = sorted(isos)
+        if len(ordered) > 2:
+            logging.warning('Segment %s shared by %s; keeping the first two', key, ', '.join(ordered))
+        pair: CountryPair = (ordered[0], ordered[1] if len(ordered) > 1 else None)
+        groups[pair].append(key)
+    return groups
+
+
+def chain_arcs(segments: Sequence[SegmentKey]) -> List[List[Point]]:
+    """Join segments into maximal polylines, breaking at junctions and ends."""
+    adjacency: Dict[Point, List[Point]] = defaultdict(list)
+    for p, q in segments:
+        adjacency[p].append(q)
+        adjacency[q].append(p)
+
+    visited: Set[SegmentKey] = set()
+
+    def walk(start: Point, nxt: Point) -> List[Point]:
+        arc = [start]
+        prev, current = start, nxt
+        while True:
+            visited.add((prev, current) if prev < current else (current, prev))
+            arc.append(current)
+            if len(adjacency[current]) != 2 or current == start:
+                return arc
+            candidates = [
+                pt for pt in adjacency[current]
+                if ((current, pt) if current < pt else (pt, current)) not in visited
+            ]
+            if not candidates:
+                return arc
+            prev, current = current, candidates[0]
+
+    arcs: List[List[Point]] = []
+    for node in sorted(adjacency):
+        if len(adjacency[node]) == 2:
+            continue
+        for nxt in adjacency[node]:
+            if ((node, nxt) if node < nxt else (nxt, node)) not in visited:
+                arcs.append(walk(node, nxt))
+    # Whatever is left forms closed loops (islands, enclaves) with no junctions.
+    for p, q in sorted(segments):
+        if (p, q) not in visited:
+            arcs.append(walk(p, q))
+    return arcs
+
+
+def simplify_arc(arc: List[Point], tolerance: float) -> List[Point]:
+    if tolerance <= 0 or len(arc) < 3:
+        return arc
+    simplified = list(LineString(arc).simplify(tolerance, preserve_topology=False).coords)
+    closed = arc[0] == arc[-1]
+    if closed and len(simplified) < 4:
+        return arc
+    return [(float(lon), float(lat)) for lon, lat in simplified]
+
+
+def project_lonlat(points: np.ndarray, radius: float) -> np.ndarray:
+    lon = np.radians(points[:, 0])
+    lat = np.radians(points[:, 1])
+    return np.column_stack([
+        radius * np.cos(lat) * np.cos(lon),
+        radius * np.cos(lat) * np.sin(lon),
+        radius * np.sin(lat),
+    ])
+
+
+def densify_on_sphere(a: np.ndarray, b: np.ndarray, radius: float, chord_tolerance: float) -> List[np.ndarray]:
+    """Points strictly between a and b so no sub-chord sags deeper than chord_tolerance."""
+    if chord_tolerance <= 0:
+        return []
+    angle = math.acos(max(-1.0, min(1.0, float(np.dot(a, b)) / (radius * radius))))
+    max_step = 2.0 * math.acos(max(-1.0, 1.0 - chord_tolerance / radius))
+    steps = int(math.ceil(angle / max_step)) if max_step > 0 else 1
+    if steps <= 1:
+        return []
+    sin_angle = math.sin(angle)
+    points = []
+    for k in range(1, steps):
+        t = k / steps
+        points.append((math.sin((1 - t) * angle) * a + math.sin(t * angle) * b) / sin_angle)
+    return points
+
+
+def build_line_buffer(
+    arcs_by_pair: Dict[CountryPair, List[List[Point]]],
+    country_ids: Dict[str, int],
+    radius: float,
+    chord_tolerance: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (positions, line indices, per-segment country pairs)."""
+    positions: List[np.ndarray] = []
+    endpoint_index: Dict[Point, int] = {}
+    lines: List[Tuple[int, int]] = []
+    pairs: List[Tuple[int, int]] = []
+
+    def add_vertex(xyz: np.ndarray) -> int:
+        positions.append(xyz)
+        return len(positions) - 1
+
+    for (iso_a, iso_b), arcs in sorted(arcs_by_pair.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        pair_ids = (country_ids[iso_a], country_ids[iso_b] if iso_b else COAST_ID)
+        for arc in arcs:
+            xyz = project_lonlat(np.asarray(arc, dtype=np.float64), radius)
+            indices: List[int] = []
+            for i, point in enumerate(arc):
+                is_endpoint = i == 0 or i == len(arc) - 1
+                if is_endpoint and point in endpoint_index:
+                    index = endpoint_index[point]
+                else:
+                    index = add_vertex(xyz[i])
+                    if is_endpoint:
+                        endpoint_index[point] = index
+                if indices:
+                    for extra in densify_on_sphere(positions[indices[-1]], positions[index], radius, chord_tolerance):
+                        indices.append(add_vertex(extra))
+                indices.append(index)
+            for start, end in zip(indices[:-1], indices[1:]):
+                lines.append((start, end))
+                pairs.append(pair_ids)
+
+    return (
+        np.asarray(positions, dtype=np.float64).reshape(-1, 3),
+        np.asarray(lines, dtype=np.uint32).reshape(-1, 2),
+        np.asarray(pairs, dtype=np.uint16).reshape(-1, 2),
+    )
+
+
+def build_border_data(
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+    output_path: Optional[Path] = BORDERS_OUTPUT,
+    iso_filter: Optional[Sequence[str]] = None,
+    include_coastlines: bool = True,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    enclaves_config: Optional[Path] = None,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+    inputs: Optional[PipelineInputs] = None,
+) -> Dict[str, object]:
+    inputs = inputs or load_pipeline_inputs(shapefile, lakes_shapefile, enclaves_config, snapshot_dir)
+    iso_filter_set = {code.upper() for code in iso_filter} if iso_filter else None
+    geometries = cleaned_border_geometries(inputs, iso_filter_set)
+
+    owners, naive_segments = collect_border_segments(geometries)
+    groups = group_by_pair(owners)
+    if not include_coastlines:
+        groups = {pair: segs for pair, segs in groups.items() if pair[1] is not None}
+    arcs_by_pair = {
+        pair: [simplify_arc(arc, simplify_tolerance) for arc in chain_arcs(segments)]
+        for pair, segments in groups.items()
+    }
+
+    countries = sorted(geometries)
+    country_ids = {iso: idx for idx, iso in enumerate(countries)}
+    radius = COUNTRY_RADIUS + BORDER_LIFT
+    positions, lines, pairs = build_line_buffer(arcs_by_pair, country_ids, radius, chord_tolerance)
+
+    shared_segments = sum(len(segs) for pair, segs in groups.items() if pair[1] is not None)
+    stats: Dict[str, object] = {
+        'countries': len(countries),
+        'arcs': sum(len(arcs) for arcs in arcs_by_pair.values()),
+        'country_pairs': sum(1 for pair in arcs_by_pair if pair[1] is not None),
+        'naive_segments': naive_segments,
+        'unique_source_segments': sum(len(segs) for segs in groups.values()),
+        'shared_source_segments': shared_segments,
+        'emitted_segments': int(len(lines)),
+        'emitted_vertices': int(len(positions)),
+    }
+    logging.info(
+        'Borders: %d unique of %d outline segments (%d shared borders drawn once), %d line segments after simplification',
+        stats['unique_source_segments'],
+        naive_segments,
+        shared_segments,
+        stats['emitted_segments'],
+    )
+
+    if output_path and len(lines):
+        builder = GlbBuilder()
+        pairs_accessor = builder.add_accessor(pairs)
+        primitive = builder.add_primitive(to_gltf_yup(positions), lines, mode=MODE_LINES)
+        mesh = builder.add_mesh(
+            'GLOBE_Borders',
+            [primitive],
+            extras={
+                'segment_country_pairs_accessor': pairs_accessor,
+                'countries': countries,
+                'coast_id': COAST_ID,
+            },
+        )
+        builder.add_node('GLOBE_Borders', mesh=mesh)
+        size = builder.write(output_path)
+        stats['bytes'] = size
+        logging.info('Wrote %d border segments to %s (%.1f KB)', len(lines), output_path, size / 1024)
+
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build deduplicated country border lines for the globe.')
+    add_pipeline_input_arguments(parser)
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=BORDERS_OUTPUT,
+        help='Output GLB path (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--iso',
+        nargs='*',
+        help='Optional ISO3 codes to limit processing.',
+    )
+    parser.add_argument(
+        '--no-coastlines',
+        action='store_true',
+        help='Only emit borders shared by two countries.',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_border_data(
+        simplify_tolerance=args.simplify_tolerance,
+        chord_tolerance=args.chord_tolerance,
+        output_path=args.output,
+        iso_filter=args.iso,
+        include_coastlines=not args.no_coastlines,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        enclaves_config=args.enclaves_config,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+    )
@@ -0,0 +1,285 @@
+"""
+Split the exported globe GLB into regional chunks for lazy loading.
+
+Countries are grouped by the octant of the sphere (north/south times four
+90° longitude bands) that holds their area-weighted centre, so every chunk is
+spatially coherent; octants holding more than --max-chunk-vertices are halved
+along their longer side until they fit. The ocean goes into a small base chunk
+that is always loaded first. Each chunk is written as its own GLB, keeping the
+GLOBE_Root/GLOBE_Countries hierarchy, node names, extras and materials of the
+source file, so the app can merge chunks into one scene as they arrive.
+
+The manifest lists each chunk's file, ISO membership, size and a bounding cone
+(unit axis in the GLB's Y-up frame plus half-angle) around every vertex in the
+chunk. A chunk can face the camera only when the angle between its axis and
+the view direction is less than half_angle + 90°, so the app can load the
+camera-facing hemisphere first and fetch the rest in the background.
+"""
+
+import argparse
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from globe_glb import MODE_TRIANGLES, GlbBuilder, read_accessor, read_glb
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SOURCE_GLB = BASE_DIR / 'assets/3d/globe_interactive.glb'
+CHUNK_DIR = BASE_DIR / 'assets/3d/chunks'
+MANIFEST_NAME = 'globe_chunks.json'
+BASE_CHUNK = 'base'
+CHUNKS_VERSION = 1
+DEFAULT_MAX_CHUNK_VERTICES = 4000
+
+Cell = Tuple[float, float, float, float]  # south, west, north, east in degrees
+OCTANTS: List[Cell] = [
+    (south, west, south + 90.0, west + 90.0)
+    for south in (-90.0, 0.0)
+    for west in (-180.0, -90.0, 0.0, 90.0)
+]
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def direction_lonlat(direction: np.ndarray) -> Tuple[float, float]:
+    x, y, z = direction / (np.linalg.norm(direction) or 1.0)
+    # glTF Y-up: y is the polar axis and z is minus the Z-up globe's y.
+    return math.degrees(math.atan2(-z, x)), math.degrees(math.asin(max(-1.0, min(1.0, y))))
+
+
+def cell_name(cell: Cell) -> str:
+    """Chunk key from the cell's south-west corner, e.g. 'n00e000' or 's45w090'."""
+    south, west = cell[0], cell[1]
+    return (
+        f"{'n' if south >= 0 else 's'}{abs(int(south)):02d}"
+        f"{'e' if west >= 0 else 'w'}{abs(int(west)):03d}"
+    )
+
+
+def in_cell(lon: float, lat: float, cell: Cell) -> bool:
+    south, west, north, east = cell
+    return (south <= lat < north or (north == 90.0 and lat == 90.0)) and (
+        west <= lon < east or (east == 180.0 and lon == 180.0)
+    )
+
+
+def split_cell(cell: Cell) -> Tuple[Cell, Cell]:
+    south, west, north, east = cell
+    mid_lat = math.radians((south + north) / 2)
+    if (east - west) * math.cos(mid_lat) >= north - south:
+        middle = (west + east) / 2
+        return (south, west, north, middle), (south, middle, north, east)
+    middle = (south + north) / 2
+    return (south, west, middle, east), (middle, west, north, east)
+
+
+def assign_cells(
+    centres: Dict[int, Tuple[float, float]],
+    vertex_counts: Dict[int, int],
+    max_vertices: int,
+) -> Dict[Cell, List[int]]:
+    """Place nodes in octants, halving any cell over max_vertices (single countries never split)."""
+    pending = [(cell, [idx for idx, (lon, lat) in centres.items() if in_cell(lon, lat, cell)]) for cell in OCTANTS]
+    cells: Dict[Cell, List[int]] = {}
+    while pending:
+        cell, members = pending.pop()
+        if not members:
+            continue
+        if sum(vertex_counts[idx] for idx in members) <= max_vertices or len(members) == 1:
+            cells[cell] = members
+            continue
+        for half in split_cell(cell):
+            pending.append((half, [idx for idx in members if in_cell(*centres[idx], half)]))
+    return cells
+
+
+def mesh_geometry(gltf: Dict[str, Any], blob: bytes, mesh: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """All positions of a mesh and the area-weighted sum of its triangle centres."""
+    positions, weights = [], []
+    for primitive in mesh['primitives']:
+        verts = read_accessor(gltf, blob, primitive['attributes']['POSITION']).astype(np.float64)
+        positions.append(verts)
+        if 'indices' in primitive:
+            tris = read_accessor(gltf, blob, primitive['indices']).astype(np.int64).reshape(-1, 3)
+        else:
+            tris = np.arange(len(verts) - len(verts) % 3).reshape(-1, 3)
+        a, b, c = verts[tris[:, 0]], verts[tris[:, 1]], verts[tris[:, 2]]
+        area = np.linalg.norm(np.cross(b - a, c - a), axis=1)[:, None] / 2
+        weights.append(((a + b + c) / 3 * area).sum(axis=0))
+    return np.vstack(positions), np.sum(weights, axis=0)
+
+
+def bounding_cone(positions: np.ndarray, centre: np.ndarray) -> Tuple[List[float], float]:
+    axis = centre / (np.linalg.norm(centre) or 1.0)
+    units = positions / np.linalg.norm(positions, axis=1, keepdims=True)
+    half_angle = float(np.arccos(np.clip(units @ axis, -1.0, 1.0)).max())
+    return [round(float(v), 6) for v in axis], round(half_angle, 6)
+
+
+def copy_primitive(
+    builder: GlbBuilder,
+    gltf: Dict[str, Any],
+    blob: bytes,
+    primitive: Dict[str, Any],
+    material_map: Dict[int, int],
+) -> Dict[str, Any]:
+    attributes = {
+        name: read_accessor(gltf, blob, index)
+        for name, index in primitive['attributes'].items()
+        if name not in ('POSITION', 'NORMAL')
+    }
+    positions = read_accessor(gltf, blob, primitive['attributes']['POSITION'])
+    normals = (
+        read_accessor(gltf, blob, primitive['attributes']['NORMAL'])
+        if 'NORMAL' in primitive['attributes'] else None
+    )
+    if 'indices' in primitive:
+        indices = read_accessor(gltf, blob, primitive['indices'])
+    else:
+        indices = np.arange(len(positions), dtype=np.uint32)
+    material = primitive.get('material')
+    if material is not None and material not in material_map:
+        builder.gltf['materials'].append(gltf['materials'][material])
+        material_map[material] = len(builder.gltf['materials']) - 1
+    return builder.add_primitive(
+        positions,
+        indices,
+        mode=primitive.get('mode', MODE_TRIANGLES),
+        normals=normals,
+        material=None if material is None else material_map[material],
+        attributes=attributes,
+    )
+
+
+def write_chunk(
+    path: Path,
+    gltf: Dict[str, Any],
+    blob: bytes,
+    node_indices: Sequence[int],
+    parent_name: Optional[str],
+) -> int:
+    builder = GlbBuilder(generator=gltf.get('asset', {}).get('generator', 'galligo globe pipeline'))
+    material_map: Dict[int, int] = {}
+    children = []
+    for node_idx in node_indices:
+        node = gltf['nodes'][node_idx]
+        mesh = gltf['meshes'][node['mesh']]
+        primitives = [copy_primitive(builder, gltf, blob, prim, material_map) for prim in mesh['primitives']]
+        mesh_idx = builder.add_mesh(mesh.get('name', node.get('name', '')), primitives, mesh.get('extras'))
+        children.append(builder.add_node(node.get('name', ''), mesh=mesh_idx, extras=node.get('extras'), root=False))
+    if parent_name:
+        children = [builder.add_node(parent_name, children=children, root=False)]
+    builder.add_node('GLOBE_Root', children=children)
+    return builder.write(path)
+
+
+def build_globe_chunks(
+    source: Path = SOURCE_GLB,
+    output_dir: Path = CHUNK_DIR,
+    max_chunk_vertices: int = DEFAULT_MAX_CHUNK_VERTICES,
+) -> Dict[str, Any]:
+    gltf, blob = read_glb(source)
+    names = {node.get('name'): idx for idx, node in enumerate(gltf['nodes'])}
+    countries_parent = gltf['nodes'][names['GLOBE_Countries']] if 'GLOBE_Countries' in names else None
+
+    country_nodes = [
+        idx for idx, node in enumerate(gltf['nodes'])
+        if 'mesh' in node and (node.get('extras') or {}).get('country_code')
+    ]
+    base_nodes = [
+        idx for idx, node in enumerate(gltf['nodes'])
+        if 'mesh' in node and idx not in set(country_nodes)
+    ]
+
+    geometry: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    for idx in country_nodes:
+        geometry[idx] = mesh_geometry(gltf, blob, gltf['meshes'][gltf['nodes'][idx]['mesh']])
+    cells = assign_cells(
+        {idx: direction_lonlat(centre) for idx, (_, centre) in geometry.items()},
+        {idx: len(positions) for idx, (positions, _) in geometry.items()},
+        max_chunk_vertices,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunks: List[Dict[str, Any]] = []
+    base_path = output_dir / f'globe_{BASE_CHUNK}.glb'
+    chunks.append({
+        'name': BASE_CHUNK,
+        'file': base_path.name,
+        'bytes': write_chunk(base_path, gltf, blob, base_nodes, None),
+        'isos': [],
+        'always_load': True,
+    })
+    for cell in sorted(cells):
+        name = cell_name(cell)
+        node_indices = sorted(cells[cell], key=lambda idx: gltf['nodes'][idx]['extras']['country_code'])
+        positions = np.vstack([geometry[idx][0] for idx in node_indices])
+        centre = np.sum([geometry[idx][1] for idx in node_indices], axis=0)
+        axis, half_angle = bounding_cone(positions, centre)
+        path = output_dir / f'globe_{name}.glb'
+        chunks.append({
+            'name': name,
+            'file': path.name,
+            'bytes': write_chunk(
+                path, gltf, blob, node_indices, countries_parent.get('name') if countries_parent else None
+            ),
+            'isos': [gltf['nodes'][idx]['extras']['country_code'] for idx in node_indices],
+            'bounds': {'south': cell[0], 'west': cell[1], 'north': cell[2], 'east': cell[3]},
+            'cone': {'axis': axis, 'half_angle': half_angle},
+        })
+
+    manifest = {
+        'version': CHUNKS_VERSION,
+        'source': source.name,
+        'source_bytes': source.stat().st_size,
+        'up_axis': 'Y',
+        'chunks': chunks,
+    }
+    with (output_dir / MANIFEST_NAME).open('w') as f:
+        json.dump(manifest, f, indent=2)
+    largest = max(chunk['bytes'] for chunk in chunks)
+    logging.info(
+        'Split %s (%.1f KB) into %d chunks; largest %.1f KB, base %.1f KB',
+        source.name,
+        manifest['source_bytes'] / 1024,
+        len(chunks),
+        largest / 1024,
+        chunks[0]['bytes'] / 1024,
+    )
+    return manifest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Split the globe GLB into lazily loadable regional chunks.')
+    parser.add_argument(
+        '--source',
+        type=Path,
+        default=SOURCE_GLB,
+        help='Monolithic globe GLB exported by build_globe_scene.py (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        default=CHUNK_DIR,
+        help='Directory for chunk GLBs and the manifest (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--max-chunk-vertices',
+        type=int,
+        default=DEFAULT_MAX_CHUNK_VERTICES,
+        help='Split regions whose countries exceed this many vertices (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_globe_chunks(
+        source=args.source,
+        output_dir=args.output_dir,
+        max_chunk_vertices=args.max_chunk_vertices,
+    )
@@ -0,0 +1,351 @@
+"""
+Precomputed multi-zoom city marker clusters for the globe.
+
+Populated places (Natural Earth populated_places or our own GeoJSON/CSV
+export) are placed with the same lonlat_to_xyz_array as the country meshes and
+clustered greedily, supercluster-style, from the finest zoom level to the
+coarsest: at zoom z any cluster within RADIUS_DEG / 2**z of arc of a larger
+seed is merged into it, and the merged cluster sits at the count-weighted
+centroid on the sphere. Seeds are taken in descending population so the
+biggest city of a region labels the cluster.
+
+Every level is written to one flat binary of NODE_DTYPE records with per-node
+count, lon/lat bbox (west > east across ±180°), parent link into the coarser
+level and a child range into the finer level's child_order table. Within a
+level nodes are stored in implicit k-d tree order (split on x, y, z in turn,
+median at the middle of each range, KD_NODE_SIZE leaves), so the app answers
+"clusters inside this box" in O(log n + k) without clustering on device. The
+JSON manifest holds byte offsets per level, each level's angular radius (so
+the app can pick the level whose radius matches its marker size at the
+current camera distance) and the place names.
+"""
+
+import argparse
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+
+from build_globe_meshes import BASE_DIR, COUNTRY_RADIUS, lonlat_to_xyz_array
+
+PLACES_SHAPEFILE = Path('/Users/joe/Desktop/ne_admin0_50m/ne_10m_populated_places_simple.shp')
+OUTPUT_BIN = BASE_DIR / 'assets/3d/globe_markers.bin'
+OUTPUT_MANIFEST = BASE_DIR / 'assets/3d/globe_markers.json'
+MARKERS_VERSION = 1
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 8
+DEFAULT_RADIUS_DEG = 16.0  # cluster radius at zoom 0, halved every level
+KD_NODE_SIZE = 16
+NAME_COLUMNS = ('name', 'NAME', 'nameascii', 'city')
+POPULATION_COLUMNS = ('pop_max', 'POP_MAX', 'population', 'pop')
+COUNTRY_COLUMNS = ('adm0_a3', 'ADM0_A3', 'sov_a3', 'iso_a3', 'country_code')
+
+NODE_DTYPE = np.dtype([
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('z', '<f4'),
+    ('lon', '<f4'),
+    ('lat', '<f4'),
+    ('west', '<f4'),
+    ('south', '<f4'),
+    ('east', '<f4'),
+    ('north', '<f4'),
+    ('count', '<u4'),
+    ('population', '<f4'),
+    ('place', '<u4'),  # most populous member, index into the manifest's places
+    ('parent', '<i4'),  # node in the next coarser level, -1 at min_zoom
+    ('child_start', '<u4'),  # range in this level's child_order table
+    ('child_count', '<u4'),
+])
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+class ClusterLevel:
+    """Clusters of one zoom level before k-d ordering; members are leaf place indices."""
+
+    __slots__ = ('unit', 'counts', 'members', 'parents')
+
+    def __init__(self, unit: np.ndarray, counts: np.ndarray, members: List[np.ndarray]) -> None:
+        self.unit = unit
+        self.counts = counts
+        self.members = members
+        self.parents = np.full(len(counts), -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+def pick_column(columns: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    return next((col for col in candidates if col in columns), None)
+
+
+def load_places(path: Path) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """(lonlat, population, place records), most populous first."""
+    gdf = gpd.read_file(path)
+    if gdf.crs is not None and not gdf.crs.equals('EPSG:4326'):
+        gdf = gdf.to_crs('EPSG:4326')
+    gdf = gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty]
+    name_col = pick_column(gdf.columns, NAME_COLUMNS)
+    pop_col = pick_column(gdf.columns, POPULATION_COLUMNS)
+    country_col = pick_column(gdf.columns, COUNTRY_COLUMNS)
+    if name_col is None:
+        raise ValueError(f'No name column in {path}; expected one of {NAME_COLUMNS}')
+
+    population = gdf[pop_col].fillna(0).clip(lower=0).to_numpy(np.float64) if pop_col else np.zeros(len(gdf))
+    order = np.argsort(-population, kind='stable')
+    gdf = gdf.iloc[order]
+    population = population[order]
+    lonlat = np.column_stack([gdf.geometry.x.to_numpy(), gdf.geometry.y.to_numpy()])
+    places = [
+        {
+            'name': str(name),
+            'country_code': str(country) if country_col else None,
+            'population': int(pop),
+        }
+        for name, country, pop in zip(
+            gdf[name_col], gdf[country_col] if country_col else [None] * len(gdf), population
+        )
+    ]
+    return lonlat, population, places
+
+
+def radius_for_zoom(zoom: int, radius_deg: float) -> float:
+    return radius_deg / 2 ** zoom
+
+
+def cluster_level(finer: ClusterLevel, radius_deg: float) -> ClusterLevel:
+    """Greedy merge of finer-level clusters within radius_deg of arc; sets finer.parents."""
+    chord = 2 * math.sin(math.radians(radius_deg) / 2)
+    cells: Dict[Tuple[int, int, int], List[int]] = {}
+    keys = np.floor(finer.unit / chord).astype(np.int64)
+    for idx, key in enumerate(map(tuple, keys)):
+        cells.setdefault(key, []).append(idx)
+    offsets = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+
+    unit, counts, members = [], [], []
+    # Finer clusters are already ordered by their largest member, so seeds go biggest first.
+    for idx in range(len(finer)):
+        if finer.parents[idx] >= 0:
+            continue
+        kx, ky, kz = keys[idx]
+        candidates = np.array(
+            [other for dx, dy, dz in offsets for other in cells.get((kx + dx, ky + dy, kz + dz), ())],
+            dtype=np.int64,
+        )
+        candidates = candidates[finer.parents[candidates] < 0]
+        near = candidates[np.linalg.norm(finer.unit[candidates] - finer.unit[idx], axis=1) <= chord]
+        finer.parents[near] = len(counts)
+        weights = finer.counts[near].astype(np.float64)
+        centre = (finer.unit[near] * weights[:, None]).sum(axis=0)
+        norm = np.linalg.norm(centre)
+        unit.append(centre / norm if norm > 0 else finer.unit[idx])
+        counts.append(int(weights.sum()))
+        members.append(np.concatenate([finer.members[i] for i in sorted(near)]))
+    return ClusterLevel(np.array(unit).reshape(-1, 3), np.array(counts, dtype=np.int64), members)
+
+
+def lon_bounds(lons: np.ndarray) -> Tuple[float, float]:
+    """(west, east) of a point set, wrapping across ±180° when that is narrower."""
+    west, east = float(lons.min()), float(lons.max())
+    if east - west <= 180.0:
+        return west, east
+    shifted = np.where(lons < 0, lons + 360.0, lons)
+    if shifted.max() - shifted.min() >= east - west:
+        return west, east
+    return float(shifted.min()), float(shifted.max()) - 360.0
+
+
+def kd_order(points: np.ndarray, node_size: int = KD_NODE_SIZE) -> np.ndarray:
+    """Permutation putting points in implicit k-d tree order (kdbush layout, three axes)."""
+    ids = np.arange(len(points))
+    stack = [(0, len(points) - 1, 0)]
+    while stack:
+        left, right, axis = stack.pop()
+        if right - left <= node_size:
+            continue
+        middle = (left + right) // 2
+        span = ids[left:right + 1]
+        part = np.argpartition(points[span, axis], middle - left, kind='introselect')
+        ids[left:right + 1] = span[part]
+        stack.append((left, middle - 1, (axis + 1) % 3))
+        stack.append((middle + 1, right, (axis + 1) % 3))
+    return ids
+
+
+def build_cluster_levels(
+    lonlat: np.ndarray,
+    min_zoom: int,
+    max_zoom: int,
+    radius_deg: float,
+) -> Dict[int, ClusterLevel]:
+    """Levels min_zoom..max_zoom plus max_zoom + 1 holding the unclustered places."""
+    unit = lonlat_to_xyz_array(lonlat, radius=1.0)
+    levels = {
+        max_zoom + 1: ClusterLevel(
+            unit,
+            np.ones(len(lonlat), dtype=np.int64),
+            [np.array([idx]) for idx in range(len(lonlat))],
+        )
+    }
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        levels[zoom] = cluster_level(levels[zoom + 1], radius_for_zoom(zoom, radius_deg))
+        logging.info('Zoom %d: %d clusters (radius %.3f°)', zoom, len(levels[zoom]), radius_for_zoom(zoom, radius_deg))
+    return levels
+
+
+def encode_levels(
+    levels: Dict[int, ClusterLevel],
+    lonlat: np.ndarray,
+    population: np.ndarray,
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """NODE_DTYPE records and child_order tables per level, in k-d order."""
+    zooms = sorted(levels)
+    orders = {zoom: kd_order(levels[zoom].unit) for zoom in zooms}
+    # position of each original cluster index after k-d sorting
+    ranks = {zoom: np.argsort(orders[zoom]) for zoom in zooms}
+
+    encoded: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+    for zoom in zooms:
+        level = levels[zoom]
+        order = orders[zoom]
+        nodes = np.zeros(len(level), dtype=NODE_DTYPE)
+        xyz = level.unit[order] * COUNTRY_RADIUS
+        nodes['x'], nodes['y'], nodes['z'] = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+        nodes['lon'] = np.degrees(np.arctan2(level.unit[order, 1], level.unit[order, 0]))
+        nodes['lat'] = np.degrees(np.arcsin(np.clip(level.unit[order, 2], -1.0, 1.0)))
+        nodes['count'] = level.counts[order]
+        parents = level.parents[order]
+        nodes['parent'] = np.where(parents >= 0, ranks[zoom - 1][np.maximum(parents, 0)], -1) if zoom - 1 in ranks else -1
+        for slot, idx in enumerate(order):
+            members = level.members[idx]
+            nodes['west'][slot], nodes['east'][slot] = lon_bounds(lonlat[members, 0])
+            nodes['south'][slot] = lonlat[members, 1].min()
+            nodes['north'][slot] = lonlat[members, 1].max()
+            nodes['population'][slot] = population[members].sum()
+            nodes['place'][slot] = members.min()  # places are sorted most populous first
+
+        child_order = np.zeros(0, dtype=np.uint32)
+        if zoom + 1 in levels:
+            finer_parents = ranks[zoom][levels[zoom + 1].parents[orders[zoom + 1]]]
+            # finer nodes grouped by parent, kept in their own k-d order within a group
+            child_order = np.argsort(finer_parents, kind='stable').astype(np.uint32)
+            child_counts = np.bincount(finer_parents, minlength=len(level))
+            nodes['child_count'] = child_counts
+            nodes['child_start'] = np.concatenate([[0], np.cumsum(child_counts)[:-1]])
+        encoded[zoom] = (nodes, child_order)
+    return encoded
+
+
+def build_marker_index(
+    places_path: Path = PLACES_SHAPEFILE,
+    output_bin: Path = OUTPUT_BIN,
+    output_manifest: Path = OUTPUT_MANIFEST,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    radius_deg: float = DEFAULT_RADIUS_DEG,
+) -> Dict[str, Any]:
+    lonlat, population, places = load_places(places_path)
+    logging.info('Loaded %d places from %s', len(places), places_path)
+    levels = build_cluster_levels(lonlat, min_zoom, max_zoom, radius_deg)
+    encoded = encode_levels(levels, lonlat, population)
+
+    output_bin.parent.mkdir(parents=True, exist_ok=True)
+    level_entries: List[Dict[str, Any]] = []
+    offset = 0
+    with output_bin.open('wb') as f:
+        for zoom in sorted(encoded):
+            nodes, child_order = encoded[zoom]
+            f.write(nodes.tobytes())
+            f.write(child_order.tobytes())
+            level_entries.append({
+                'zoom': zoom,
+                'radius_deg': radius_for_zoom(zoom, radius_deg) if zoom <= max_zoom else 0.0,
+                'node_offset': offset,
+                'node_count': len(nodes),
+                'child_order_offset': offset + nodes.nbytes,
+                'child_order_count': len(child_order),
+            })
+            offset += nodes.nbytes + child_order.nbytes
+
+    manifest = {
+        'version': MARKERS_VERSION,
+        'source': places_path.name,
+        'binary': output_bin.name,
+        'radius': COUNTRY_RADIUS,
+        'up_axis': 'Z',
+        'kd_node_size': KD_NODE_SIZE,
+        'record': {
+            'stride': NODE_DTYPE.itemsize,
+            'fields': {name: [NODE_DTYPE.fields[name][1], NODE_DTYPE.fields[name][0].str] for name in NODE_DTYPE.names},
+        },
+        'levels': level_entries,
+        'places': places,
+    }
+    with output_manifest.open('w') as f:
+        json.dump(manifest, f, indent=2)
+    logging.info(
+        'Wrote %d levels (%.1f KB) to %s and manifest %s',
+        len(level_entries),
+        offset / 1024,
+        output_bin,
+        output_manifest,
+    )
+    return manifest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Precompute multi-zoom city marker clusters for the globe.')
+    parser.add_argument(
+        '--places',
+        type=Path,
+        default=PLACES_SHAPEFILE,
+        help='Populated places shapefile/GeoJSON with name and population columns (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output-bin',
+        type=Path,
+        default=OUTPUT_BIN,
+        help='Binary cluster tree (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output-manifest',
+        type=Path,
+        default=OUTPUT_MANIFEST,
+        help='JSON manifest with level offsets and place names (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--min-zoom',
+        type=int,
+        default=DEFAULT_MIN_ZOOM,
+        help='Coarsest zoom level (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--max-zoom',
+        type=int,
+        default=DEFAULT_MAX_ZOOM,
+        help='Finest clustered zoom level; places themselves sit one level below (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--radius-deg',
+        type=float,
+        default=DEFAULT_RADIUS_DEG,
+        help='Cluster radius in degrees of arc at zoom 0, halved per level (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_marker_index(
+        places_path=args.places,
+        output_bin=args.output_bin,
+        output_manifest=args.output_manifest,
+        min_zoom=args.min_zoom,
+        max_zoom=args.max_zoom,
+        radius_deg=args.radius_deg,
+    )
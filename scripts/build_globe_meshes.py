@@ -1,20 +1,26 @@
 import argparse
+import hashlib
 import json
 import logging
 import math
+import tempfile
+import time
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import geopandas as gpd
 import numpy as np
-from mapbox_earcut import triangulate_float64 as earcut
-from pyproj import Transformer
+import pandas as pd
+import shapely
 from shapely.geometry import MultiPolygon, Polygon
 from shapely.geometry.base import BaseGeometry
 from shapely.geometry.polygon import orient
-from shapely.ops import transform
+
+from globe_adjacency import CountryAdjacency, build_adjacency, derive_enclave_pairs, write_adjacency
+from globe_geodesy import EARTH_RADIUS_KM, geodesic_area_km2, geodesic_measures, iter_polygons, ring_areas_km2
+from globe_triangulators import TRIANGULATORS, cdt_triangulate, resolve_triangulator, triangulate_with_fallback
 
 try:
     from shapely.validation import make_valid as shapely_make_valid
@@ -25,24 +31,34 @@ except ImportError:  # pragma: no cover - fallback for older shapely builds
         shapely_make_valid = None
 
 BASE_DIR = Path(__file__).resolve().parents[1]
-SHAPEFILE = Path('/Users/joe/Desktop/ne_admin0_50m/ne_50m_admin_0_countries.shp')
+DEFAULT_SHAPEFILE = Path('/Users/joe/Desktop/ne_admin0_50m/ne_50m_admin_0_countries.shp')
 DEFAULT_LAKES_SHP = Path('/Users/joe/Desktop/ne_admin0_50m/ne_50m_lakes.shp')
 OUTPUT = BASE_DIR / 'assets/3d/globe_mesh_data.json'
+ADJACENCY_OUTPUT = BASE_DIR / 'assets/3d/globe_adjacency.json'
 DIAGNOSTICS_DIR = BASE_DIR / 'diagnostics'
 DIAGNOSTICS_FILENAME = 'globe_topology_report.json'
+DEFAULT_SNAPSHOT_DIR = Path(tempfile.gettempdir()) / 'galligo_globe_cache' / 'prepared_inputs'
+SNAPSHOT_VERSION = 2
+SHAPEFILE_SIDECARS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
 COUNTRY_RADIUS = 10.05
 MIN_RING_LEN = 3
 DEFAULT_SIMPLIFY_TOLERANCE = 0.02  # degrees
+METRES_PER_ARC_DEGREE = EARTH_RADIUS_KM * 1000 * math.pi / 180
+MIN_PARALLEL_SCALE = math.cos(math.radians(85.0))  # keeps the longitude squeeze invertible at the poles
 DEFAULT_AREA_WARNING_THRESHOLD = 0.05  # 5% shrinkage allowed before logging
+DEFAULT_CHORD_TOLERANCE = 0.02  # world units below COUNTRY_RADIUS (ocean sits 0.05 lower)
+DEFAULT_TRIANGULATOR = 'auto'  # earcut, partitioned above globe_triangulators.PARTITION_VERTEX_THRESHOLD
+POLE_LATITUDE_TOLERANCE = 1e-9  # degrees; Natural Earth closes polar rings exactly on ±90
+MIN_POLAR_CAP_LATITUDE = 1.0  # degrees; pole polygons reaching closer to the equator stay in lon/lat
 HOLE_MIN_AREA_KM2 = 1.0
 HOLE_WATER_OVERLAP_THRESHOLD = 0.5  # 50%
+# Enclaves are derived from the data (see globe_adjacency); this list is only a
+# fallback for callers without an adjacency graph and a sanity check for it.
 KNOWN_ENCLAVES = {
     ('LSO', 'ZAF'),  # Lesotho in South Africa
     ('SMR', 'ITA'),  # San Marino in Italy
     ('VAT', 'ITA'),  # Vatican City in Italy
 }
-EQUAL_AREA_CRS = 'ESRI:54034'
-EQUAL_AREA_TRANSFORMER = Transformer.from_crs('EPSG:4326', EQUAL_AREA_CRS, always_xy=True)
 
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -50,8 +66,38 @@ logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
 @dataclass
 class EarcutPath:
-    exterior: List[Tuple[float, float]]
-    holes: List[List[Tuple[float, float]]]
+    exterior: np.ndarray
+    holes: List[np.ndarray]
+
+
+class CountryMesh:
+    """Positions (float64, N x 3) and triangle indices (uint32, M x 3) for one country."""
+
+    __slots__ = ('positions', 'indices')
+
+    def __init__(self, positions: np.ndarray, indices: np.ndarray) -> None:
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.indices = np.ascontiguousarray(indices, dtype=np.uint32).reshape(-1, 3)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def face_count(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def concatenate(cls, meshes: Sequence['CountryMesh']) -> 'CountryMesh':
+        offsets = np.cumsum([0] + [mesh.vertex_count for mesh in meshes[:-1]]).astype(np.uint32)
+        return cls(
+            np.concatenate([mesh.positions for mesh in meshes]),
+            np.concatenate([mesh.indices + offset for mesh, offset in zip(meshes, offsets)]),
+        )
+
+    def to_lists(self) -> Tuple[List[List[float]], List[List[int]]]:
+        """Legacy JSON form used by globe_mesh_data.json."""
+        return self.positions.tolist(), self.indices.tolist()
 
 
 @dataclass
@@ -60,25 +106,81 @@ class LakesIndex:
     spatial_index: Any
 
 
-def load_shapefile(preferred_iso_col: Optional[str] = None) -> Tuple[gpd.GeoDataFrame, str]:
-    gdf = gpd.read_file(SHAPEFILE)
+def pick_iso_column(columns: Iterable[str], preferred_iso_col: Optional[str] = None) -> str:
     iso_candidates = [preferred_iso_col] if preferred_iso_col else []
     iso_candidates.extend(['ISO_A3', 'ADM0_A3'])
-    iso_col = next((col for col in iso_candidates if col and col in gdf.columns), None)
+    iso_col = next((col for col in iso_candidates if col and col in columns), None)
     if iso_col is None:
         raise ValueError('Could not find an ISO code column in the shapefile')
+    return iso_col
+
+
+def load_shapefile(shapefile: Path, preferred_iso_col: Optional[str] = None) -> Tuple[gpd.GeoDataFrame, str]:
+    gdf = gpd.read_file(shapefile)
+    iso_col = pick_iso_column(gdf.columns, preferred_iso_col)
     gdf = gdf[gdf[iso_col] != '-99']
     dissolved = gdf.dissolve(by=iso_col).reset_index()
     return dissolved, iso_col
 
 
-def lonlat_to_xyz(lon: float, lat: float):
-    lon_r = math.radians(lon)
-    lat_r = math.radians(lat)
-    x = COUNTRY_RADIUS * math.cos(lat_r) * math.cos(lon_r)
-    y = COUNTRY_RADIUS * math.cos(lat_r) * math.sin(lon_r)
-    z = COUNTRY_RADIUS * math.sin(lat_r)
-    return (round(x, 6), round(y, 6), round(z, 6))
+def load_shapefile_subset(
+    shapefile: Path,
+    iso_codes: Iterable[str],
+    preferred_iso_col: Optional[str] = None,
+) -> Tuple[gpd.GeoDataFrame, str]:
+    """Read only the requested countries plus everything touching their footprint.
+
+    The first read is an attribute filter evaluated against the .dbf, with
+    shapes fetched by offset through the .shx; the second is a spatial filter
+    on the requested outlines (holes filled), which picks up enclaves inside
+    them and hosts around them without reading the rest of the file.
+    """
+    columns = gpd.read_file(shapefile, rows=1, ignore_geometry=True).columns
+    iso_col = pick_iso_column(columns, preferred_iso_col)
+    codes = sorted({code.upper() for code in iso_codes})
+    quoted = ', '.join("'{}'".format(code.replace("'", "''")) for code in codes)
+    requested = gpd.read_file(shapefile, where=f'"{iso_col}" IN ({quoted})')
+    if requested.empty:
+        return requested, iso_col
+
+    footprint = shapely.union_all([
+        Polygon(poly.exterior) for geom in requested.geometry for poly in iter_polygons(make_valid_geometry(geom))
+    ])
+    touching = gpd.read_file(shapefile, mask=footprint)
+    touching = touching[~touching[iso_col].isin(codes)]
+    gdf = pd.concat([requested, touching], ignore_index=True)
+    gdf = gdf[gdf[iso_col] != '-99']
+    logging.info(
+        'Read %d of the shapefile records for %d requested countries and %d partners',
+        len(gdf),
+        len(codes),
+        touching[iso_col].nunique(),
+    )
+    return gdf.dissolve(by=iso_col).reset_index(), iso_col
+
+
+def lonlat_to_xyz_array(lonlat: np.ndarray, radius: float = COUNTRY_RADIUS) -> np.ndarray:
+    """Z-up sphere positions for an (N, 2) array of lon/lat degrees, rounded to 6 decimals."""
+    lon_r = np.radians(lonlat[:, 0])
+    lat_r = np.radians(lonlat[:, 1])
+    cos_lat = np.cos(lat_r)
+    xyz = np.column_stack([
+        radius * cos_lat * np.cos(lon_r),
+        radius * cos_lat * np.sin(lon_r),
+        radius * np.sin(lat_r),
+    ])
+    return np.round(xyz, 6)
+
+
+def ring_array(coords: Iterable[Tuple[float, float]]) -> np.ndarray:
+    """Ring coordinates as an (N, 2) float64 array without the closing point."""
+    ring = np.asarray(coords, dtype=np.float64)
+    if ring.ndim != 2 or not len(ring):
+        return np.empty((0, 2), dtype=np.float64)
+    ring = ring[:, :2]
+    if np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    return ring
 
 
 def normalize_ring(coords: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
@@ -99,20 +201,39 @@ def build_centroid_lookup(gdf: gpd.GeoDataFrame, iso_col: str) -> Dict[str, Base
     return lookup
 
 
-def build_enclave_host_map() -> Dict[str, List[str]]:
+def load_enclave_pairs(
+    config_path: Optional[Path],
+    base_pairs: Optional[Iterable[Tuple[str, str]]] = None,
+) -> Set[Tuple[str, str]]:
+    """Return base_pairs (KNOWN_ENCLAVES by default) plus any (child, host) pairs listed in a JSON config."""
+    pairs = set(KNOWN_ENCLAVES if base_pairs is None else base_pairs)
+    if not config_path:
+        return pairs
+    if not config_path.exists():
+        logging.info('Enclave config %s not found; using derived enclaves only', config_path)
+        return pairs
+    with config_path.open() as f:
+        for child_iso, host_iso in json.load(f):
+            pairs.add((str(child_iso).upper(), str(host_iso).upper()))
+    return pairs
+
+
+def enclave_config_digest(config_path: Optional[Path]) -> Optional[str]:
+    """SHA-256 of the pairs a config adds, so reformatting the file does not change it."""
+    if not config_path:
+        return None
+    pairs = sorted(load_enclave_pairs(config_path, base_pairs=()))
+    return hashlib.sha256(json.dumps(pairs).encode('utf-8')).hexdigest()
+
+
+def build_enclave_host_map(pairs: Optional[Iterable[Tuple[str, str]]] = None) -> Dict[str, List[str]]:
     host_map: Dict[str, List[str]] = defaultdict(list)
-    for child_iso, host_iso in KNOWN_ENCLAVES:
+    for child_iso, host_iso in sorted(pairs if pairs is not None else KNOWN_ENCLAVES):
         host_map[host_iso].append(child_iso)
     return dict(host_map)
 
 
-def load_lakes_index(lakes_path: Optional[Path]) -> Optional[LakesIndex]:
-    if not lakes_path:
-        return None
-    if not lakes_path.exists():
-        logging.info('Lakes shapefile %s not found; continuing without lake filtering', lakes_path)
-        return None
-    gdf = gpd.read_file(lakes_path)
+def index_lakes(gdf: gpd.GeoDataFrame) -> Optional[LakesIndex]:
     if gdf.empty:
         return None
     try:
@@ -122,11 +243,190 @@ def load_lakes_index(lakes_path: Optional[Path]) -> Optional[LakesIndex]:
     return LakesIndex(geodataframe=gdf, spatial_index=sindex)
 
 
+def load_lakes_index(
+    lakes_path: Optional[Path],
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+) -> Optional[LakesIndex]:
+    if not lakes_path:
+        return None
+    if not lakes_path.exists():
+        logging.info('Lakes shapefile %s not found; continuing without lake filtering', lakes_path)
+        return None
+    return index_lakes(gpd.read_file(lakes_path, bbox=bbox))
+
+
+def shapefile_fingerprint(path: Path) -> Dict[str, str]:
+    """SHA-256 of every shapefile component that exists next to path."""
+    fingerprint = {
+        'snapshot_version': str(SNAPSHOT_VERSION),
+        'shapely': shapely.__version__,
+    }
+    for suffix in SHAPEFILE_SIDECARS:
+        component = path.with_suffix(suffix)
+        if not component.exists():
+            continue
+        digest = hashlib.sha256()
+        with component.open('rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        fingerprint[component.name] = digest.hexdigest()
+    return fingerprint
+
+
+def read_snapshot_manifest(
+    snapshot_dir: Path,
+    name: str,
+    fingerprint: Dict[str, str],
+) -> Optional[Dict[str, Any]]:
+    """Manifest of a snapshot whose source hashes still match, else None."""
+    manifest_path = snapshot_dir / f'{name}.json'
+    if not manifest_path.exists() or not (snapshot_dir / f'{name}.parquet').exists():
+        return None
+    with manifest_path.open() as f:
+        manifest = json.load(f)
+    if manifest.get('fingerprint') != fingerprint:
+        logging.info('Snapshot %s is stale; rebuilding from source', snapshot_dir / f'{name}.parquet')
+        return None
+    return manifest
+
+
+def read_snapshot(
+    snapshot_dir: Path,
+    name: str,
+    fingerprint: Dict[str, str],
+    filters: Optional[List[Tuple[str, str, Any]]] = None,
+) -> Optional[Tuple[gpd.GeoDataFrame, Dict[str, Any]]]:
+    """Load a fresh snapshot; filters are pushed down to the parquet reader."""
+    manifest = read_snapshot_manifest(snapshot_dir, name, fingerprint)
+    if manifest is None:
+        return None
+    parquet_path = snapshot_dir / f'{name}.parquet'
+    try:
+        gdf = gpd.read_parquet(parquet_path, filters=filters)
+    except Exception as exc:  # pyarrow missing or snapshot unreadable
+        logging.info('Could not read snapshot %s (%s); rebuilding from source', parquet_path, exc)
+        return None
+    return gdf, manifest
+
+
+def write_snapshot(
+    snapshot_dir: Path,
+    name: str,
+    fingerprint: Dict[str, str],
+    gdf: gpd.GeoDataFrame,
+    **extra: Any,
+) -> None:
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    parquet_path = snapshot_dir / f'{name}.parquet'
+    try:
+        gdf.to_parquet(parquet_path)
+    except Exception as exc:  # pyarrow is optional; snapshots are only a speed-up
+        logging.info('Skipping %s snapshot (%s)', name, exc)
+        return
+    # The manifest is written last so a half-written parquet file is never trusted.
+    with (snapshot_dir / f'{name}.json').open('w') as f:
+        json.dump({'fingerprint': fingerprint, **extra}, f, indent=2)
+    logging.info('Saved %s snapshot to %s', name, parquet_path)
+
+
+def enclave_partners(iso_codes: Iterable[str], pairs: Iterable[Sequence[str]]) -> Set[str]:
+    """The requested codes plus the other side of every enclave pair they are part of."""
+    codes = {code.upper() for code in iso_codes}
+    partners = set(codes)
+    for child_iso, host_iso in pairs:
+        if child_iso in codes:
+            partners.add(host_iso)
+        if host_iso in codes:
+            partners.add(child_iso)
+    return partners
+
+
+def load_prepared_countries(
+    shapefile: Path,
+    snapshot_dir: Optional[Path],
+    iso_filter: Optional[Iterable[str]] = None,
+    extra_pairs: Iterable[Tuple[str, str]] = (),
+) -> Tuple[gpd.GeoDataFrame, str, Dict[str, BaseGeometry]]:
+    """Dissolved, make-valid'd countries plus representative points.
+
+    Served from a GeoParquet snapshot when the shapefile hashes still match.
+    With iso_filter only those countries and their enclave partners are
+    loaded: rows are filtered inside the parquet reader using the enclave
+    pairs recorded in the snapshot, or read selectively from the shapefile
+    when there is no fresh snapshot (which is then left alone).
+    """
+    fingerprint = shapefile_fingerprint(shapefile) if snapshot_dir else {}
+    if iso_filter:
+        manifest = read_snapshot_manifest(snapshot_dir, 'countries', fingerprint) if snapshot_dir else None
+        if manifest:
+            wanted = enclave_partners(iso_filter, [*manifest.get('enclave_pairs', []), *extra_pairs])
+            cached = read_snapshot(
+                snapshot_dir, 'countries', fingerprint, filters=[(manifest['iso_col'], 'in', sorted(wanted))]
+            )
+        else:
+            cached = None
+        if not cached:
+            gdf, iso_col = load_shapefile_subset(shapefile, enclave_partners(iso_filter, extra_pairs))
+            gdf = gdf.copy()
+            gdf['geometry'] = gdf['geometry'].apply(make_valid_geometry)
+            return gdf, iso_col, build_centroid_lookup(gdf, iso_col)
+    else:
+        cached = read_snapshot(snapshot_dir, 'countries', fingerprint) if snapshot_dir else None
+    if cached:
+        snapshot, manifest = cached
+        iso_col = manifest['iso_col']
+        centroid_lookup = dict(zip(snapshot[iso_col], snapshot['representative_point']))
+        gdf = snapshot.drop(columns=['representative_point'])
+        return gdf, iso_col, centroid_lookup
+
+    gdf, iso_col = load_shapefile(shapefile)
+    gdf = gdf.copy()
+    gdf['geometry'] = gdf['geometry'].apply(make_valid_geometry)
+    centroid_lookup = build_centroid_lookup(gdf, iso_col)
+    if snapshot_dir:
+        snapshot = gdf.copy()
+        snapshot['representative_point'] = gpd.GeoSeries(
+            [centroid_lookup[iso] for iso in gdf[iso_col]],
+            index=gdf.index,
+            crs=gdf.crs,
+        )
+        # Recording the enclave pairs lets subset builds fetch partners by ISO alone.
+        isos = gdf[iso_col].tolist()
+        pairs = derive_enclave_pairs(isos, np.asarray(gdf.geometry, dtype=object), centroid_lookup)
+        write_snapshot(
+            snapshot_dir,
+            'countries',
+            fingerprint,
+            snapshot,
+            iso_col=iso_col,
+            enclave_pairs=sorted(pairs),
+        )
+    return gdf, iso_col, centroid_lookup
+
+
+def load_prepared_lakes(
+    lakes_path: Optional[Path],
+    snapshot_dir: Optional[Path],
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+) -> Optional[LakesIndex]:
+    # The STRtree itself cannot be persisted, but building it from in-memory geometry is cheap.
+    if not snapshot_dir or not lakes_path or not lakes_path.exists():
+        return load_lakes_index(lakes_path, bbox)
+    fingerprint = shapefile_fingerprint(lakes_path)
+    cached = read_snapshot(snapshot_dir, 'lakes', fingerprint)
+    if cached:
+        return index_lakes(cached[0])
+    if bbox is not None:
+        return load_lakes_index(lakes_path, bbox)
+    gdf = gpd.read_file(lakes_path)
+    write_snapshot(snapshot_dir, 'lakes', fingerprint, gdf)
+    return index_lakes(gdf)
+
+
 def calculate_area_km2(geom: BaseGeometry) -> float:
     if geom.is_empty:
         return 0.0
-    projected = transform(EQUAL_AREA_TRANSFORMER.transform, geom)
-    return projected.area / 1_000_000.0
+    return geodesic_area_km2(geom)
 
 
 def hole_overlaps_water(hole: BaseGeometry, lakes_index: Optional[LakesIndex]) -> bool:
@@ -157,12 +457,14 @@ def should_preserve_hole(
     centroid_lookup: Dict[str, BaseGeometry],
     enclave_host_map: Dict[str, List[str]],
     lakes_index: Optional[LakesIndex],
+    area_km2: Optional[float] = None,
 ) -> bool:
     for child_iso in enclave_host_map.get(host_iso, []):
         centroid = centroid_lookup.get(child_iso)
         if centroid and hole.contains(centroid):
             return True
-    area_km2 = calculate_area_km2(hole)
+    if area_km2 is None:
+        area_km2 = calculate_area_km2(hole)
     if area_km2 < HOLE_MIN_AREA_KM2:
         return False
     if hole_overlaps_water(hole, lakes_index):
@@ -176,16 +478,26 @@ def filter_polygon_holes(
     centroid_lookup: Dict[str, BaseGeometry],
     enclave_host_map: Dict[str, List[str]],
     lakes_index: Optional[LakesIndex],
+    hole_areas_km2: Optional[Sequence[float]] = None,
 ) -> Polygon:
     if not poly.interiors:
         return poly
+    rings = [normalize_ring(interior.coords) for interior in poly.interiors]
+    if hole_areas_km2 is None:
+        hole_areas_km2 = ring_areas_km2(rings)
     preserved: List[List[Tuple[float, float]]] = []
-    for interior in poly.interiors:
-        ring = normalize_ring(interior.coords)
+    for ring, area_km2 in zip(rings, hole_areas_km2):
         if len(ring) < MIN_RING_LEN:
             continue
         hole_poly = Polygon(ring)
-        if should_preserve_hole(hole_poly, host_iso, centroid_lookup, enclave_host_map, lakes_index):
+        if should_preserve_hole(
+            hole_poly,
+            host_iso,
+            centroid_lookup,
+            enclave_host_map,
+            lakes_index,
+            area_km2=float(area_km2),
+        ):
             preserved.append(ring)
     return Polygon(poly.exterior, preserved)
 
@@ -202,11 +514,25 @@ def filter_country_holes(
     if geom.geom_type == 'Polygon':
         return filter_polygon_holes(geom, iso, centroid_lookup, enclave_host_map, lakes_index)
     if geom.geom_type == 'MultiPolygon':
-        return MultiPolygon([
-            filter_polygon_holes(poly, iso, centroid_lookup, enclave_host_map, lakes_index)
-            for poly in geom.geoms
-            if not poly.is_empty
-        ])
+        polygons = [poly for poly in geom.geoms if not poly.is_empty]
+        # Measure every hole of every part in one pass, then hand each part its slice.
+        hole_areas = ring_areas_km2(
+            interior.coords for poly in polygons for interior in poly.interiors
+        )
+        filtered = []
+        offset = 0
+        for poly in polygons:
+            count = len(poly.interiors)
+            filtered.append(filter_polygon_holes(
+                poly,
+                iso,
+                centroid_lookup,
+                enclave_host_map,
+                lakes_index,
+                hole_areas_km2=hole_areas[offset:offset + count],
+            ))
+            offset += count
+        return MultiPolygon(filtered)
     return geom
 
 
@@ -254,18 +580,137 @@ def polygon_to_earcut_paths(geom: BaseGeometry) -> List[EarcutPath]:
     paths: List[EarcutPath] = []
     for poly in polygons:
         oriented = orient(poly, sign=1.0)
-        exterior = normalize_ring(oriented.exterior.coords)
+        exterior = ring_array(oriented.exterior.coords)
         if len(exterior) < MIN_RING_LEN:
             continue
-        holes: List[List[Tuple[float, float]]] = []
+        holes: List[np.ndarray] = []
         for interior in oriented.interiors:
-            ring = normalize_ring(interior.coords)
+            ring = ring_array(interior.coords)
             if len(ring) >= MIN_RING_LEN:
                 holes.append(ring)
         paths.append(EarcutPath(exterior=exterior, holes=holes))
     return paths
 
 
+def parallel_scale(lat: np.ndarray) -> np.ndarray:
+    return np.maximum(np.cos(np.radians(lat)), MIN_PARALLEL_SCALE)
+
+
+def simplify_metres(geom: BaseGeometry, tolerance_m: float) -> BaseGeometry:
+    """Topology-preserving simplify with the error measured in metres on the sphere.
+
+    Longitudes are scaled by cos(latitude) first, so both axes are in degrees
+    of arc and a tolerance means the same ground distance at every latitude.
+    The scale depends only on latitude, which the transform keeps, so the
+    inverse is exact; below MIN_PARALLEL_SCALE it is clamped so polar edges
+    such as Antarctica's do not collapse to a point.
+    """
+    scaled = shapely.transform(geom, lambda xy: np.column_stack([xy[:, 0] * parallel_scale(xy[:, 1]), xy[:, 1]]))
+    simplified = scaled.simplify(tolerance_m / METRES_PER_ARC_DEGREE, preserve_topology=True)
+    return shapely.transform(
+        simplified, lambda xy: np.column_stack([xy[:, 0] / parallel_scale(xy[:, 1]), xy[:, 1]])
+    )
+
+
+def simplify_geometry(
+    geom: BaseGeometry,
+    simplify_tolerance: float,
+    simplify_tolerance_m: Optional[float] = None,
+) -> BaseGeometry:
+    """Simplify in metres when simplify_tolerance_m is set, else in degrees; keeps geom if it would vanish."""
+    if simplify_tolerance_m:
+        simplified = simplify_metres(geom, simplify_tolerance_m)
+    elif simplify_tolerance > 0:
+        simplified = geom.simplify(simplify_tolerance, preserve_topology=True)
+    else:
+        return geom
+    return geom if simplified.is_empty else simplified
+
+
+def earcut_triangle_count(geom: BaseGeometry) -> int:
+    """Triangles a polygon triangulation without Steiner points yields: vertices + 2 * holes - 2."""
+    total = 0
+    for poly in iter_polygons(geom):
+        rings = [poly.exterior, *poly.interiors]
+        total += sum(len(ring.coords) - 1 for ring in rings) + 2 * (len(rings) - 1) - 2
+    return total
+
+
+def at_pole(ring: np.ndarray) -> np.ndarray:
+    return np.abs(ring[:, 1]) >= 90.0 - POLE_LATITUDE_TOLERANCE
+
+
+def antimeridian_crossings(ring: np.ndarray) -> np.ndarray:
+    """Edges (ring[i], ring[i + 1], wrapping) that jump more than 180° of longitude off the pole."""
+    nxt = np.roll(ring, -1, axis=0)
+    polar = at_pole(ring) & at_pole(nxt)
+    return (np.abs(nxt[:, 0] - ring[:, 0]) > 180.0) & ~polar
+
+
+def unwrap_ring(ring: np.ndarray) -> np.ndarray:
+    """Continuous longitudes for a ring that crosses ±180; a ring around a pole is closed over it.
+
+    Vertices on the pole are dropped first: their longitude is arbitrary. If
+    the unwrapped ring then winds once around the globe it encloses the pole
+    on the side of its mean latitude, and that pole is added back as a row at
+    both ends, the layout Natural Earth uses for Antarctica.
+    """
+    ring = ring[~at_pole(ring)]
+    unwrapped = ring.copy()
+    unwrapped[:, 0] = np.degrees(np.unwrap(np.radians(ring[:, 0])))
+    winding = unwrapped[-1, 0] + (ring[0, 0] - ring[-1, 0] + 180.0) % 360.0 - 180.0 - unwrapped[0, 0]
+    if abs(winding) < 180.0:
+        return unwrapped
+    pole = math.copysign(90.0, float(ring[:, 1].mean()))
+    start, end = unwrapped[0], unwrapped[0, 0] + winding
+    return np.vstack([unwrapped, [[end, start[1]], [end, pole], [start[0], pole]]])
+
+
+def split_polygon_at_antimeridian(poly: Polygon) -> List[Polygon]:
+    exterior = unwrap_ring(ring_array(poly.exterior.coords))
+    centre = (exterior[:, 0].min() + exterior[:, 0].max()) / 2
+    holes = []
+    for interior in poly.interiors:
+        hole = unwrap_ring(ring_array(interior.coords))
+        hole[:, 0] += 360.0 * round((centre - hole[:, 0].mean()) / 360.0)
+        holes.append(hole)
+    unwrapped = make_valid_geometry(Polygon(exterior, holes))
+    pieces: List[Polygon] = []
+    lo, hi = math.floor((exterior[:, 0].min() + 180.0) / 360.0), math.ceil((exterior[:, 0].max() - 180.0) / 360.0)
+    for turn in range(lo, hi + 1):
+        offset = 360.0 * turn
+        window = shapely.box(offset - 180.0, -90.0, offset + 180.0, 90.0)
+        piece = shapely.transform(
+            shapely.intersection(unwrapped, window),
+            lambda xy: np.column_stack([xy[:, 0] - offset, xy[:, 1]]),
+        )
+        pieces.extend(part for part in iter_polygons(piece) if part.area > 0)
+    return pieces
+
+
+def split_for_sphere(geom: BaseGeometry) -> Tuple[BaseGeometry, Dict[str, int]]:
+    """Cut polygons whose edges wrap across ±180 and count the polygons capping a pole.
+
+    Triangulating in the lon/lat plane, a ring that jumps from 179° to -179°
+    spans the whole map, which gives globe-wide wrap-around triangles; after
+    the cut every piece lies within [-180, 180]. Natural Earth already splits
+    at the antimeridian, so for it this is a check that changes nothing.
+    """
+    polygons = list(iter_polygons(geom))
+    crossing = [
+        any(antimeridian_crossings(ring_array(ring.coords)).any() for ring in [poly.exterior, *poly.interiors])
+        for poly in polygons
+    ]
+    if any(crossing):
+        parts: List[Polygon] = []
+        for poly, crosses in zip(polygons, crossing):
+            parts.extend(split_polygon_at_antimeridian(poly) if crosses else [poly])
+        # Pieces of one polygon from neighbouring windows meet along the cut; union welds them back.
+        geom = MultiPolygon(list(iter_polygons(shapely.union_all(parts))))
+    pole_caps = sum(bool(at_pole(ring_array(poly.exterior.coords)).any()) for poly in iter_polygons(geom))
+    return geom, {'antimeridian_splits': sum(crossing), 'pole_caps': pole_caps}
+
+
 def prepare_country_geometry(
     iso: str,
     geom: BaseGeometry,
@@ -273,9 +718,11 @@ def prepare_country_geometry(
     enclave_host_map: Dict[str, List[str]],
     simplify_tolerance: float,
     lakes_index: Optional[LakesIndex] = None,
+    simplify_tolerance_m: Optional[float] = None,
+    split_sphere: bool = True,
 ) -> Tuple[BaseGeometry, Dict[str, float]]:
     working = make_valid_geometry(geom)
-    orig_area = working.area
+    original = working
     orig_holes = count_interior_rings(working)
 
     working = filter_country_holes(
@@ -286,65 +733,128 @@ def prepare_country_geometry(
         lakes_index=lakes_index,
     )
     working = make_valid_geometry(working)
-    if simplify_tolerance > 0:
-        simplified = working.simplify(simplify_tolerance, preserve_topology=True)
-        if not simplified.is_empty:
-            working = simplified
-    working = make_valid_geometry(working)
-
+    filtered = working
+    working = make_valid_geometry(simplify_geometry(filtered, simplify_tolerance, simplify_tolerance_m))
+    if simplify_tolerance_m and count_interior_rings(working) < count_interior_rings(filtered):
+        # Enclave and lake holes must survive; the degree simplification never dropped them.
+        logging.warning('%s lost holes during metre-based simplification; using degree tolerance', iso)
+        working = make_valid_geometry(simplify_geometry(filtered, simplify_tolerance))
+    sphere_diag = {'antimeridian_splits': 0, 'pole_caps': 0}
+    if split_sphere:
+        working, sphere_diag = split_for_sphere(working)
+
+    (orig_area, final_area), (orig_perimeter, final_perimeter) = geodesic_measures([original, working])
     diag = {
         'iso': iso,
         'expected_enclaves': len(enclave_host_map.get(iso, [])),
         'initial_holes': orig_holes,
         'final_holes': count_interior_rings(working),
-        'initial_area': orig_area,
-        'final_area': working.area,
-        'area_delta_pct': ((orig_area - working.area) / orig_area * 100) if orig_area else 0.0,
+        'initial_area_km2': float(orig_area),
+        'final_area_km2': float(final_area),
+        'area_delta_pct': float((orig_area - final_area) / orig_area * 100) if orig_area else 0.0,
+        'initial_perimeter_km': float(orig_perimeter),
+        'final_perimeter_km': float(final_perimeter),
         'island_count': count_islands(working),
+        'triangles': earcut_triangle_count(working),
+        **sphere_diag,
     }
+    if simplify_tolerance_m:
+        diag['degree_tolerance_triangles'] = earcut_triangle_count(
+            make_valid_geometry(simplify_geometry(filtered, simplify_tolerance))
+        )
     return working, diag
 
 
-def flatten_loops_for_earcut(loops: List[List[Tuple[float, float]]]) -> Tuple[np.ndarray, np.ndarray]:
-    coords: List[Tuple[float, float]] = []
-    ring_indices: List[int] = []
-    count = 0
-    for ring in loops:
-        if len(ring) < MIN_RING_LEN:
-            continue
-        coords.extend(ring)
-        count += len(ring)
-        ring_indices.append(count)
-    if not coords or not ring_indices:
-        return np.array([]), np.array([])
-    return np.array(coords, dtype=np.float64), np.array(ring_indices, dtype=np.uint32)
+def polar_cap_side(loops: Sequence[np.ndarray]) -> int:
+    """+1 / -1 when the polygon touches the north / south pole and stays in that hemisphere, else 0."""
+    polar = at_pole(loops[0])
+    if not polar.any():
+        return 0
+    side = 1 if loops[0][polar][0, 1] > 0 else -1
+    if min(float(np.min(side * loop[:, 1])) for loop in loops) < MIN_POLAR_CAP_LATITUDE:
+        return 0
+    return side
 
 
-def run_earcut_with_fallback(
-    loops: List[List[Tuple[float, float]]],
-    iso: Optional[str] = None,
-) -> Tuple[List[Tuple[float, float, float]], List[List[int]]]:
-    def earcut_loop(target_loops: List[List[Tuple[float, float]]]):
-        verts_arr, rings_arr = flatten_loops_for_earcut(target_loops)
-        if verts_arr.size == 0 or rings_arr.size == 0:
-            return [], []
-        indices = earcut(verts_arr, rings_arr)
-        verts3d = [lonlat_to_xyz(lon, lat) for lon, lat in verts_arr]
-        faces: List[List[int]] = []
-        for i in range(0, len(indices), 3):
-            faces.append([int(indices[i]), int(indices[i + 1]), int(indices[i + 2])])
-        return verts3d, faces
+def to_gnomonic(lonlat: np.ndarray, side: int) -> np.ndarray:
+    """Pole-centred gnomonic projection, mirrored for the south so lon/lat winding is kept."""
+    distance = np.tan(np.radians(90.0 - side * lonlat[:, 1]))
+    lon = np.radians(lonlat[:, 0])
+    return np.column_stack([distance * np.cos(lon), side * distance * np.sin(lon)])
 
-    try:
-        return earcut_loop(loops)
-    except Exception:
-        if len(loops) > 1:
-            logging.warning('Earcut failed for %s with holes; retrying without holes', iso or 'polygon')
-            return earcut_loop([loops[0]])
-        raise
 
+def from_gnomonic(xy: np.ndarray, side: int) -> np.ndarray:
+    lon = np.degrees(np.arctan2(side * xy[:, 1], xy[:, 0]))
+    lat = side * (90.0 - np.degrees(np.arctan(np.hypot(xy[:, 0], xy[:, 1]))))
+    return np.column_stack([lon, lat])
+
+
+def gnomonic_ring(ring: np.ndarray, side: int) -> np.ndarray:
+    """Project a ring, merging its pole vertices and the coincident ±180 seam vertices.
+
+    A ring that winds around the pole loses its pole row altogether; one that
+    only reaches it (a wedge) keeps the pole as a single vertex at the origin.
+    """
+    polar = at_pole(ring)
+    if polar.any():
+        coast = ring[~polar]
+        lon = np.unwrap(np.radians(np.append(coast[:, 0], coast[0, 0])))
+        if abs(lon[-1] - lon[0]) < math.pi:
+            first = int(np.argmax(polar))
+            ring = np.vstack([ring[:first][~polar[:first]], ring[first], ring[first:][~polar[first:]]])
+        else:
+            ring = coast
+    xy = to_gnomonic(ring, side)
+    distinct = np.any(np.abs(xy - np.roll(xy, 1, axis=0)) > 1e-12, axis=1)
+    return xy[distinct]
 
-def triangulate_geometry(geom: BaseGeometry, iso: Optional[str] = None):
+
+def orient_outward(positions: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Wind every triangle counter-clockwise seen from outside the sphere, as earcut's lon/lat output is."""
+    a, b, c = positions[indices[:, 0]], positions[indices[:, 1]], positions[indices[:, 2]]
+    inward = np.einsum('ij,ij->i', a, np.cross(b, c)) < 0
+    oriented = indices.copy()
+    oriented[inward] = indices[inward][:, [0, 2, 1]]
+    return oriented
+
+
+def run_triangulator(
+    loops: Sequence[np.ndarray],
+    iso: Optional[str] = None,
+    triangulator: str = DEFAULT_TRIANGULATOR,
+    sphere_aware: bool = True,
+) -> Optional[CountryMesh]:
+    """Triangulate one polygon; with sphere_aware, polar caps are triangulated around their pole.
+
+    In lon/lat a polar cap is a band whose pole edge spans all 360° of a
+    single point, so its triangles fan out to that edge and tessellation has
+    to split them many times. In the pole-centred gnomonic projection great
+    circles are straight lines and the cap becomes the disc it is on the
+    sphere. 'auto' triangulates that disc with cdt: earcut's chords across it
+    are long slivers, Delaunay triangles there are near-equilateral on the
+    sphere too.
+    """
+    if not loops or len(loops[0]) < MIN_RING_LEN:
+        return None
+    side = polar_cap_side(loops) if sphere_aware else 0
+    if side:
+        loops = [gnomonic_ring(loop, side) for loop in loops]
+    backend = cdt_triangulate if side and triangulator == 'auto' else resolve_triangulator(triangulator, loops)
+    verts_arr, indices = triangulate_with_fallback(loops, backend, label=iso)
+    if not len(verts_arr):
+        return None
+    if side:
+        positions = lonlat_to_xyz_array(from_gnomonic(verts_arr, side))
+        return CountryMesh(positions, orient_outward(positions, indices))
+    return CountryMesh(lonlat_to_xyz_array(verts_arr), indices)
+
+
+def triangulate_geometry(
+    geom: BaseGeometry,
+    iso: Optional[str] = None,
+    triangulator: str = DEFAULT_TRIANGULATOR,
+    sphere_aware: bool = True,
+) -> Optional[CountryMesh]:
     if geom.is_empty:
         return None
 
@@ -352,26 +862,446 @@ def triangulate_geometry(geom: BaseGeometry, iso: Optional[str] = None):
     if not paths:
         return None
 
-    country_verts: List[Tuple[float, float, float]] = []
-    country_faces: List[List[int]] = []
-    vert_offset = 0
-
+    meshes: List[CountryMesh] = []
     for path in paths:
-        loops = [path.exterior] + path.holes
-        verts, faces = run_earcut_with_fallback(loops, iso=iso)
-        if not verts or not faces:
+        mesh = run_triangulator(
+            [path.exterior] + path.holes, iso=iso, triangulator=triangulator, sphere_aware=sphere_aware
+        )
+        if mesh is None or not mesh.vertex_count or not mesh.face_count:
             continue
-        for face in faces:
-            country_faces.append([idx + vert_offset for idx in face])
-        country_verts.extend(verts)
-        vert_offset += len(verts)
+        meshes.append(mesh)
 
-    if not country_verts or not country_faces:
+    if not meshes:
         return None
-    return country_verts, country_faces
+    return CountryMesh.concatenate(meshes)
+
+
+def chord_sagitta(a: np.ndarray, b: np.ndarray, radius: float = COUNTRY_RADIUS) -> np.ndarray:
+    """Depth below the sphere at the midpoint of each chord a[i]-b[i]."""
+    cos_angle = np.einsum('ij,ij->i', a, b) / (radius * radius)
+    half_angle = np.arccos(np.clip(cos_angle, -1.0, 1.0)) / 2.0
+    return radius * (1.0 - np.cos(half_angle))
+
+
+def _split_face(
+    face: Tuple[int, int, int],
+    marked: Sequence[bool],
+    midpoint_of: Dict[Tuple[int, int], int],
+) -> List[Tuple[int, int, int]]:
+    # Rotate the face so the split pattern always starts at edge (v0, v1); winding is preserved.
+    count = sum(marked)
+    if count == 3:
+        a, b, c = face
+        mab = midpoint_of[tuple(sorted((a, b)))]
+        mbc = midpoint_of[tuple(sorted((b, c)))]
+        mca = midpoint_of[tuple(sorted((c, a)))]
+        return [(a, mab, mca), (mab, b, mbc), (mca, mbc, c), (mab, mbc, mca)]
+    if count == 1:
+        start = list(marked).index(True)
+    else:
+        start = (list(marked).index(False) + 1) % 3
+    a, b, c = face[start], face[(start + 1) % 3], face[(start + 2) % 3]
+    mab = midpoint_of[tuple(sorted((a, b)))]
+    if count == 1:
+        return [(a, mab, c), (mab, b, c)]
+    mbc = midpoint_of[tuple(sorted((b, c)))]
+    return [(mab, b, mbc), (a, mab, mbc), (a, mbc, c)]
+
+
+def tessellate_spherical_mesh(
+    mesh: CountryMesh,
+    chord_tolerance: float,
+    radius: float = COUNTRY_RADIUS,
+    max_passes: int = 12,
+) -> CountryMesh:
+    """Split edges whose chord sags more than chord_tolerance below the sphere.
+
+    Midpoints are shared between neighbouring faces so the refined mesh stays
+    crack-free, and faces whose edges are all within tolerance are left as-is.
+    Faces whose centre sags too far (large, near-equilateral triangles) have
+    their longest edge split as well.
+    """
+    if chord_tolerance <= 0 or not mesh.face_count:
+        return mesh
+
+    positions = mesh.positions
+    tris = mesh.indices.astype(np.int64)
+    for _ in range(max_passes):
+        corners = positions[tris]
+        edge_sag = np.stack(
+            [chord_sagitta(corners[:, i], corners[:, (i + 1) % 3], radius) for i in range(3)],
+            axis=1,
+        )
+        edge_marked = edge_sag > chord_tolerance
+        centre_sag = radius - np.linalg.norm(corners.mean(axis=1), axis=1)
+        needs_centre_split = (centre_sag > chord_tolerance) & ~edge_marked.any(axis=1)
+        longest = np.argmax(edge_sag, axis=1)
+        rows = np.nonzero(needs_centre_split)[0]
+        edge_marked[rows, longest[rows]] = True
+        if not edge_marked.any():
+            break
+
+        # Undirected edge keys per face edge; an edge marked on one side is split on both.
+        edge_lo = np.minimum(tris, np.roll(tris, -1, axis=1))
+        edge_hi = np.maximum(tris, np.roll(tris, -1, axis=1))
+        edge_codes = edge_lo * len(positions) + edge_hi
+        split_codes = np.unique(edge_codes[edge_marked])
+        split_lo, split_hi = np.divmod(split_codes, len(positions))
+
+        mids = positions[split_lo] + positions[split_hi]
+        mids *= (radius / np.linalg.norm(mids, axis=1))[:, None]
+        new_ids = np.arange(len(positions), len(positions) + len(mids))
+        midpoint_of = dict(zip(zip(split_lo.tolist(), split_hi.tolist()), new_ids.tolist()))
+        positions = np.vstack([positions, np.round(mids, 6)])
+
+        face_marked = np.isin(edge_codes, split_codes)
+        affected = face_marked.any(axis=1)
+        refined: List[Tuple[int, int, int]] = []
+        for face, marked in zip(tris[affected].tolist(), face_marked[affected].tolist()):
+            refined.extend(_split_face(tuple(face), marked, midpoint_of))
+        tris = np.vstack([tris[~affected], np.asarray(refined, dtype=np.int64).reshape(-1, 3)])
+
+    return CountryMesh(positions, tris)
+
+
+@dataclass
+class PipelineInputs:
+    geodataframe: gpd.GeoDataFrame
+    iso_col: str
+    centroid_lookup: Dict[str, BaseGeometry]
+    enclave_host_map: Dict[str, List[str]]
+    lakes_index: Optional[LakesIndex]
+    enclave_pairs: Set[Tuple[str, str]] = field(default_factory=set)  # derived from the data, before config pairs
+
+
+def load_pipeline_inputs(
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    enclaves_config: Optional[Path] = None,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+    iso_filter: Optional[Sequence[str]] = None,
+) -> PipelineInputs:
+    """Countries, lakes and enclave rules for a build.
+
+    With iso_filter only the requested countries and their enclave/host
+    partners are read, so a subset build does not pay for the full dataset.
+    """
+    config_pairs = load_enclave_pairs(enclaves_config, base_pairs=())
+    gdf, iso_col, centroid_lookup = load_prepared_countries(shapefile, snapshot_dir, iso_filter, config_pairs)
+    # Only the enclave pairs are needed here; the full neighbour graph is built by
+    # build_mesh_data when it writes --adjacency-output.
+    enclave_pairs = derive_enclave_pairs(gdf[iso_col].tolist(), np.asarray(gdf.geometry, dtype=object), centroid_lookup)
+    missing = {
+        (child, host) for child, host in KNOWN_ENCLAVES
+        if child in centroid_lookup and host in centroid_lookup
+    } - enclave_pairs
+    if missing:
+        logging.warning('Known enclaves not found as holes in the data: %s', sorted(missing))
+    return PipelineInputs(
+        geodataframe=gdf,
+        iso_col=iso_col,
+        centroid_lookup=centroid_lookup,
+        enclave_host_map=build_enclave_host_map(enclave_pairs | config_pairs),
+        lakes_index=load_prepared_lakes(
+            lakes_shapefile,
+            snapshot_dir,
+            bbox=tuple(gdf.total_bounds) if iso_filter and not gdf.empty else None,
+        ),
+        enclave_pairs=enclave_pairs,
+    )
+
+
+def cleaned_border_geometries(inputs: PipelineInputs, iso_filter: Optional[Set[str]] = None) -> Dict[str, BaseGeometry]:
+    """Hole-filtered, valid but unsimplified geometry per country, as shared by borders, outlines and textures."""
+    geometries: Dict[str, BaseGeometry] = {}
+    for _, row in inputs.geodataframe.iterrows():
+        iso = row[inputs.iso_col]
+        if iso_filter and iso.upper() not in iso_filter:
+            continue
+        filtered = filter_country_holes(
+            row.geometry,
+            iso=iso,
+            centroid_lookup=inputs.centroid_lookup,
+            enclave_host_map=inputs.enclave_host_map,
+            lakes_index=inputs.lakes_index,
+        )
+        geometries[iso] = make_valid_geometry(filtered)
+    return geometries
+
+
+def build_pipeline_adjacency(inputs: PipelineInputs) -> CountryAdjacency:
+    gdf = inputs.geodataframe
+    return build_adjacency(gdf[inputs.iso_col].tolist(), gdf.geometry, inputs.centroid_lookup)
+
+
+def log_country_diagnostics(diag: Dict[str, Any], area_warning_threshold: float) -> None:
+    iso = diag['iso']
+    if diag['final_holes'] > diag['expected_enclaves']:
+        logging.warning(
+            '%s has %d holes but only %d expected enclaves',
+            iso,
+            diag['final_holes'],
+            diag['expected_enclaves'],
+        )
+    if diag['initial_area_km2'] and diag['area_delta_pct'] > area_warning_threshold * 100:
+        logging.warning(
+            '%s lost %.2f%% of area during cleaning',
+            iso,
+            diag['area_delta_pct'],
+        )
+    if iso == 'BRA':
+        logging.info('BRA diagnostics: %s', json.dumps(diag, indent=2))
+
+
+def log_simplification_savings(
+    savings: Sequence[Tuple[int, str, Dict[str, Any]]],
+    simplify_tolerance: float,
+    simplify_tolerance_m: float,
+    top: int = 15,
+) -> None:
+    """Per-country triangles (before tessellation) at the metre tolerance vs the degree tolerance."""
+    before = sum(diag['degree_tolerance_triangles'] for _, _, diag in savings)
+    after = sum(diag['triangles'] for _, _, diag in savings)
+    logging.info(
+        'Simplifying at %.0f m instead of %s°: %d -> %d triangles (%+.1f%%)',
+        simplify_tolerance_m,
+        simplify_tolerance,
+        before,
+        after,
+        (after - before) / before * 100 if before else 0.0,
+    )
+    for saved, iso, diag in sorted(savings, key=lambda item: item[0], reverse=True)[:top]:
+        logging.info('  %s: %d -> %d triangles (%d saved)', iso, diag['degree_tolerance_triangles'], diag['triangles'], saved)
+
+
+def compare_sphere_triangulation(
+    iso: str,
+    row: Any,
+    inputs: PipelineInputs,
+    simplify_tolerance: float,
+    chord_tolerance: float,
+    triangulator: str,
+    simplify_tolerance_m: Optional[float],
+) -> Dict[str, Any]:
+    """Tessellated faces and milliseconds with split_for_sphere and polar caps vs the plain lon/lat path."""
+    comparison: Dict[str, Any] = {}
+    for label, sphere_aware in (('sphere', True), ('flat', False)):
+        geom, _ = prepare_country_geometry(
+            iso=iso,
+            geom=row.geometry,
+            centroid_lookup=inputs.centroid_lookup,
+            enclave_host_map=inputs.enclave_host_map,
+            simplify_tolerance=simplify_tolerance,
+            lakes_index=inputs.lakes_index,
+            simplify_tolerance_m=simplify_tolerance_m,
+            split_sphere=sphere_aware,
+        )
+        started = time.perf_counter()
+        mesh = None if geom.is_empty else triangulate_geometry(
+            geom, iso=iso, triangulator=triangulator, sphere_aware=sphere_aware
+        )
+        faces = None if mesh is None else tessellate_spherical_mesh(mesh, chord_tolerance).face_count
+        comparison[f'{label}_faces'] = faces
+        comparison[f'{label}_ms'] = None if faces is None else (time.perf_counter() - started) * 1000
+    return comparison
+
+
+def log_sphere_savings(affected: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+    """Log compare_sphere_triangulation results for the countries split_for_sphere touched."""
+    measured = [(iso, diag) for iso, diag in affected if None not in (diag['flat_faces'], diag['sphere_faces'])]
+    flat_faces = sum(diag['flat_faces'] for _, diag in measured)
+    sphere_faces = sum(diag['sphere_faces'] for _, diag in measured)
+    flat_ms = sum(diag['flat_ms'] for _, diag in measured)
+    sphere_ms = sum(diag['sphere_ms'] for _, diag in measured)
+    logging.info(
+        'Antimeridian/pole handling on %d countries: %d -> %d faces (%d saved), %.0f -> %.0f ms',
+        len(affected),
+        flat_faces,
+        sphere_faces,
+        flat_faces - sphere_faces,
+        flat_ms,
+        sphere_ms,
+    )
+    for iso, diag in affected:
+        if diag['flat_faces'] is None or diag['sphere_faces'] is None:
+            failed = 'flat lon/lat' if diag['flat_faces'] is None else 'sphere-aware'
+            logging.info('  %s: %s triangulation failed', iso, failed)
+            continue
+        logging.info(
+            '  %s (%d split, %d polar): %d -> %d faces, %.1f -> %.1f ms',
+            iso,
+            diag['antimeridian_splits'],
+            diag['pole_caps'],
+            diag['flat_faces'],
+            diag['sphere_faces'],
+            diag['flat_ms'],
+            diag['sphere_ms'],
+        )
+
+
+def build_country_entry(
+    iso: str,
+    row: Any,
+    inputs: PipelineInputs,
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+    triangulator: str = DEFAULT_TRIANGULATOR,
+    simplify_tolerance_m: Optional[float] = None,
+) -> Tuple[Optional[Dict[str, object]], Dict[str, Any]]:
+    """Clean, triangulate and tessellate one country row.
+
+    Returns the output entry (None when the country had to be skipped) and
+    its topology diagnostics.
+    """
+    cleaned_geom, diag = prepare_country_geometry(
+        iso=iso,
+        geom=row.geometry,
+        centroid_lookup=inputs.centroid_lookup,
+        enclave_host_map=inputs.enclave_host_map,
+        simplify_tolerance=simplify_tolerance,
+        lakes_index=inputs.lakes_index,
+        simplify_tolerance_m=simplify_tolerance_m,
+    )
+    if cleaned_geom.is_empty:
+        logging.warning('Geometry for %s became empty after cleaning; skipping', iso)
+        return None, diag
+
+    mesh = triangulate_geometry(cleaned_geom, iso=iso, triangulator=triangulator)
+    if mesh is None:
+        logging.warning('Skipping %s due to triangulation failure', iso)
+        return None, diag
+
+    tessellated = tessellate_spherical_mesh(mesh, chord_tolerance)
+    diag['tessellation_added_faces'] = tessellated.face_count - mesh.face_count
+    entry = {
+        'name': row.get('ADMIN', iso),
+        'mesh': tessellated,
+    }
+    return entry, diag
+
+
+def to_json_entry(entry: Dict[str, Any]) -> Dict[str, object]:
+    """Convert an in-memory entry to the globe_mesh_data.json shape."""
+    verts, faces = entry['mesh'].to_lists()
+    return {'name': entry['name'], 'verts': verts, 'faces': faces}
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """argparse type for 'i/N' with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected i/N, got {value!r}')
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f'shard index must be in [0, {count}), got {value!r}')
+    return index, count
+
+
+def shard_of(iso: str, count: int) -> int:
+    """Stable shard for a country; independent of row order and of Python's hash seed."""
+    return int(hashlib.sha256(iso.encode('utf-8')).hexdigest()[:8], 16) % count
+
+
+def shard_output_path(output_path: Path, shard: Tuple[int, int]) -> Path:
+    return output_path.with_name(f'{output_path.stem}.shard-{shard[0]}-of-{shard[1]}{output_path.suffix}')
+
+
+def write_shard_partial(
+    path: Path,
+    shard: Tuple[int, int],
+    assigned: List[str],
+    order: Dict[str, int],
+    result: Dict[str, Dict[str, Any]],
+    diagnostics: List[Dict[str, object]],
+    params: Dict[str, Any],
+    shapefile: Path,
+) -> None:
+    partial = {
+        'shard': {'index': shard[0], 'count': shard[1]},
+        'dataset': shapefile_fingerprint(shapefile),
+        'params': params,
+        'assigned': assigned,
+        'order': order,
+        'countries': {iso: to_json_entry(entry) for iso, entry in result.items()},
+        'skipped': [iso for iso in assigned if iso not in result],
+        'diagnostics': diagnostics,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w') as f:
+        json.dump(partial, f)
+    logging.info('Shard %d/%d: wrote %d of %d assigned countries to %s', shard[0], shard[1], len(result), len(assigned), path)
+
+
+def merge_mesh_shards(
+    partial_paths: Sequence[Path],
+    output_path: Path = OUTPUT,
+    diagnostics_dir: Optional[Path] = None,
+) -> Dict[str, Dict[str, object]]:
+    """Combine shard partials into the mesh data and topology report of an unsharded build.
+
+    Fails unless every shard of one build is present exactly once, all shards
+    used the same dataset and parameters, and each country was built by
+    exactly the shard it hashes to.
+    """
+    partials = []
+    for path in partial_paths:
+        with Path(path).open() as f:
+            partials.append(json.load(f))
+    if not partials:
+        raise ValueError('No shard partials to merge')
+
+    errors: List[str] = []
+    count = partials[0]['shard']['count']
+    indices = sorted(partial['shard']['index'] for partial in partials)
+    if indices != list(range(count)) or any(partial['shard']['count'] != count for partial in partials):
+        errors.append(f'expected shards 0..{count - 1} exactly once, got {indices}')
+    for key in ('dataset', 'params'):
+        if any(partial[key] != partials[0][key] for partial in partials[1:]):
+            errors.append(f'shards disagree on {key}')
+
+    countries: Dict[str, Dict[str, object]] = {}
+    order: Dict[str, int] = {}
+    diagnostics: List[Dict[str, object]] = []
+    built_by: Dict[str, int] = {}
+    for partial in partials:
+        index = partial['shard']['index']
+        for iso in partial['assigned']:
+            if iso in built_by:
+                errors.append(f'{iso} assigned to shards {built_by[iso]} and {index}')
+            built_by[iso] = index
+            if shard_of(iso, count) != index:
+                errors.append(f'{iso} built by shard {index} but hashes to shard {shard_of(iso, count)}')
+        missing = set(partial['assigned']) - set(partial['countries']) - set(partial['skipped'])
+        if missing:
+            errors.append(f'shard {index} is missing assigned countries {sorted(missing)}')
+        countries.update(partial['countries'])
+        order.update(partial['order'])
+        diagnostics.extend(partial['diagnostics'])
+    if errors:
+        for error in errors:
+            logging.error(error)
+        raise ValueError(f'Refusing to merge {len(partials)} shard partials: {len(errors)} problems')
+
+    # Row order of the unsharded build, so the merged file is byte-identical to it.
+    merged = {iso: countries[iso] for iso in sorted(countries, key=lambda iso: order[iso])}
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open('w') as f:
+        json.dump(merged, f)
+    skipped = sorted(iso for partial in partials for iso in partial['skipped'])
+    logging.info('Merged %d shards: %d countries to %s (%d skipped: %s)', count, len(merged), output_path,
+                 len(skipped), ', '.join(skipped) or 'none')
+
+    diag_dir = diagnostics_dir or DIAGNOSTICS_DIR
+    diag_dir.mkdir(parents=True, exist_ok=True)
+    diag_path = diag_dir / DIAGNOSTICS_FILENAME
+    with diag_path.open('w') as f:
+        json.dump(sorted(diagnostics, key=lambda diag: order[diag['iso']]), f, indent=2)
+    logging.info('Topology diagnostics saved to %s', diag_path)
+    return merged
 
 
 def build_mesh_data(
+    shapefile: Path = DEFAULT_SHAPEFILE,
     simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
     debug_topology: bool = False,
     diagnostics_dir: Optional[Path] = None,
@@ -379,70 +1309,99 @@ def build_mesh_data(
     output_path: Optional[Path] = OUTPUT,
     area_warning_threshold: float = DEFAULT_AREA_WARNING_THRESHOLD,
     lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+    enclaves_config: Optional[Path] = None,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+    adjacency_output: Optional[Path] = None,
+    triangulator: str = DEFAULT_TRIANGULATOR,
+    simplify_tolerance_m: Optional[float] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    compare_flat: bool = False,
 ) -> Dict[str, Dict[str, object]]:
-    gdf, iso_col = load_shapefile()
-    gdf = gdf.copy()
-    gdf['geometry'] = gdf['geometry'].apply(make_valid_geometry)
-    centroid_lookup = build_centroid_lookup(gdf, iso_col)
-    enclave_host_map = build_enclave_host_map()
-    lakes_index = load_lakes_index(lakes_shapefile)
+    """Build mesh data for every country, or with shard=(i, N) only the countries hashing to shard i.
+
+    A shard writes a partial next to output_path (see merge_mesh_shards)
+    instead of the final mesh data and topology report. compare_flat
+    triangulates antimeridian and polar countries a second and third time to
+    log what the sphere-aware path saves; it is only logged, never persisted.
+    """
+    inputs = load_pipeline_inputs(shapefile, lakes_shapefile, enclaves_config, snapshot_dir, iso_filter)
+    iso_col = inputs.iso_col
     iso_filter_set = {code.upper() for code in iso_filter} if iso_filter else None
     diagnostics: List[Dict[str, object]] = []
+    savings: List[Tuple[int, str, Dict[str, Any]]] = []
+    sphere_affected: List[Tuple[str, Dict[str, Any]]] = []
     result: Dict[str, Dict[str, object]] = {}
+    assigned: List[str] = []
+    order: Dict[str, int] = {}
 
-    for _, row in gdf.iterrows():
+    for position, (_, row) in enumerate(inputs.geodataframe.iterrows()):
         iso = row[iso_col]
         if iso_filter_set and iso.upper() not in iso_filter_set:
             continue
-        cleaned_geom, diag = prepare_country_geometry(
-            iso=iso,
-            geom=row.geometry,
-            centroid_lookup=centroid_lookup,
-            enclave_host_map=enclave_host_map,
+        if shard and shard_of(iso, shard[1]) != shard[0]:
+            continue
+        assigned.append(iso)
+        order[iso] = position
+        entry, diag = build_country_entry(
+            iso,
+            row,
+            inputs,
             simplify_tolerance=simplify_tolerance,
-            lakes_index=lakes_index,
+            chord_tolerance=chord_tolerance,
+            triangulator=triangulator,
+            simplify_tolerance_m=simplify_tolerance_m,
         )
-        if cleaned_geom.is_empty:
-            logging.warning('Geometry for %s became empty after cleaning; skipping', iso)
-            continue
-
-        if debug_topology:
+        if simplify_tolerance_m:
+            savings.append((diag['degree_tolerance_triangles'] - diag['triangles'], iso, diag))
+        if compare_flat and (diag.get('antimeridian_splits') or diag.get('pole_caps')):
+            comparison = compare_sphere_triangulation(
+                iso, row, inputs, simplify_tolerance, chord_tolerance, triangulator, simplify_tolerance_m
+            )
+            sphere_affected.append((iso, {**diag, **comparison}))
+        if debug_topology or shard:
             diagnostics.append(diag)
-            if diag['final_holes'] > diag['expected_enclaves']:
-                logging.warning(
-                    '%s has %d holes but only %d expected enclaves',
-                    iso,
-                    diag['final_holes'],
-                    diag['expected_enclaves'],
-                )
-            if diag['initial_area'] and diag['area_delta_pct'] > area_warning_threshold * 100:
-                logging.warning(
-                    '%s lost %.2f%% of area during cleaning',
-                    iso,
-                    diag['area_delta_pct'],
-                )
-            if iso == 'BRA':
-                logging.info('BRA diagnostics: %s', json.dumps(diag, indent=2))
-
-        tri = triangulate_geometry(cleaned_geom, iso=iso)
-        if not tri:
-            logging.warning('Skipping %s due to triangulation failure', iso)
+        if debug_topology:
+            log_country_diagnostics(diag, area_warning_threshold)
+        if entry is None:
             continue
-
-        verts, faces = tri
-        name = row.get('ADMIN', iso)
-        result[iso] = {
-            'name': name,
-            'verts': verts,
-            'faces': faces,
+        result[iso] = entry
+
+    if savings:
+        log_simplification_savings(savings, simplify_tolerance, simplify_tolerance_m)
+    if sphere_affected:
+        log_sphere_savings(sphere_affected)
+
+    if shard:
+        params = {
+            'simplify_tolerance': simplify_tolerance,
+            'simplify_tolerance_m': simplify_tolerance_m,
+            'chord_tolerance': chord_tolerance,
+            'triangulator': triangulator,
+            'iso_filter': sorted(iso_filter_set) if iso_filter_set else None,
+            'lakes_shapefile': shapefile_fingerprint(lakes_shapefile) if lakes_shapefile else None,
+            'enclaves_config': enclave_config_digest(enclaves_config),
         }
+        write_shard_partial(
+            shard_output_path(output_path or OUTPUT, shard), shard, assigned, order, result, diagnostics, params, shapefile
+        )
+        # Every shard loads the full dataset, so the first one writes the (shard-independent) adjacency.
+        if adjacency_output and shard[0] == 0 and not iso_filter_set:
+            write_adjacency(build_pipeline_adjacency(inputs), adjacency_output)
+        return result
 
     if output_path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         with output_path.open('w') as f:
-            json.dump(result, f)
+            json.dump({iso: to_json_entry(entry) for iso, entry in result.items()}, f)
         logging.info('Wrote %d countries to %s', len(result), output_path)
 
+    if adjacency_output:
+        if iso_filter_set:
+            logging.info('Not writing adjacency for a subset build; %s is unchanged', adjacency_output)
+        else:
+            write_adjacency(build_pipeline_adjacency(inputs), adjacency_output)
+
     if debug_topology and diagnostics:
         diag_dir = diagnostics_dir or DIAGNOSTICS_DIR
         diag_dir.mkdir(parents=True, exist_ok=True)
@@ -454,19 +1413,84 @@ def build_mesh_data(
     return result
 
 
+def add_pipeline_input_arguments(
+    parser: argparse.ArgumentParser,
+    countries: bool = True,
+    enclaves: bool = True,
+    simplify_tolerance: Optional[float] = DEFAULT_SIMPLIFY_TOLERANCE,
+    chord_tolerance: bool = True,
+) -> None:
+    """Input and tolerance options shared by the CLIs that build from load_pipeline_inputs.
+
+    countries/enclaves/chord_tolerance=False and simplify_tolerance=None leave
+    out the options a script does not use; simplify_tolerance is the default.
+    """
+    if countries:
+        parser.add_argument(
+            '--shapefile',
+            type=Path,
+            default=DEFAULT_SHAPEFILE,
+            help='Natural Earth admin-0 countries shapefile (default: %(default)s)',
+        )
+    parser.add_argument(
+        '--lakes-shapefile',
+        type=Path,
+        default=DEFAULT_LAKES_SHP,
+        help='Optional Natural Earth lakes shapefile for hole classification (default: %(default)s)',
+    )
+    if enclaves:
+        parser.add_argument(
+            '--enclaves-config',
+            type=Path,
+            help='Optional JSON list of [child_iso, host_iso] pairs added to the enclaves derived from the data.',
+        )
+    parser.add_argument(
+        '--snapshot-dir',
+        type=Path,
+        default=DEFAULT_SNAPSHOT_DIR,
+        help='GeoParquet cache of prepared countries/lakes, keyed by source hashes (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-snapshot',
+        action='store_true',
+        help='Always read and dissolve the shapefiles instead of using the prepared-input cache.',
+    )
+    if simplify_tolerance is not None:
+        parser.add_argument(
+            '--simplify-tolerance',
+            type=float,
+            default=simplify_tolerance,
+            help='Simplification tolerance in degrees (default: %(default)s)',
+        )
+    if chord_tolerance:
+        parser.add_argument(
+            '--chord-tolerance',
+            type=float,
+            default=DEFAULT_CHORD_TOLERANCE,
+            help='Max depth an edge may sag below the sphere before it is split; 0 disables (default: %(default)s)',
+        )
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description='Build per-country low-poly globe meshes.')
+    add_pipeline_input_arguments(parser)
     parser.add_argument(
-        '--simplify-tolerance',
+        '--simplify-tolerance-m',
         type=float,
-        default=DEFAULT_SIMPLIFY_TOLERANCE,
-        help='Simplification tolerance in degrees (default: %(default)s)',
+        help='Simplify with this error in metres on the sphere instead of --simplify-tolerance degrees, '
+             'and log the per-country triangle savings.',
     )
     parser.add_argument(
         '--debug-topology',
         action='store_true',
         help='Emit diagnostics about ring counts, area deltas, and enclaves.',
     )
+    parser.add_argument(
+        '--compare-flat',
+        action='store_true',
+        help='Also triangulate antimeridian and polar countries without split_for_sphere and log the '
+             'face and time savings (slower; nothing is written).',
+    )
     parser.add_argument(
         '--diagnostics-dir',
         type=Path,
@@ -478,6 +1502,17 @@ def parse_args():
         nargs='*',
         help='Optional ISO3 codes to limit processing (useful for tests).',
     )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        help='Build only shard i of N (countries assigned by ISO hash) and write a partial output.',
+    )
+    parser.add_argument(
+        '--merge',
+        nargs='+',
+        type=Path,
+        help='Merge shard partials into --output and the topology report instead of building.',
+    )
     parser.add_argument(
         '--output',
         type=Path,
@@ -491,22 +1526,40 @@ def parse_args():
         help='Relative area loss fraction that triggers warnings (default: %(default)s)',
     )
     parser.add_argument(
-        '--lakes-shapefile',
+        '--triangulator',
+        choices=['auto', *TRIANGULATORS],
+        default=DEFAULT_TRIANGULATOR,
+        help='Polygon triangulation backend; auto partitions only huge polygons (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--adjacency-output',
         type=Path,
-        default=DEFAULT_LAKES_SHP,
-        help='Optional Natural Earth lakes shapefile for hole classification (default: %(default)s)',
+        default=ADJACENCY_OUTPUT,
+        help='CSR country adjacency graph with shared-border lengths (default: %(default)s)',
     )
     return parser.parse_args()
 
 
 if __name__ == '__main__':
     args = parse_args()
-    build_mesh_data(
-        simplify_tolerance=args.simplify_tolerance,
-        debug_topology=args.debug_topology,
-        diagnostics_dir=args.diagnostics_dir,
-        iso_filter=args.iso,
-        output_path=args.output,
-        area_warning_threshold=args.area_warning_threshold,
-        lakes_shapefile=args.lakes_shapefile,
-    )
+    if args.merge:
+        merge_mesh_shards(args.merge, output_path=args.output, diagnostics_dir=args.diagnostics_dir)
+    else:
+        build_mesh_data(
+            shapefile=args.shapefile,
+            simplify_tolerance=args.simplify_tolerance,
+            debug_topology=args.debug_topology,
+            diagnostics_dir=args.diagnostics_dir,
+            iso_filter=args.iso,
+            output_path=args.output,
+            area_warning_threshold=args.area_warning_threshold,
+            lakes_shapefile=args.lakes_shapefile,
+            chord_tolerance=args.chord_tolerance,
+            enclaves_config=args.enclaves_config,
+            snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+            adjacency_output=args.adjacency_output,
+            triangulator=args.triangulator,
+            simplify_tolerance_m=args.simplify_tolerance_m,
+            shard=args.shard,
+            compare_flat=args.compare_flat,
+        )
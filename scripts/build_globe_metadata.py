@@ -0,0 +1,190 @@
+"""
+Precompute per-country metadata so the app does no geometry work at runtime.
+
+For every ISO code this emits a label anchor (pole of inaccessibility of the
+largest part, found in a locally scaled frame so high latitudes are not
+stretched), an antimeridian-aware lon/lat bbox, geodesic area and share of
+world land area, continent, and the world rotation that brings the country to
+face the camera. Rotations follow GlobeCanvas: the world group is rotated with
+Euler XYZ (rotation.x, rotation.y) while the camera stays on +Z; the matching
+quaternion is given in three.js [x, y, z, w] order. camera_distance is in globe
+radii for a 45° field of view.
+"""
+
+import argparse
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely import affinity
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import polylabel
+
+from build_globe_meshes import (
+    BASE_DIR,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SNAPSHOT_DIR,
+    add_pipeline_input_arguments,
+    load_pipeline_inputs,
+)
+from globe_geodesy import EARTH_RADIUS_KM, geodesic_measures, iter_polygons
+
+METADATA_OUTPUT = BASE_DIR / 'assets/3d/globe_country_index.json'
+METADATA_VERSION = 1
+CAMERA_FOV_DEGREES = 45.0
+CAMERA_FRAME_FILL = 0.7  # fraction of the half field of view a country may occupy
+LABEL_TOLERANCE_FRACTION = 0.005  # polylabel precision relative to the part's extent
+COORD_DECIMALS = 4
+
+
+def label_anchor(geom: BaseGeometry, part_areas: Sequence[float]) -> Tuple[float, float]:
+    """Pole of inaccessibility of the largest part, computed in a cos(lat)-scaled frame."""
+    parts = list(iter_polygons(geom))
+    largest = parts[int(np.argmax(part_areas))]
+    minx, miny, maxx, maxy = largest.bounds
+    lat0 = (miny + maxy) / 2
+    scale = max(math.cos(math.radians(lat0)), 0.05)
+    scaled = affinity.scale(largest, xfact=scale, yfact=1.0, origin=(0, 0))
+    tolerance = max(maxx - minx, maxy - miny) * LABEL_TOLERANCE_FRACTION
+    try:
+        point = polylabel(scaled, tolerance=max(tolerance, 1e-4))
+        return point.x / scale, point.y
+    except Exception:  # degenerate parts; representative_point is always inside
+        point = largest.representative_point()
+        return point.x, point.y
+
+
+def antimeridian_bbox(geom: BaseGeometry) -> Tuple[float, float, float, float]:
+    """[west, south, east, north]; west > east when the country crosses ±180°.
+
+    Longitude spans of the parts are merged on the circle and the bbox is the
+    complement of the largest uncovered gap.
+    """
+    spans = sorted((poly.bounds[0], poly.bounds[2]) for poly in iter_polygons(geom))
+    south = min(poly.bounds[1] for poly in iter_polygons(geom))
+    north = max(poly.bounds[3] for poly in iter_polygons(geom))
+    merged: List[List[float]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    gaps = [merged[i + 1][0] - merged[i][1] for i in range(len(merged) - 1)]
+    gaps.append(merged[0][0] + 360.0 - merged[-1][1])
+    widest = int(np.argmax(gaps))
+    if widest == len(merged) - 1:
+        return merged[0][0], south, merged[-1][1], north
+    return merged[widest + 1][0], south, merged[widest][1], north
+
+
+def facing_rotation(lon: float, lat: float) -> Tuple[float, float]:
+    """Euler (x, y) for the world group so (lon, lat) faces a camera on +Z, north up."""
+    rot_x = math.radians(lat)
+    rot_y = -math.pi / 2 - math.radians(lon)
+    rot_y = (rot_y + math.pi) % (2 * math.pi) - math.pi
+    return rot_x, rot_y
+
+
+def euler_xy_quaternion(rot_x: float, rot_y: float) -> Tuple[float, float, float, float]:
+    """Quaternion [x, y, z, w] of a three.js Euler(rot_x, rot_y, 0, 'XYZ')."""
+    cx, sx = math.cos(rot_x / 2), math.sin(rot_x / 2)
+    cy, sy = math.cos(rot_y / 2), math.sin(rot_y / 2)
+    return sx * cy, cx * sy, sx * sy, cx * cy
+
+
+def camera_distance(area_km2: float, fov_degrees: float = CAMERA_FOV_DEGREES) -> float:
+    """Distance (in globe radii) that frames a cap of the country's area."""
+    cap_fraction = min(area_km2 / (4 * math.pi * EARTH_RADIUS_KM ** 2), 0.5)
+    theta = math.acos(1 - 2 * cap_fraction)  # angular radius of an equal-area cap
+    half_fov = math.radians(fov_degrees) / 2 * CAMERA_FRAME_FILL
+    return math.cos(theta) + math.sin(theta) / math.tan(half_fov)
+
+
+def build_country_metadata(
+    output_path: Optional[Path] = METADATA_OUTPUT,
+    iso_filter: Optional[Sequence[str]] = None,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+) -> Dict[str, Dict[str, object]]:
+    inputs = load_pipeline_inputs(shapefile, lakes_shapefile, snapshot_dir=snapshot_dir)
+    gdf = inputs.geodataframe
+    iso_col = inputs.iso_col
+    iso_filter_set = {code.upper() for code in iso_filter} if iso_filter else None
+
+    # Areas for every country (world share) and every part (label choice) in two passes.
+    geoms = list(gdf.geometry)
+    areas, _ = geodesic_measures(geoms)
+    world_area = float(areas.sum()) or 1.0
+    parts_by_country = [list(iter_polygons(geom)) for geom in geoms]
+    part_areas, _ = geodesic_measures([part for parts in parts_by_country for part in parts])
+    part_offsets = np.cumsum([0] + [len(parts) for parts in parts_by_country])
+
+    has_continent = 'CONTINENT' in gdf.columns
+    index: Dict[str, Dict[str, object]] = {}
+    for idx, row in enumerate(gdf.itertuples(index=False)):
+        iso = getattr(row, iso_col)
+        geom = geoms[idx]
+        if iso_filter_set and iso.upper() not in iso_filter_set:
+            continue
+        if geom.is_empty or not parts_by_country[idx]:
+            logging.warning('Skipping %s: empty geometry', iso)
+            continue
+
+        lon, lat = label_anchor(geom, part_areas[part_offsets[idx]:part_offsets[idx + 1]])
+        rot_x, rot_y = facing_rotation(lon, lat)
+        index[iso] = {
+            'name': getattr(row, 'ADMIN', iso),
+            'continent': getattr(row, 'CONTINENT') if has_continent else None,
+            'label': _rounded((lon, lat)),
+            'bbox': _rounded(antimeridian_bbox(geom)),
+            'area_km2': round(float(areas[idx]), 1),
+            'area_share': round(float(areas[idx]) / world_area, 7),
+            'rotation': _rounded((rot_x, rot_y), 5),
+            'quaternion': _rounded(euler_xy_quaternion(rot_x, rot_y), 5),
+            'camera_distance': round(camera_distance(float(areas[idx])), 3),
+        }
+
+    if output_path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open('w') as f:
+            json.dump({'version': METADATA_VERSION, 'countries': index}, f, separators=(',', ':'))
+        logging.info('Wrote metadata for %d countries to %s', len(index), output_path)
+    return index
+
+
+def _rounded(values: Sequence[float], decimals: int = COORD_DECIMALS) -> List[float]:
+    return [round(float(value), decimals) for value in values]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build the per-country label/bbox/area/camera index.')
+    add_pipeline_input_arguments(parser, enclaves=False, simplify_tolerance=None, chord_tolerance=False)
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=METADATA_OUTPUT,
+        help='Output JSON path (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--iso',
+        nargs='*',
+        help='Optional ISO3 codes to limit processing.',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_country_metadata(
+        output_path=args.output,
+        iso_filter=args.iso,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+    )
@@ -0,0 +1,266 @@
+"""
+Per-country globe packages for over-the-air updates.
+
+`build` splits the exported globe GLB into one GLB per country plus a base
+package (ocean and anything else that is not a country), written with the
+same node names, extras and materials as build_globe_chunks.py. Payloads are
+content addressed (<KEY>-<sha256[:16]>.glb), so files from earlier builds stay
+valid next to new ones and a CDN can cache them forever. The manifest records
+every package's hash and size plus a build hash over all of them; the build
+version only increases when that hash changes.
+
+`diff` compares two manifests and writes the minimal patch: packages added
+or changed (with their new files) and packages removed. With --bundle the
+changed payloads are copied next to the patch, ready to upload.
+
+  python scripts/build_globe_packages.py build
+  python scripts/build_globe_packages.py diff old/globe_packages.json new/globe_packages.json -o patch.json
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from build_globe_chunks import BASE_CHUNK, write_chunk
+from globe_glb import read_glb
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SOURCE_GLB = BASE_DIR / 'assets/3d/globe_interactive.glb'
+PACKAGE_DIR = BASE_DIR / 'assets/3d/packages'
+MANIFEST_NAME = 'globe_packages.json'
+PACKAGES_FORMAT = 1
+HASH_PREFIX = 16
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_hash(packages: Dict[str, Dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for key in sorted(packages):
+        digest.update(f"{key}:{packages[key]['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with path.open() as f:
+        return json.load(f)
+
+
+def write_package(
+    output_dir: Path,
+    key: str,
+    gltf: Dict[str, Any],
+    blob: bytes,
+    node_indices: List[int],
+    parent_name: Optional[str],
+) -> Dict[str, Any]:
+    staging = output_dir / f'.{key}.glb.tmp'
+    size = write_chunk(staging, gltf, blob, node_indices, parent_name)
+    sha = file_sha256(staging)
+    path = output_dir / f'{key}-{sha[:HASH_PREFIX]}.glb'
+    staging.replace(path)
+    return {'file': path.name, 'sha256': sha, 'bytes': size}
+
+
+def build_packages(
+    source: Path = SOURCE_GLB,
+    output_dir: Path = PACKAGE_DIR,
+    prune: bool = False,
+) -> Dict[str, Any]:
+    gltf, blob = read_glb(source)
+    names = {node.get('name'): idx for idx, node in enumerate(gltf['nodes'])}
+    parent_name = 'GLOBE_Countries' if 'GLOBE_Countries' in names else None
+    country_nodes: Dict[str, List[int]] = {}
+    base_nodes: List[int] = []
+    for idx, node in enumerate(gltf['nodes']):
+        if 'mesh' not in node:
+            continue
+        iso = (node.get('extras') or {}).get('country_code')
+        if iso:
+            country_nodes.setdefault(iso, []).append(idx)
+        else:
+            base_nodes.append(idx)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    packages: Dict[str, Dict[str, Any]] = {
+        BASE_CHUNK: {**write_package(output_dir, BASE_CHUNK, gltf, blob, base_nodes, None), 'always_load': True},
+    }
+    for iso in sorted(country_nodes):
+        packages[iso] = write_package(output_dir, iso, gltf, blob, country_nodes[iso], parent_name)
+
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = load_manifest(manifest_path)
+    digest = build_hash(packages)
+    version = 1
+    if previous:
+        version = previous['version'] + (previous.get('build_hash') != digest)
+    manifest = {
+        'format': PACKAGES_FORMAT,
+        'version': version,
+        'build_hash': digest,
+        'built': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'source': source.name,
+        'up_axis': 'Y',
+        'packages': packages,
+    }
+    if previous and previous.get('build_hash') == digest:
+        manifest['built'] = previous.get('built', manifest['built'])
+    with manifest_path.open('w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if prune:
+        referenced = {entry['file'] for entry in packages.values()}
+        stale = [path for path in output_dir.glob('*.glb') if path.name not in referenced]
+        for path in stale:
+            path.unlink()
+        logging.info('Pruned %d payloads no longer referenced', len(stale))
+
+    changed = diff_manifests(previous, manifest)['summary'] if previous else None
+    logging.info(
+        'Wrote %d packages (%.1f KB) for build %d%s',
+        len(packages),
+        sum(entry['bytes'] for entry in packages.values()) / 1024,
+        version,
+        f" ({changed['added']} added, {changed['changed']} changed, {changed['removed']} removed)" if changed else '',
+    )
+    return manifest
+
+
+def diff_manifests(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Packages to fetch and to drop to go from old to new; old=None is a full install."""
+    old_packages = (old or {}).get('packages', {})
+    new_packages = new['packages']
+    added = {key: entry for key, entry in new_packages.items() if key not in old_packages}
+    changed = {
+        key: {**entry, 'previous_sha256': old_packages[key]['sha256']}
+        for key, entry in new_packages.items()
+        if key in old_packages and old_packages[key]['sha256'] != entry['sha256']
+    }
+    removed = sorted(key for key in old_packages if key not in new_packages)
+    fetch = {**added, **changed}
+    return {
+        'format': PACKAGES_FORMAT,
+        'from_version': (old or {}).get('version'),
+        'from_build_hash': (old or {}).get('build_hash'),
+        'to_version': new['version'],
+        'to_build_hash': new['build_hash'],
+        'fetch': dict(sorted(fetch.items())),
+        'remove': removed,
+        'summary': {
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'unchanged': len(new_packages) - len(fetch),
+            'download_bytes': sum(entry['bytes'] for entry in fetch.values()),
+            'full_bytes': sum(entry['bytes'] for entry in new_packages.values()),
+        },
+    }
+
+
+def write_patch(
+    old_path: Optional[Path],
+    new_path: Path,
+    output_path: Path,
+    bundle_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    new = load_manifest(new_path)
+    if new is None:
+        raise FileNotFoundError(new_path)
+    patch = diff_manifests(load_manifest(old_path) if old_path else None, new)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open('w') as f:
+        json.dump(patch, f, indent=2)
+    if bundle_dir:
+        bundle_dir.mkdir(parents=True, exist_ok=True)
+        for entry in patch['fetch'].values():
+            shutil.copy2(new_path.parent / entry['file'], bundle_dir / entry['file'])
+    summary = patch['summary']
+    logging.info(
+        'Patch %s -> %s: %d added, %d changed, %d removed, %d unchanged; %.1f KB of %.1f KB',
+        patch['from_version'],
+        patch['to_version'],
+        summary['added'],
+        summary['changed'],
+        summary['removed'],
+        summary['unchanged'],
+        summary['download_bytes'] / 1024,
+        summary['full_bytes'] / 1024,
+    )
+    return patch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build per-country globe packages and diff builds.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Split the globe GLB into content-addressed country packages.')
+    build.add_argument(
+        '--source',
+        type=Path,
+        default=SOURCE_GLB,
+        help='Globe GLB exported by build_globe_scene.py (default: %(default)s)',
+    )
+    build.add_argument(
+        '--output-dir',
+        type=Path,
+        default=PACKAGE_DIR,
+        help='Directory for package payloads and the manifest (default: %(default)s)',
+    )
+    build.add_argument(
+        '--prune',
+        action='store_true',
+        help='Delete payloads the new manifest no longer references.',
+    )
+
+    diff = subparsers.add_parser('diff', help='Write the patch that turns one build into another.')
+    diff.add_argument(
+        'old',
+        type=Path,
+        help="Manifest the device has; pass 'none' for a full install",
+    )
+    diff.add_argument(
+        'new',
+        type=Path,
+        help='Manifest to update to; payload files are resolved next to it',
+    )
+    diff.add_argument(
+        '--output',
+        '-o',
+        type=Path,
+        default=Path('globe_patch.json'),
+        help='Patch JSON (default: %(default)s)',
+    )
+    diff.add_argument(
+        '--bundle',
+        type=Path,
+        help='Also copy the payloads to fetch into this directory.',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.command == 'build':
+        build_packages(source=args.source, output_dir=args.output_dir, prune=args.prune)
+    else:
+        write_patch(
+            old_path=None if str(args.old) == 'none' else args.old,
+            new_path=args.new,
+            output_path=args.output,
+            bundle_dir=args.bundle,
+        )
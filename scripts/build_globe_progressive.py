@@ -0,0 +1,326 @@
+"""
+Progressive, importance-ordered country outlines.
+
+Every ring of the hole-filtered, unsimplified country geometry is ranked with
+Visvalingam-Whyatt elimination, using the area of the spherical triangle a
+vertex forms with its neighbours (in km²) as its effective area. Importance is
+made monotonic (never lower than an earlier eliminated vertex), so keeping all
+vertices with importance >= t is exactly the VW simplification at t and the
+rings can be stored most-important-first: any prefix of a ring's block is a
+coarser outline of that ring. The last three vertices of a ring carry the
+ring's own area, so whole islands drop out once the threshold exceeds them.
+A prefix is not guaranteed to be a simple ring, so decode_country validates
+each level it returns and repairs the ones that self-intersect.
+
+Output is a flat binary of RECORD_DTYPE records plus a JSON manifest with
+(offset, count, part, is_hole, max_importance) per ring. decode_ring and
+decode_country are the reference decoders; --benchmark times them at several
+thresholds.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import MultiPolygon, Polygon
+from shapely.geometry.base import BaseGeometry
+
+from build_globe_meshes import (
+    BASE_DIR,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SNAPSHOT_DIR,
+    add_pipeline_input_arguments,
+    cleaned_border_geometries,
+    load_pipeline_inputs,
+    make_valid_geometry,
+    normalize_ring,
+)
+from globe_geodesy import EARTH_RADIUS_KM, iter_polygons, ring_areas_km2
+
+PROGRESSIVE_OUTPUT = BASE_DIR / 'assets/3d/globe_progressive.bin'
+PROGRESSIVE_VERSION = 1
+RECORD_DTYPE = np.dtype([
+    ('lon', '<f4'),
+    ('lat', '<f4'),
+    ('index', '<u4'),  # position in the original ring
+    ('importance', '<f4'),  # effective area in km²
+])
+BENCHMARK_THRESHOLDS = (0.0, 1.0, 10.0, 100.0, 1000.0, 10000.0)
+
+RingBlock = Tuple[int, int, int, bool, float]  # offset, count, part, is_hole, max importance
+
+
+def unit_vectors(lonlat: np.ndarray) -> np.ndarray:
+    lon = np.radians(lonlat[:, 0])
+    lat = np.radians(lonlat[:, 1])
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def spherical_triangle_area(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Area (steradians) of spherical triangles from unit vectors, via tan(E/2)."""
+    triple = np.abs(np.einsum('...i,...i', a, np.cross(b, c)))
+    denom = 1 + np.einsum('...i,...i', a, b) + np.einsum('...i,...i', b, c) + np.einsum('...i,...i', c, a)
+    return 2 * np.arctan2(triple, denom)
+
+
+def _triangle_area(a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> float:
+    """Scalar spherical_triangle_area for the elimination loop, where numpy call overhead dominates."""
+    cross = (b[1] * c[2] - b[2] * c[1], b[2] * c[0] - b[0] * c[2], b[0] * c[1] - b[1] * c[0])
+    triple = abs(a[0] * cross[0] + a[1] * cross[1] + a[2] * cross[2])
+    denom = (
+        1
+        + a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+        + b[0] * c[0] + b[1] * c[1] + b[2] * c[2]
+        + c[0] * a[0] + c[1] * a[1] + c[2] * a[2]
+    )
+    return 2 * math.atan2(triple, denom)
+
+
+def visvalingam_importance(ring: np.ndarray, ring_area_km2: float) -> np.ndarray:
+    """Monotonic VW effective area (km²) for each vertex of an open ring."""
+    n = len(ring)
+    importance = np.full(n, max(ring_area_km2, 0.0))
+    if n <= 3:
+        return importance
+
+    xyz = unit_vectors(ring)
+    scale = EARTH_RADIUS_KM * EARTH_RADIUS_KM
+    prev_idx = np.roll(np.arange(n), 1)
+    next_idx = np.roll(np.arange(n), -1)
+    areas = spherical_triangle_area(xyz[prev_idx], xyz, xyz[next_idx]) * scale
+    prev_idx, next_idx = prev_idx.tolist(), next_idx.tolist()
+    points = [tuple(point) for point in xyz.tolist()]
+    current = areas.tolist()
+    heap = [(area, idx) for idx, area in enumerate(current)]
+    heapq.heapify(heap)
+    removed = [False] * n
+    remaining = n
+    floor = 0.0
+
+    while remaining > 3:
+        area, idx = heapq.heappop(heap)
+        if removed[idx] or area != current[idx]:
+            continue  # stale entry
+        floor = max(floor, area)
+        importance[idx] = floor
+        removed[idx] = True
+        remaining -= 1
+        before, after = prev_idx[idx], next_idx[idx]
+        next_idx[before] = after
+        prev_idx[after] = before
+        for vertex in (before, after):
+            updated = _triangle_area(points[prev_idx[vertex]], points[vertex], points[next_idx[vertex]]) * scale
+            current[vertex] = updated
+            heapq.heappush(heap, (updated, vertex))
+
+    # The surviving triangle is ranked by the ring's own area, but never below the floor.
+    importance[~np.asarray(removed)] = max(ring_area_km2, floor)
+    return importance
+
+
+def encode_geometry(geom: BaseGeometry) -> Tuple[List[np.ndarray], List[Tuple[int, bool]]]:
+    """Return importance-ordered record arrays and (part, is_hole) per ring."""
+    rings: List[np.ndarray] = []
+    meta: List[Tuple[int, bool]] = []
+    for part, poly in enumerate(iter_polygons(geom)):
+        rings.append(np.asarray(normalize_ring(poly.exterior.coords), dtype=np.float64))
+        meta.append((part, False))
+        for interior in poly.interiors:
+            rings.append(np.asarray(normalize_ring(interior.coords), dtype=np.float64))
+            meta.append((part, True))
+
+    keep = [idx for idx, ring in enumerate(rings) if len(ring) >= 3]
+    rings = [rings[idx] for idx in keep]
+    meta = [meta[idx] for idx in keep]
+    areas = ring_areas_km2(rings)
+    blocks = []
+    for ring, area in zip(rings, areas):
+        importance = visvalingam_importance(ring, float(area))
+        order = np.argsort(-importance, kind='stable')
+        records = np.empty(len(ring), dtype=RECORD_DTYPE)
+        records['lon'] = ring[order, 0]
+        records['lat'] = ring[order, 1]
+        records['index'] = order
+        records['importance'] = importance[order]
+        blocks.append(records)
+    return blocks, meta
+
+
+def decode_ring(records: np.ndarray, min_importance_km2: float = 0.0) -> np.ndarray:
+    """Reference decoder: (N, 2) lon/lat of the ring at a threshold (N may be 0)."""
+    # Importance is descending, so the kept vertices are a prefix.
+    count = int(np.searchsorted(-records['importance'], -min_importance_km2, side='right'))
+    if count < 3:
+        return np.empty((0, 2), dtype=np.float32)
+    prefix = records[:count]
+    prefix = prefix[np.argsort(prefix['index'])]
+    return np.column_stack([prefix['lon'], prefix['lat']])
+
+
+def decode_country(
+    buffer: np.ndarray,
+    rings: Sequence[RingBlock],
+    min_importance_km2: float = 0.0,
+) -> BaseGeometry:
+    """Country outline at a threshold; always valid.
+
+    Rings are thinned independently, so a thinned ring can cross itself or a
+    hole can cross its shell. Such levels are repaired with make_valid and
+    only their polygonal parts are kept.
+    """
+    exteriors: Dict[int, np.ndarray] = {}
+    holes: Dict[int, List[np.ndarray]] = {}
+    for offset, count, part, is_hole, max_importance in rings:
+        if max_importance < min_importance_km2:
+            continue
+        coords = decode_ring(buffer[offset:offset + count], min_importance_km2)
+        if not len(coords):
+            continue
+        if is_hole:
+            holes.setdefault(part, []).append(coords)
+        else:
+            exteriors[part] = coords
+    polygons = [Polygon(shell, holes.get(part, [])) for part, shell in sorted(exteriors.items())]
+    geom = polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+    if geom.is_valid:
+        return geom
+    polygons = list(iter_polygons(make_valid_geometry(geom)))
+    return polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+
+
+def load_progressive(path: Path = PROGRESSIVE_OUTPUT) -> Tuple[np.ndarray, Dict[str, object]]:
+    with path.with_suffix('.json').open() as f:
+        manifest = json.load(f)
+    return np.fromfile(path, dtype=RECORD_DTYPE), manifest
+
+
+def build_progressive_data(
+    output_path: Optional[Path] = PROGRESSIVE_OUTPUT,
+    iso_filter: Optional[Sequence[str]] = None,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    enclaves_config: Optional[Path] = None,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+) -> Tuple[np.ndarray, Dict[str, object]]:
+    inputs = load_pipeline_inputs(shapefile, lakes_shapefile, enclaves_config, snapshot_dir)
+    iso_filter_set = {code.upper() for code in iso_filter} if iso_filter else None
+    geometries = cleaned_border_geometries(inputs, iso_filter_set)
+    names = dict(zip(inputs.geodataframe[inputs.iso_col], inputs.geodataframe.get('ADMIN', inputs.geodataframe[inputs.iso_col])))
+
+    blocks: List[np.ndarray] = []
+    countries: Dict[str, Dict[str, object]] = {}
+    offset = 0
+    for iso in sorted(geometries):
+        records, meta = encode_geometry(geometries[iso])
+        rings = []
+        for block, (part, is_hole) in zip(records, meta):
+            rings.append([offset, len(block), part, is_hole, float(block['importance'][0])])
+            offset += len(block)
+        blocks.extend(records)
+        countries[iso] = {'name': names.get(iso, iso), 'rings': rings}
+
+    buffer = np.concatenate(blocks) if blocks else np.empty(0, dtype=RECORD_DTYPE)
+    manifest: Dict[str, object] = {
+        'version': PROGRESSIVE_VERSION,
+        'record': {name: RECORD_DTYPE.fields[name][0].str for name in RECORD_DTYPE.names},
+        'record_bytes': RECORD_DTYPE.itemsize,
+        'ring_fields': ['offset', 'count', 'part', 'is_hole', 'max_importance_km2'],
+        'countries': countries,
+    }
+    logging.info('Encoded %d vertices in %d rings for %d countries', len(buffer), sum(
+        len(entry['rings']) for entry in countries.values()), len(countries))
+
+    if output_path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        buffer.tofile(output_path)
+        with output_path.with_suffix('.json').open('w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        logging.info('Wrote %s (%.1f KB) and its manifest', output_path, buffer.nbytes / 1024)
+    return buffer, manifest
+
+
+def benchmark_decode(
+    buffer: np.ndarray,
+    manifest: Dict[str, object],
+    thresholds: Sequence[float] = BENCHMARK_THRESHOLDS,
+    repeats: int = 3,
+) -> List[Dict[str, float]]:
+    results = []
+    countries = manifest['countries']
+    for threshold in thresholds:
+        best = math.inf
+        for _ in range(repeats):
+            start = time.perf_counter()
+            decoded = [decode_country(buffer, entry['rings'], threshold) for entry in countries.values()]
+            best = min(best, time.perf_counter() - start)
+        vertices = sum(
+            len(poly.exterior.coords) - 1 + sum(len(ring.coords) - 1 for ring in poly.interiors)
+            for geom in decoded
+            for poly in iter_polygons(geom)
+        )
+        result = {
+            'min_importance_km2': threshold,
+            'vertices': vertices,
+            'kept_fraction': vertices / max(len(buffer), 1),
+            'decode_ms': best * 1000,
+        }
+        logging.info(
+            'threshold %10.1f km²: %7d vertices (%5.1f%%) decoded in %.1f ms',
+            threshold,
+            vertices,
+            result['kept_fraction'] * 100,
+            result['decode_ms'],
+        )
+        results.append(result)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build importance-ordered, progressively decodable country outlines.')
+    add_pipeline_input_arguments(parser, simplify_tolerance=None, chord_tolerance=False)
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=PROGRESSIVE_OUTPUT,
+        help='Output binary path; the manifest is written next to it as .json (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--iso',
+        nargs='*',
+        help='Optional ISO3 codes to limit processing.',
+    )
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help='Time the reference decoder at several thresholds after encoding.',
+    )
+    parser.add_argument(
+        '--thresholds',
+        type=float,
+        nargs='*',
+        default=list(BENCHMARK_THRESHOLDS),
+        help='Importance thresholds in km² for --benchmark (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    buffer, manifest = build_progressive_data(
+        output_path=args.output,
+        iso_filter=args.iso,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        enclaves_config=args.enclaves_config,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+    )
+    if args.benchmark:
+        benchmark_decode(buffer, manifest, args.thresholds)
@@ -67,7 +67,7 @@ def reset_scene() -> None:
             bpy.data.materials.remove(material)
 
 
-def create_materials() -> Tuple[bpy.types.Material, bpy.types.Material]:
+def create_materials(opaque_countries: bool = False) -> Tuple[bpy.types.Material, bpy.types.Material]:
     """Return (MAT_Ocean, MAT_UnvisitedCountry)."""
     mat_ocean = bpy.data.materials.get("MAT_Ocean") or bpy.data.materials.new("MAT_Ocean")
     mat_ocean.use_nodes = True
@@ -84,24 +84,34 @@ def create_materials() -> Tuple[bpy.types.Material, bpy.types.Material]:
         bpy.data.materials.get("MAT_UnvisitedCountry")
         or bpy.data.materials.new("MAT_UnvisitedCountry")
     )
+    configure_country_material(mat_country, opaque=opaque_countries)
+
+    return mat_ocean, mat_country
+
+
+def configure_country_material(mat_country: bpy.types.Material, opaque: bool = False) -> None:
+    """Switch MAT_UnvisitedCountry between the blended (0.85 alpha) and opaque looks."""
+    alpha = 1.0 if opaque else 0.85
     mat_country.use_nodes = True
     country_bsdf = mat_country.node_tree.nodes.get("Principled BSDF")
     if country_bsdf:
-        country_bsdf.inputs["Base Color"].default_value = (0.878, 0.878, 0.878, 0.85)
+        country_bsdf.inputs["Base Color"].default_value = (0.878, 0.878, 0.878, alpha)
         country_bsdf.inputs["Roughness"].default_value = 0.65
         country_bsdf.inputs["Metallic"].default_value = 0.0
         if "Specular" in country_bsdf.inputs:
             country_bsdf.inputs["Specular"].default_value = 0.15
-        country_bsdf.inputs["Alpha"].default_value = 0.85
-    mat_country.blend_method = "BLEND"
+        country_bsdf.inputs["Alpha"].default_value = alpha
+    mat_country.blend_method = "OPAQUE" if opaque else "BLEND"
     if hasattr(mat_country, "shadow_method"):
-        mat_country.shadow_method = "NONE"
+        mat_country.shadow_method = "OPAQUE" if opaque else "NONE"
     mat_country.use_backface_culling = False
 
-    return mat_ocean, mat_country
-
 
-def create_hierarchy(mat_ocean: bpy.types.Material) -> Tuple[bpy.types.Object, bpy.types.Object, bpy.types.Object]:
+def create_hierarchy(
+    mat_ocean: bpy.types.Material,
+    ocean_segments: int = 32,
+    ocean_rings: int = 16,
+) -> Tuple[bpy.types.Object, bpy.types.Object, bpy.types.Object]:
     """Create GLOBE_Root, GLOBE_Countries, and GLOBE_Ocean objects."""
     scene = bpy.context.scene
 
@@ -117,8 +127,8 @@ def create_hierarchy(mat_ocean: bpy.types.Material) -> Tuple[bpy.types.Object, b
     countries.empty_display_size = 0.4
 
     bpy.ops.mesh.primitive_uv_sphere_add(
-        segments=32,
-        ring_count=16,
+        segments=ocean_segments,
+        ring_count=ocean_rings,
         radius=OCEAN_RADIUS,
         location=(0, 0, 0),
     )
@@ -204,11 +214,11 @@ def triangulate_lonlat_polygons(polygons: Iterable[Sequence[Tuple[float, float]]
 # Data loading
 # -----------------------------------------------------------------------------
 
-def load_pretriangulated_data() -> Optional[Dict[str, Dict[str, object]]]:
-    if not PRETRIANGULATED.exists():
-        print(f"[WARN] Pre-triangulated data missing at {PRETRIANGULATED}")
+def load_pretriangulated_data(path: Path = PRETRIANGULATED) -> Optional[Dict[str, Dict[str, object]]]:
+    if not path.exists():
+        print(f"[WARN] Pre-triangulated data missing at {path}")
         return None
-    with PRETRIANGULATED.open("r", encoding="utf-8") as fp:
+    with path.open("r", encoding="utf-8") as fp:
         data = json.load(fp)
     return data
 
@@ -485,6 +495,21 @@ def replace_country_with_svg(
     return obj
 
 
+def apply_svg_fallbacks(
+    country_objects: Dict[str, bpy.types.Object],
+    parent: bpy.types.Object,
+    material: bpy.types.Material,
+) -> List[str]:
+    """Swap CRITICAL_COUNTRIES for their SVG rebuilds in place; returns the ISO codes replaced."""
+    fallback_applied: List[str] = []
+    for iso3 in CRITICAL_COUNTRIES:
+        replacement = replace_country_with_svg(iso3, parent, material)
+        if replacement:
+            country_objects[iso3] = replacement
+            fallback_applied.append(iso3)
+    return fallback_applied
+
+
 # -----------------------------------------------------------------------------
 # Export
 # -----------------------------------------------------------------------------
@@ -497,21 +522,26 @@ def ensure_gltf_addon() -> None:
             print(f"[WARN] Could not enable glTF addon: {exc}")
 
 
-def export_glb(root: bpy.types.Object) -> None:
+def export_glb(
+    root: bpy.types.Object,
+    export_path: Path = EXPORT_PATH,
+    export_normals: bool = True,
+) -> None:
     ensure_gltf_addon()
     deselect_all()
     root.select_set(True)
     for child in root.children_recursive:
         child.select_set(True)
     bpy.context.view_layer.objects.active = root
+    export_path.parent.mkdir(parents=True, exist_ok=True)
     bpy.ops.export_scene.gltf(
-        filepath=str(EXPORT_PATH),
+        filepath=str(export_path),
         export_format="GLB",
         use_selection=True,
         export_yup=True,
         export_apply=True,
         export_texcoords=True,
-        export_normals=True,
+        export_normals=export_normals,
         export_tangents=False,
         export_materials="EXPORT",
         export_draco_mesh_compression_enable=False,
@@ -522,7 +552,11 @@ def export_glb(root: bpy.types.Object) -> None:
         export_skins=False,
         export_morph=False,
     )
-    print(f"[INFO] Exported GLB to {EXPORT_PATH}")
+    print(f"[INFO] Exported GLB to {export_path}")
+
+
+def count_mesh_tris(obj: bpy.types.Object) -> int:
+    return sum(max(len(poly.vertices) - 2, 0) for poly in obj.data.polygons)
 
 
 # -----------------------------------------------------------------------------
@@ -546,12 +580,7 @@ def build_globe() -> None:
         "exported": False,
     }
 
-    fallback_applied: List[str] = []
-    for iso3 in CRITICAL_COUNTRIES:
-        replacement = replace_country_with_svg(iso3, countries_parent, mat_country)
-        if replacement:
-            country_objects[iso3] = replacement
-            fallback_applied.append(iso3)
+    fallback_applied = apply_svg_fallbacks(country_objects, countries_parent, mat_country)
 
     triangle_count = sum(
         len(obj.data.polygons) for obj in country_objects.values()
@@ -559,7 +588,7 @@ def build_globe() -> None:
     summary["country_tris"] = triangle_count
     summary["fallback_applied"] = fallback_applied
 
-    ocean_tris = sum(max(len(poly.vertices) - 2, 0) for poly in ocean.data.polygons)
+    ocean_tris = count_mesh_tris(ocean)
     summary["ocean_tris"] = ocean_tris
     total_tris = triangle_count + ocean_tris
     summary["total_tris"] = total_tris
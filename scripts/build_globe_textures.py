@@ -0,0 +1,370 @@
+"""
+Bake the cleaned country polygons into globe textures.
+
+Produces an equirectangular uint16 country-ID texture (0 is ocean, ids map to
+ISO codes in the manifest) and an 8-bit signed distance texture for borders,
+so the globe can be drawn as one textured sphere with a colour lookup instead
+of hundreds of country meshes. Row 0 is 90°N and column 0 is 180°W.
+
+Rasterisation is a vectorised even-odd scanline fill evaluated at pixel
+centres, done per tile. Each tile is cached on disk under a hash of the
+resolution and the ISO and geometry of every country whose bounds overlap
+it, storing indices into that country list that are mapped to texture ids
+on load, so a rebuild only re-rasterises tiles touched by changed
+countries even when adding one renumbers the ids. The cache
+keeps one directory per (version, height, tile size), and after a bake the
+tiles in that directory the bake did not use are deleted, so each setting
+holds at most one texture's worth of tiles. Pruning only happens in a cache
+root carrying TILE_CACHE_STAMP, which is written when the root is created
+empty, so pointing --tile-cache at an existing directory never deletes files.
+
+The distance texture stores the distance to the nearest pixel whose
+neighbour has a different ID, negative over ocean and positive on land,
+mapped to 0-255 with 128 on the border. Horizontal distances are scaled by
+cos(latitude) so the border width is roughly even across the globe.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from build_globe_meshes import (
+    BASE_DIR,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SNAPSHOT_DIR,
+    add_pipeline_input_arguments,
+    cleaned_border_geometries,
+    load_pipeline_inputs,
+)
+from globe_geodesy import iter_polygons
+
+TEXTURE_DIR = BASE_DIR / 'assets/3d/textures'
+DEFAULT_TILE_CACHE = Path(tempfile.gettempdir()) / 'galligo_globe_cache' / 'id_tiles'
+DEFAULT_HEIGHT = 2048  # texture is 2:1, so 4096 x 2048 by default
+DEFAULT_TILE_SIZE = 256
+DEFAULT_SDF_SPREAD = 8  # pixels of distance encoded on each side of a border
+TEXTURE_VERSION = 2  # 2: tiles store member indices instead of texture ids
+TILE_CACHE_STAMP = 'globe_tile_cache.json'
+OCEAN_ID = 0
+
+
+def lonlat_to_pixel(coords: np.ndarray, width: int, height: int) -> np.ndarray:
+    x = (coords[:, 0] + 180.0) / 360.0 * width
+    y = (90.0 - coords[:, 1]) / 180.0 * height
+    return np.column_stack([x, y])
+
+
+def ring_edges(geom: BaseGeometry, width: int, height: int) -> np.ndarray:
+    """All ring edges of a geometry as an (E, 4) array of x0, y0, x1, y1 in pixels."""
+    edges = []
+    for poly in iter_polygons(geom):
+        for ring in [poly.exterior, *poly.interiors]:
+            pixels = lonlat_to_pixel(np.asarray(ring.coords)[:, :2], width, height)
+            if len(pixels) >= 4:
+                edges.append(np.hstack([pixels[:-1], pixels[1:]]))
+    return np.vstack(edges) if edges else np.empty((0, 4))
+
+
+def rasterize_edges(
+    edges: np.ndarray,
+    row0: int,
+    col0: int,
+    rows: int,
+    cols: int,
+) -> np.ndarray:
+    """Even-odd fill of closed rings (given as edges) over a rows x cols window."""
+    mask = np.zeros((rows, cols), dtype=bool)
+    if not len(edges):
+        return mask
+    x0, y0, x1, y1 = edges.T
+    horizontal = y0 == y1
+    x0, y0, x1, y1 = x0[~horizontal], y0[~horizontal], x1[~horizontal], y1[~horizontal]
+
+    # Rows whose centre (r + 0.5) lies in [min(y), max(y)) cross the edge.
+    first = np.maximum(np.ceil(np.minimum(y0, y1) - 0.5), row0).astype(np.int64)
+    last = np.minimum(np.ceil(np.maximum(y0, y1) - 0.5), row0 + rows).astype(np.int64)
+    counts = np.maximum(last - first, 0)
+    if not counts.sum():
+        return mask
+    edge_ids = np.repeat(np.arange(len(counts)), counts)
+    row_ids = first[edge_ids] + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    centre = row_ids + 0.5
+    xs = x0[edge_ids] + (centre - y0[edge_ids]) * (x1[edge_ids] - x0[edge_ids]) / (y1[edge_ids] - y0[edge_ids])
+
+    order = np.lexsort((xs, row_ids))
+    row_ids, xs = row_ids[order], xs[order]
+    # Consecutive crossings on a row pair up into filled spans.
+    starts, ends, span_rows = xs[0::2], xs[1::2], row_ids[0::2] - row0
+    start_cols = np.clip(np.ceil(starts - 0.5).astype(np.int64) - col0, 0, cols)
+    end_cols = np.clip(np.ceil(ends - 0.5).astype(np.int64) - col0, 0, cols)
+    diff = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.add.at(diff, (span_rows, start_cols), 1)
+    np.add.at(diff, (span_rows, end_cols), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
+
+
+def geometry_digest(geom: BaseGeometry) -> str:
+    return hashlib.sha256(geom.wkb).hexdigest()
+
+
+def pixel_bounds(geom: BaseGeometry, width: int, height: int) -> Tuple[float, float, float, float]:
+    minx, miny, maxx, maxy = geom.bounds
+    (px0, py0), (px1, py1) = lonlat_to_pixel(np.array([[minx, maxy], [maxx, miny]]), width, height)
+    return px0, py0, px1, py1
+
+
+def bake_id_texture(
+    geometries: Dict[str, BaseGeometry],
+    country_ids: Dict[str, int],
+    height: int = DEFAULT_HEIGHT,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    cache_dir: Optional[Path] = DEFAULT_TILE_CACHE,
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    width = height * 2
+    texture = np.zeros((height, width), dtype=np.uint16)
+    digests = {iso: geometry_digest(geom) for iso, geom in geometries.items()}
+    bounds = {iso: pixel_bounds(geom, width, height) for iso, geom in geometries.items()}
+    edges: Dict[str, np.ndarray] = {}
+    stats = {'tiles': 0, 'rebuilt': 0, 'reused': 0, 'pruned': 0}
+    used: List[Path] = []
+    prunable = False
+    if cache_dir:
+        prunable = claim_tile_cache(cache_dir)
+        cache_dir = cache_dir / f'v{TEXTURE_VERSION}-h{height}-t{tile_size}'
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    for row0 in range(0, height, tile_size):
+        for col0 in range(0, width, tile_size):
+            rows, cols = min(tile_size, height - row0), min(tile_size, width - col0)
+            members = sorted(
+                iso for iso, (px0, py0, px1, py1) in bounds.items()
+                if px0 < col0 + cols and px1 >= col0 and py0 < row0 + rows and py1 >= row0
+            )
+            stats['tiles'] += 1
+            # Tiles hold 1-based indices into members, not texture ids, so adding or removing a
+            # country elsewhere (which renumbers the ids) leaves this tile's key unchanged.
+            key = hashlib.sha256(json.dumps([
+                TEXTURE_VERSION, height, row0, col0, rows, cols,
+                [(iso, digests[iso]) for iso in members],
+            ]).encode()).hexdigest()
+            lookup = np.array([OCEAN_ID] + [country_ids[iso] for iso in members], dtype=np.uint16)
+            cached = cache_dir / f'{key}.npy' if cache_dir else None
+            if cached:
+                used.append(cached)
+            if cached and cached.exists():
+                texture[row0:row0 + rows, col0:col0 + cols] = lookup[np.load(cached)]
+                stats['reused'] += 1
+                continue
+
+            tile = np.zeros((rows, cols), dtype=np.uint16)
+            for member, iso in enumerate(members, start=1):
+                if iso not in edges:
+                    edges[iso] = ring_edges(geometries[iso], width, height)
+                tile[rasterize_edges(edges[iso], row0, col0, rows, cols)] = member
+            texture[row0:row0 + rows, col0:col0 + cols] = lookup[tile]
+            stats['rebuilt'] += 1
+            if cached:
+                np.save(cached, tile)
+
+    if cache_dir and prunable:
+        stats['pruned'] = prune_tile_cache(cache_dir, used)
+    return texture, stats
+
+
+def claim_tile_cache(cache_root: Path) -> bool:
+    """Stamp a new or empty cache root as ours; False for a root with other contents and no stamp."""
+    stamp = cache_root / TILE_CACHE_STAMP
+    if stamp.exists():
+        return True
+    cache_root.mkdir(parents=True, exist_ok=True)
+    if any(cache_root.iterdir()):
+        logging.warning('%s is not a tile cache created by this script (no %s); stale tiles will not be pruned',
+                        cache_root, TILE_CACHE_STAMP)
+        return False
+    stamp.write_text(json.dumps({'created_by': Path(__file__).name}))
+    return True
+
+
+def prune_tile_cache(settings_dir: Path, used: List[Path]) -> int:
+    """Delete the tiles in this bake's settings directory that the bake did not use."""
+    keep = set(used)
+    pruned = 0
+    for path in settings_dir.glob('*.npy'):
+        if path not in keep:
+            path.unlink()
+            pruned += 1
+    return pruned
+
+
+def border_sdf(ids: np.ndarray, spread: int = DEFAULT_SDF_SPREAD) -> np.ndarray:
+    """Signed distance (in pixels at the equator) to the nearest ID change, as uint8."""
+    height, width = ids.shape
+    border = np.zeros_like(ids, dtype=bool)
+    horizontal = ids != np.roll(ids, -1, axis=1)  # wraps across the antimeridian
+    border |= horizontal | np.roll(horizontal, 1, axis=1)
+    vertical = ids[:-1] != ids[1:]
+    border[:-1] |= vertical
+    border[1:] |= vertical
+
+    # Pass 1: distance along each row to the nearest border pixel (columns wrap).
+    padded = np.concatenate([border[:, -spread:], border, border[:, :spread]], axis=1)
+    cols = np.arange(padded.shape[1])
+    left = np.maximum.accumulate(np.where(padded, cols, -10 ** 9), axis=1)
+    right = np.minimum.accumulate(np.where(padded, cols, 10 ** 9)[:, ::-1], axis=1)[:, ::-1]
+    row_dist = np.minimum(cols - left, right - cols)[:, spread:spread + width].astype(np.float64)
+    latitudes = np.radians(90.0 - (np.arange(height) + 0.5) * 180.0 / height)
+    row_dist *= np.maximum(np.cos(latitudes), 1e-3)[:, None]
+    row_dist = np.minimum(row_dist, spread + 1)
+
+    # Pass 2: exact combination over the rows within the spread.
+    best = row_dist ** 2
+    for dy in range(1, spread + 1):
+        best[dy:] = np.minimum(best[dy:], row_dist[:-dy] ** 2 + dy * dy)
+        best[:-dy] = np.minimum(best[:-dy], row_dist[dy:] ** 2 + dy * dy)
+    distance = np.sqrt(best)
+    signed = np.where(ids == OCEAN_ID, -distance, distance)
+    return np.clip(np.rint(128 + signed * 127 / spread), 0, 255).astype(np.uint8)
+
+
+def write_png(path: Path, image: np.ndarray) -> int:
+    """Write a greyscale PNG; uint16 images are stored at 16 bits per sample."""
+    height, width = image.shape
+    bit_depth = 16 if image.dtype == np.uint16 else 8
+    samples = image.astype('>u2' if bit_depth == 16 else np.uint8)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), samples.view(np.uint8).reshape(height, -1)])
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    png = b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, 0, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), 9)),
+        chunk(b'IEND', b''),
+    ])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(png)
+    return len(png)
+
+
+def build_globe_textures(
+    output_dir: Path = TEXTURE_DIR,
+    height: int = DEFAULT_HEIGHT,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    sdf_spread: int = DEFAULT_SDF_SPREAD,
+    cache_dir: Optional[Path] = DEFAULT_TILE_CACHE,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    enclaves_config: Optional[Path] = None,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+) -> Dict[str, object]:
+    inputs = load_pipeline_inputs(shapefile, lakes_shapefile, enclaves_config, snapshot_dir)
+    geometries = {iso: geom for iso, geom in cleaned_border_geometries(inputs).items() if not geom.is_empty}
+    countries: List[str] = sorted(geometries)
+    if len(countries) >= 0xFFFF:
+        raise ValueError(f'{len(countries)} countries do not fit a uint16 ID texture')
+    country_ids = {iso: idx + 1 for idx, iso in enumerate(countries)}
+
+    ids, stats = bake_id_texture(geometries, country_ids, height, tile_size, cache_dir)
+    sdf = border_sdf(ids, sdf_spread)
+    logging.info(
+        'Baked %dx%d ID texture: %d of %d tiles rebuilt, %d reused, %d stale cache files removed',
+        ids.shape[1],
+        ids.shape[0],
+        stats['rebuilt'],
+        stats['tiles'],
+        stats['reused'],
+        stats['pruned'],
+    )
+
+    id_path = output_dir / 'globe_country_ids.png'
+    sdf_path = output_dir / 'globe_border_sdf.png'
+    sizes = {'ids_bytes': write_png(id_path, ids), 'sdf_bytes': write_png(sdf_path, sdf)}
+    manifest = {
+        'version': TEXTURE_VERSION,
+        'projection': 'equirectangular',
+        'width': int(ids.shape[1]),
+        'height': int(ids.shape[0]),
+        'ocean_id': OCEAN_ID,
+        'ids': id_path.name,
+        'sdf': sdf_path.name,
+        'sdf_spread_px': sdf_spread,
+        'countries': countries,  # country id = index + 1
+    }
+    with (output_dir / 'globe_textures.json').open('w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    logging.info(
+        'Wrote %s (%.1f KB) and %s (%.1f KB)',
+        id_path,
+        sizes['ids_bytes'] / 1024,
+        sdf_path,
+        sizes['sdf_bytes'] / 1024,
+    )
+    return {**stats, **sizes}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bake country-ID and border SDF textures for the globe.')
+    add_pipeline_input_arguments(parser, simplify_tolerance=None, chord_tolerance=False)
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        default=TEXTURE_DIR,
+        help='Directory for the PNGs and their manifest (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--height',
+        type=int,
+        default=DEFAULT_HEIGHT,
+        help='Texture height in pixels; width is twice this (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--tile-size',
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+        help='Tile edge in pixels for incremental rebuilds (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--sdf-spread',
+        type=int,
+        default=DEFAULT_SDF_SPREAD,
+        help='Border distance range in pixels encoded in the SDF (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--tile-cache',
+        type=Path,
+        default=DEFAULT_TILE_CACHE,
+        help='Cache of rasterised tiles keyed by country geometry; stale tiles are removed after each bake '
+             'if the directory was created by this script (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-tile-cache',
+        action='store_true',
+        help='Rasterise every tile from scratch.',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    build_globe_textures(
+        output_dir=args.output_dir,
+        height=args.height,
+        tile_size=args.tile_size,
+        sdf_spread=args.sdf_spread,
+        cache_dir=None if args.no_tile_cache else args.tile_cache,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        enclaves_config=args.enclaves_config,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+    )
@@ -0,0 +1,267 @@
+"""
+Export several globe variants from a single headless Blender session.
+
+Country meshes are loaded and instantiated once per mesh-data source, with
+the same CRITICAL_COUNTRIES SVG fallbacks as build_globe_scene.py; each
+variant then only mutates the scene (country material, ocean tessellation,
+decimation LOD) before exporting its GLB. Run it in background mode, e.g.:
+
+  blender --background --python scripts/build_globe_variants.py -- \
+    --manifest scripts/globe_variants.json
+
+Each manifest variant accepts:
+  name             label used in logs and the summary (required)
+  output           GLB path, relative to the project root (required)
+  mesh_data        pre-triangulated JSON (default: assets/3d/globe_mesh_data.json)
+  opaque           export MAT_UnvisitedCountry as opaque instead of blended
+  ocean_segments   GLOBE_Ocean UV sphere segments (default: 32)
+  ocean_rings      GLOBE_Ocean UV sphere rings (default: 16)
+  lod_ratio        Decimate ratio applied to every country (default: 1.0)
+  export_normals   include normals in the GLB (default: true)
+  triangle_budget  skip export above this many triangles (default: 50000)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import bpy
+import bmesh
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from build_globe_scene import (  # noqa: E402
+    OCEAN_RADIUS,
+    PRETRIANGULATED,
+    PROJECT_ROOT,
+    apply_svg_fallbacks,
+    configure_country_material,
+    count_mesh_tris,
+    create_hierarchy,
+    create_materials,
+    export_glb,
+    instantiate_countries,
+    load_pretriangulated_data,
+    reset_scene,
+)
+
+DEFAULT_MANIFEST = PROJECT_ROOT / "scripts/globe_variants.json"
+DEFAULT_SUMMARY = PROJECT_ROOT / "diagnostics/globe_variants_summary.json"
+LOD_MODIFIER_NAME = "LOD_Decimate"
+
+
+@dataclass
+class GlobeVariant:
+    name: str
+    output: Path
+    mesh_data: Path = PRETRIANGULATED
+    opaque: bool = False
+    ocean_segments: int = 32
+    ocean_rings: int = 16
+    lod_ratio: float = 1.0
+    export_normals: bool = True
+    triangle_budget: int = 50000
+
+
+def resolve_path(value: str) -> Path:
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def load_manifest(path: Path) -> Tuple[List[GlobeVariant], Path]:
+    with path.open("r", encoding="utf-8") as fp:
+        manifest = json.load(fp)
+
+    variants: List[GlobeVariant] = []
+    for raw in manifest.get("variants", []):
+        entry = dict(raw)
+        entry["output"] = resolve_path(entry["output"])
+        if "mesh_data" in entry:
+            entry["mesh_data"] = resolve_path(entry["mesh_data"])
+        variants.append(GlobeVariant(**entry))
+    if not variants:
+        raise RuntimeError(f"No variants defined in {path}")
+
+    summary_path = resolve_path(manifest["summary"]) if "summary" in manifest else DEFAULT_SUMMARY
+    return variants, summary_path
+
+
+# -----------------------------------------------------------------------------
+# Scene mutation helpers
+# -----------------------------------------------------------------------------
+
+def ocean_mesh(
+    segments: int,
+    rings: int,
+    material: bpy.types.Material,
+    cache: Dict[Tuple[int, int], bpy.types.Mesh],
+) -> bpy.types.Mesh:
+    key = (segments, rings)
+    mesh = cache.get(key)
+    if mesh is not None:
+        return mesh
+
+    mesh = bpy.data.meshes.new(f"Mesh_Ocean_{segments}x{rings}")
+    bm = bmesh.new()
+    # Same UVs as primitive_uv_sphere_add, which the single-variant build uses.
+    bm.loops.layers.uv.new("UVMap")
+    bmesh.ops.create_uvsphere(bm, u_segments=segments, v_segments=rings, radius=OCEAN_RADIUS, calc_uvs=True)
+    bm.to_mesh(mesh)
+    bm.free()
+    for poly in mesh.polygons:
+        poly.use_smooth = True
+    mesh.materials.append(material)
+    # Keep swapped-out spheres alive for later variants in this session.
+    mesh.use_fake_user = True
+    cache[key] = mesh
+    return mesh
+
+
+def remove_countries(country_objects: Dict[str, bpy.types.Object]) -> None:
+    for obj in country_objects.values():
+        mesh = obj.data
+        bpy.data.objects.remove(obj, do_unlink=True)
+        if mesh.users == 0:
+            bpy.data.meshes.remove(mesh)
+    country_objects.clear()
+
+
+def apply_lod(country_objects: Dict[str, bpy.types.Object], ratio: float) -> None:
+    """Add, update or drop a Decimate modifier; export_apply bakes it into the GLB."""
+    for obj in country_objects.values():
+        modifier = obj.modifiers.get(LOD_MODIFIER_NAME)
+        if ratio >= 1.0:
+            if modifier:
+                obj.modifiers.remove(modifier)
+            continue
+        if modifier is None:
+            modifier = obj.modifiers.new(LOD_MODIFIER_NAME, "DECIMATE")
+            modifier.decimate_type = "COLLAPSE"
+        modifier.ratio = ratio
+
+
+def evaluated_tris(country_objects: Dict[str, bpy.types.Object]) -> int:
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    total = 0
+    for obj in country_objects.values():
+        evaluated = obj.evaluated_get(depsgraph)
+        mesh = evaluated.to_mesh()
+        total += sum(max(len(poly.vertices) - 2, 0) for poly in mesh.polygons)
+        evaluated.to_mesh_clear()
+    return total
+
+
+# -----------------------------------------------------------------------------
+# Main entry
+# -----------------------------------------------------------------------------
+
+def build_variants(variants: Sequence[GlobeVariant], summary_path: Path) -> List[Dict[str, object]]:
+    reset_scene()
+    mat_ocean, mat_country = create_materials()
+    root, countries_parent, ocean = create_hierarchy(mat_ocean)
+
+    ocean_cache: Dict[Tuple[int, int], bpy.types.Mesh] = {}
+    data_cache: Dict[Path, Dict[str, Dict[str, object]]] = {}
+    country_objects: Dict[str, bpy.types.Object] = {}
+    fallback_applied: List[str] = []
+    current_source: Optional[Path] = None
+    summaries: List[Dict[str, object]] = []
+
+    for variant in variants:
+        started = time.perf_counter()
+        print(f"[INFO] Building variant {variant.name}")
+
+        if variant.mesh_data != current_source:
+            remove_countries(country_objects)
+            if variant.mesh_data not in data_cache:
+                data = load_pretriangulated_data(variant.mesh_data)
+                if not data:
+                    raise RuntimeError(f"No country data for variant {variant.name}")
+                data_cache[variant.mesh_data] = data
+            country_objects, _ = instantiate_countries(
+                data_cache[variant.mesh_data], countries_parent, mat_country
+            )
+            fallback_applied = apply_svg_fallbacks(country_objects, countries_parent, mat_country)
+            current_source = variant.mesh_data
+
+        configure_country_material(mat_country, opaque=variant.opaque)
+        ocean.data = ocean_mesh(variant.ocean_segments, variant.ocean_rings, mat_ocean, ocean_cache)
+        apply_lod(country_objects, variant.lod_ratio)
+
+        country_data = data_cache[variant.mesh_data]
+        country_tris = evaluated_tris(country_objects)
+        ocean_tris = count_mesh_tris(ocean)
+        summary: Dict[str, object] = {
+            "variant": variant.name,
+            "output": str(variant.output),
+            "mesh_data": str(variant.mesh_data),
+            "material": "opaque" if variant.opaque else "blend",
+            "ocean": f"{variant.ocean_segments}x{variant.ocean_rings}",
+            "lod_ratio": variant.lod_ratio,
+            "export_normals": variant.export_normals,
+            "countries_expected": len(country_data),
+            "countries_created": len(country_objects),
+            "country_tris": country_tris,
+            "ocean_tris": ocean_tris,
+            "total_tris": country_tris + ocean_tris,
+            "fallback_applied": fallback_applied,
+            "exported": False,
+            "bytes": 0,
+        }
+
+        if len(country_objects) < len(country_data):
+            print(f"[WARN] {variant.name}: missing country meshes – skipping export.")
+        elif summary["total_tris"] > variant.triangle_budget:
+            print(f"[WARN] {variant.name}: triangle budget exceeded – skipping export.")
+        else:
+            export_glb(root, variant.output, export_normals=variant.export_normals)
+            summary["exported"] = True
+            summary["bytes"] = variant.output.stat().st_size
+
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        summaries.append(summary)
+        print(f"[INFO] Variant summary: {summary}")
+
+    bpy.context.scene["globe_variant_summaries"] = json.dumps(summaries)
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with summary_path.open("w", encoding="utf-8") as fp:
+        json.dump(summaries, fp, indent=2)
+    print(f"[INFO] Wrote {len(summaries)} variant summaries to {summary_path}")
+    return summaries
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export globe variants from one Blender session.")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=DEFAULT_MANIFEST,
+        help="Variant manifest JSON (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="*",
+        help="Restrict the run to these variant names.",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    # Blender passes its own flags first; script arguments follow a bare "--".
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = parse_args(argv)
+    variants, summary_path = load_manifest(args.manifest)
+    if args.only:
+        wanted = set(args.only)
+        variants = [variant for variant in variants if variant.name in wanted]
+    build_variants(variants, summary_path)
+
+
+if __name__ == "__main__":
+    main()
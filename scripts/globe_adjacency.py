@@ -0,0 +1,135 @@
+"""
+Country adjacency graph and enclave containment from the dissolved countries.
+
+Candidate pairs come from one bulk STRtree query, so only countries whose
+bounding boxes overlap are ever compared. Two countries are neighbours when
+their geometries meet; the shared border is the intersection of their
+boundaries, measured geodesically (point contacts have length 0). The graph is
+stored symmetrically in CSR form: the neighbours of country i are
+indices[indptr[i]:indptr[i + 1]], with matching border_km entries.
+
+Enclaves are derived rather than listed: a country is an enclave of a host
+when its representative point (the same point hole filtering tests) falls
+inside one of the host's holes.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Set, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+
+from globe_geodesy import iter_polygons, line_lengths_km
+
+ADJACENCY_VERSION = 1
+BORDER_DECIMALS = 1
+
+
+@dataclass
+class CountryAdjacency:
+    isos: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    border_km: np.ndarray
+    enclave_pairs: Set[Tuple[str, str]] = field(default_factory=set)
+
+    def neighbours(self, iso: str) -> Dict[str, float]:
+        row = self.isos.index(iso)
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return {
+            self.isos[col]: float(length)
+            for col, length in zip(self.indices[start:end], self.border_km[start:end])
+        }
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            'version': ADJACENCY_VERSION,
+            'isos': self.isos,
+            'indptr': self.indptr.tolist(),
+            'indices': self.indices.tolist(),
+            'border_km': np.round(self.border_km, BORDER_DECIMALS).tolist(),
+            'enclaves': sorted([child, host] for child, host in self.enclave_pairs),
+        }
+
+
+def neighbour_pairs(geoms: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (i, j, shared border km) for every intersecting pair with i < j."""
+    tree = shapely.STRtree(geoms)
+    left, right = tree.query(geoms, predicate='intersects')
+    keep = left < right
+    left, right = left[keep], right[keep]
+    shared = shapely.intersection(shapely.boundary(geoms[left]), shapely.boundary(geoms[right]))
+    return left, right, line_lengths_km(shared)
+
+
+def derive_enclave_pairs(
+    isos: Sequence[str],
+    geoms: np.ndarray,
+    centroid_lookup: Mapping[str, BaseGeometry],
+) -> Set[Tuple[str, str]]:
+    holes: List[Polygon] = []
+    hole_hosts: List[int] = []
+    for host_idx, geom in enumerate(geoms):
+        for poly in iter_polygons(geom):
+            for interior in poly.interiors:
+                holes.append(Polygon(interior))
+                hole_hosts.append(host_idx)
+    if not holes:
+        return set()
+
+    points = np.array([centroid_lookup.get(iso) for iso in isos], dtype=object)
+    present = np.flatnonzero(shapely.is_geometry(points))
+    tree = shapely.STRtree(points[present])
+    hole_idx, point_idx = tree.query(np.array(holes, dtype=object), predicate='contains')
+    pairs = set()
+    for hole, point in zip(hole_idx, point_idx):
+        child, host = present[point], hole_hosts[hole]
+        if child != host:
+            pairs.add((isos[child], isos[host]))
+    return pairs
+
+
+def build_adjacency(
+    isos: Sequence[str],
+    geometries: Sequence[BaseGeometry],
+    centroid_lookup: Mapping[str, BaseGeometry],
+) -> CountryAdjacency:
+    isos = list(isos)
+    geoms = shapely.make_valid(np.array(list(geometries), dtype=object))
+    left, right, lengths = neighbour_pairs(geoms)
+
+    # Store both directions, then sort by (row, col) to get CSR order.
+    rows = np.concatenate([left, right])
+    cols = np.concatenate([right, left])
+    border_km = np.concatenate([lengths, lengths])
+    order = np.lexsort((cols, rows))
+    rows, cols, border_km = rows[order], cols[order], border_km[order]
+    indptr = np.zeros(len(isos) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(isos)), out=indptr[1:])
+
+    enclave_pairs = derive_enclave_pairs(isos, geoms, centroid_lookup)
+    logging.info(
+        'Adjacency: %d countries, %d neighbour pairs, %d enclaves',
+        len(isos),
+        len(left),
+        len(enclave_pairs),
+    )
+    return CountryAdjacency(
+        isos=isos,
+        indptr=indptr,
+        indices=cols.astype(np.int32),
+        border_km=border_km,
+        enclave_pairs=enclave_pairs,
+    )
+
+
+def write_adjacency(adjacency: CountryAdjacency, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w') as f:
+        json.dump(adjacency.to_json(), f, separators=(',', ':'))
+    logging.info('Adjacency graph saved to %s', path)
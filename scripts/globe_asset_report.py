@@ -0,0 +1,304 @@
+"""
+Budget report for an exported globe GLB.
+
+Reads the GLB directly (no Blender) and breaks it down per country and per
+buffer: vertex/triangle counts, bytes by attribute, index widths, node and
+primitive (draw call) counts and an estimate of the GPU memory the asset needs
+once uploaded. The report is written as JSON and printed as a table; totals
+are checked against budgets and against the previous report, and the script
+exits with status 1 when either check fails so CI can gate on it. A failing
+report is written next to the baseline as <name>.failed.json instead of over
+it, so rerunning after a regression still compares against the last good build.
+
+GPU memory is estimated as the tightly packed size of every accessor a
+primitive references, plus RGBA8 with a full mip chain for PNG textures.
+"""
+
+import argparse
+import json
+import logging
+import struct
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from globe_glb import COMPONENT_SIZES, MODE_TRIANGLES, TYPE_WIDTHS, read_glb
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_GLB = BASE_DIR / 'assets/3d/globe_interactive.glb'
+DEFAULT_REPORT = BASE_DIR / 'diagnostics/globe_asset_report.json'
+DEFAULT_TOP = 15
+DEFAULT_REGRESSION_THRESHOLD = 0.05  # 5% growth over the previous build fails
+DEFAULT_BUDGETS: Dict[str, float] = {
+    'file_bytes': 2 * 1024 * 1024,
+    'gpu_bytes': 4 * 1024 * 1024,
+    'triangles': 50000,  # same ceiling build_globe_scene uses before skipping export
+    'vertices': 60000,
+    'primitives': 300,
+    'nodes': 400,
+    'max_country_triangles': 5000,
+}
+# Totals compared against the previous report; growth beyond the threshold fails.
+REGRESSION_METRICS = ('file_bytes', 'gpu_bytes', 'triangles', 'vertices', 'primitives', 'nodes')
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def accessor_bytes(accessor: Dict[str, Any]) -> int:
+    return accessor['count'] * TYPE_WIDTHS[accessor['type']] * COMPONENT_SIZES[accessor['componentType']]
+
+
+def primitive_counts(gltf: Dict[str, Any], primitive: Dict[str, Any]) -> Dict[str, int]:
+    accessors = gltf['accessors']
+    vertices = accessors[primitive['attributes']['POSITION']]['count']
+    if 'indices' in primitive:
+        elements = accessors[primitive['indices']]['count']
+    else:
+        elements = vertices
+    mode = primitive.get('mode', MODE_TRIANGLES)
+    return {
+        'vertices': vertices,
+        'triangles': elements // 3 if mode == MODE_TRIANGLES else 0,
+        'elements': elements,
+    }
+
+
+def png_gpu_bytes(data: bytes) -> int:
+    """Decoded RGBA8 size with a full mip chain, or 0 when the image is not a PNG."""
+    if not data.startswith(PNG_SIGNATURE) or len(data) < 24:
+        return 0
+    width, height = struct.unpack('>II', data[16:24])
+    return width * height * 4 * 4 // 3
+
+
+def mesh_labels(gltf: Dict[str, Any]) -> Dict[int, str]:
+    """Label each mesh with the country code of the first node that uses it."""
+    labels: Dict[int, str] = {}
+    for node in gltf.get('nodes', []):
+        if 'mesh' in node and node['mesh'] not in labels:
+            extras = node.get('extras') or {}
+            labels[node['mesh']] = extras.get('country_code') or node.get('name') or f"mesh{node['mesh']}"
+    for idx, mesh in enumerate(gltf.get('meshes', [])):
+        labels.setdefault(idx, mesh.get('name') or f'mesh{idx}')
+    return labels
+
+
+def analyze_glb(path: Path, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    gltf, blob = read_glb(path)
+    accessors = gltf.get('accessors', [])
+    labels = mesh_labels(gltf)
+
+    attribute_bytes: Dict[str, int] = defaultdict(int)
+    index_widths: Counter = Counter()
+    counted: Set[int] = set()
+    entries: List[Dict[str, Any]] = []
+    totals = Counter()
+
+    for mesh_idx, mesh in enumerate(gltf.get('meshes', [])):
+        entry = Counter()
+        for primitive in mesh['primitives']:
+            counts = primitive_counts(gltf, primitive)
+            entry.update(counts)
+            entry['primitives'] += 1
+            for name, acc_idx in primitive['attributes'].items():
+                size = accessor_bytes(accessors[acc_idx])
+                entry['bytes'] += size
+                if acc_idx not in counted:
+                    attribute_bytes[name] += size
+                    counted.add(acc_idx)
+            if 'indices' in primitive:
+                acc_idx = primitive['indices']
+                size = accessor_bytes(accessors[acc_idx])
+                entry['bytes'] += size
+                if acc_idx not in counted:
+                    attribute_bytes['indices'] += size
+                    index_widths[COMPONENT_SIZES[accessors[acc_idx]['componentType']] * 8] += 1
+                    counted.add(acc_idx)
+        totals.update(entry)
+        entries.append({'name': labels[mesh_idx], **{key: int(value) for key, value in entry.items()}})
+
+    texture_bytes = 0
+    for image in gltf.get('images', []):
+        if 'bufferView' in image:
+            view = gltf['bufferViews'][image['bufferView']]
+            start = view.get('byteOffset', 0)
+            texture_bytes += png_gpu_bytes(blob[start:start + view['byteLength']])
+
+    geometry_bytes = sum(attribute_bytes.values())
+    entries.sort(key=lambda item: (item.get('triangles', 0), item.get('bytes', 0)), reverse=True)
+    file_bytes = path.stat().st_size
+    return {
+        'path': str(path),
+        'file_bytes': file_bytes,
+        'bin_bytes': len(blob),
+        'json_bytes': file_bytes - len(blob),
+        'gpu_bytes': geometry_bytes + texture_bytes,
+        'texture_gpu_bytes': texture_bytes,
+        'vertices': int(totals['vertices']),
+        'triangles': int(totals['triangles']),
+        'primitives': int(totals['primitives']),
+        'nodes': len(gltf.get('nodes', [])),
+        'meshes': len(gltf.get('meshes', [])),
+        'materials': len(gltf.get('materials', [])),
+        'accessors': len(accessors),
+        'max_country_triangles': max((item.get('triangles', 0) for item in entries), default=0),
+        'bytes_by_attribute': dict(sorted(attribute_bytes.items())),
+        'index_widths': {f'uint{bits}': count for bits, count in sorted(index_widths.items())},
+        'top_offenders': entries[:top],
+        'meshes_detail': entries,
+    }
+
+
+def load_budgets(path: Optional[Path]) -> Dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS)
+    if path:
+        with path.open() as f:
+            budgets.update(json.load(f))
+    return budgets
+
+
+def check_budgets(report: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    failures = []
+    for metric, limit in budgets.items():
+        value = report.get(metric)
+        if value is not None and value > limit:
+            failures.append(f'{metric} {value:,} exceeds budget {limit:,.0f}')
+    return failures
+
+
+def check_regressions(
+    report: Dict[str, Any],
+    previous: Optional[Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    if not previous:
+        return []
+    failures = []
+    for metric in REGRESSION_METRICS:
+        old, new = previous.get(metric), report.get(metric)
+        if not old or new is None:
+            continue
+        growth = (new - old) / old
+        if growth > threshold:
+            failures.append(f'{metric} grew {growth:.1%} ({old:,} -> {new:,})')
+    report['previous'] = {metric: previous.get(metric) for metric in REGRESSION_METRICS}
+    return failures
+
+
+def format_table(report: Dict[str, Any], budgets: Dict[str, float]) -> str:
+    lines = [f"Asset report for {report['path']}", '']
+    lines.append(f"{'metric':<24}{'value':>14}{'budget':>14}{'previous':>14}")
+    previous = report.get('previous') or {}
+    for metric in ('file_bytes', 'json_bytes', 'bin_bytes', 'gpu_bytes', 'vertices', 'triangles',
+                   'primitives', 'nodes', 'meshes', 'max_country_triangles'):
+        budget = budgets.get(metric)
+        prior = previous.get(metric)
+        lines.append(
+            f"{metric:<24}{report[metric]:>14,}"
+            f"{'' if budget is None else f'{budget:,.0f}':>14}"
+            f"{'' if prior is None else f'{prior:,}':>14}"
+        )
+    lines.append('')
+    lines.append('bytes by attribute: ' + ', '.join(f'{k}={v:,}' for k, v in report['bytes_by_attribute'].items()))
+    lines.append('index widths: ' + ', '.join(f'{k}x{v}' for k, v in report['index_widths'].items()))
+    lines.append('')
+    lines.append(f"{'top offenders':<24}{'tris':>10}{'verts':>10}{'bytes':>12}{'prims':>8}")
+    for item in report['top_offenders']:
+        lines.append(
+            f"{item['name']:<24}{item.get('triangles', 0):>10,}{item.get('vertices', 0):>10,}"
+            f"{item.get('bytes', 0):>12,}{item.get('primitives', 0):>8}"
+        )
+    return '\n'.join(lines)
+
+
+def run_report(
+    glb_path: Path = DEFAULT_GLB,
+    report_path: Optional[Path] = DEFAULT_REPORT,
+    previous_path: Optional[Path] = None,
+    budgets_path: Optional[Path] = None,
+    regression_threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+    top: int = DEFAULT_TOP,
+) -> int:
+    report = analyze_glb(glb_path, top=top)
+    budgets = load_budgets(budgets_path)
+
+    # By default the last written report is the previous build.
+    previous_path = previous_path or report_path
+    previous = None
+    if previous_path and previous_path.exists():
+        with previous_path.open() as f:
+            previous = json.load(f)
+
+    failures = check_budgets(report, budgets)
+    failures += check_regressions(report, previous, regression_threshold)
+    report['budgets'] = budgets
+    report['failures'] = failures
+    print(format_table(report, budgets))
+
+    if report_path and failures and previous_path and report_path.resolve() == previous_path.resolve():
+        # Keep the baseline; a failing build must not become the next run's reference.
+        report_path = report_path.with_name(f'{report_path.stem}.failed{report_path.suffix}')
+    if report_path:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with report_path.open('w') as f:
+            json.dump(report, f, indent=2)
+        logging.info('Asset report saved to %s', report_path)
+
+    for failure in failures:
+        logging.error(failure)
+    return 1 if failures else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Report vertex/triangle/byte budgets for an exported globe GLB.')
+    parser.add_argument(
+        'glb',
+        nargs='?',
+        type=Path,
+        default=DEFAULT_GLB,
+        help='GLB to analyse (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--report',
+        type=Path,
+        default=DEFAULT_REPORT,
+        help='Where to write the JSON report (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--previous',
+        type=Path,
+        help='Report of the previous build to compare against '
+             '(default: the existing --report file, which is only replaced when the checks pass).',
+    )
+    parser.add_argument(
+        '--budgets',
+        type=Path,
+        help='JSON object overriding the built-in budgets, e.g. {"triangles": 40000}.',
+    )
+    parser.add_argument(
+        '--regression-threshold',
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help='Relative growth over the previous build that fails the check (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=DEFAULT_TOP,
+        help='Number of largest countries to list (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(run_report(
+        glb_path=args.glb,
+        report_path=args.report,
+        previous_path=args.previous,
+        budgets_path=args.budgets,
+        regression_threshold=args.regression_threshold,
+        top=args.top,
+    ))
@@ -0,0 +1,273 @@
+"""
+Offline third-party dependencies for the scripts that run inside Blender.
+
+Blender's Python ships numpy but not pyshp or mapbox_earcut. Instead of
+pip-installing them on import (slow, online and resolving whatever is newest
+that day), the pinned wheels in blender_requirements.txt are kept in a wheel
+cache and unpacked once into a site directory for each interpreter:
+
+  # online, once: fetch the wheels for Blender's interpreter
+  blender --background --python scripts/globe_deps.py -- download
+  # offline (CI): unpack the cached wheels, no pip or network involved
+  blender --background --python scripts/globe_deps.py -- install
+
+activate() only puts that site directory on sys.path. lazy_import() returns
+the module without executing it; the import runs on first attribute access,
+so a script that never touches numpy never pays for it. Every deferred
+import is timed for startup_report().
+"""
+
+import hashlib
+import importlib.abc
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+import types
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REQUIREMENTS = SCRIPTS_DIR / 'blender_requirements.txt'
+WHEEL_DIR = Path(os.environ.get('GALLIGO_WHEEL_DIR', SCRIPTS_DIR.parent / 'vendor' / 'blender_wheels'))
+SITE_ROOT = Path(
+    os.environ.get('GALLIGO_BLENDER_SITE', Path(tempfile.gettempdir()) / 'galligo_globe_cache' / 'blender_site')
+)
+STAMP_NAME = 'globe_deps.json'
+
+LOAD_TIMES: Dict[str, float] = {}
+_ACTIVATED: Dict[str, float] = {}
+
+
+def interpreter_tag() -> str:
+    return f'{sys.implementation.cache_tag}-{sysconfig.get_platform().replace("-", "_").replace(".", "_")}'
+
+
+def site_dir() -> Path:
+    return SITE_ROOT / interpreter_tag()
+
+
+def read_requirements(path: Path = REQUIREMENTS) -> List[Tuple[str, str]]:
+    """(distribution, version) pins; comments and blank lines skipped."""
+    pins = []
+    for line in path.read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            name, _, version = line.partition('==')
+            pins.append((name.strip(), version.strip()))
+    return pins
+
+
+def requirements_hash(path: Path = REQUIREMENTS) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def normalise(name: str) -> str:
+    return name.lower().replace('-', '_').replace('.', '_')
+
+
+def platform_tags() -> List[str]:
+    """Platform parts of the wheel tags this interpreter accepts, most specific first."""
+    plat = sysconfig.get_platform().replace('-', '_').replace('.', '_')
+    if plat.startswith('linux_'):
+        arch = plat[len('linux_'):]
+        try:
+            libc = os.confstr('CS_GNU_LIBC_VERSION') or ''
+        except (AttributeError, ValueError, OSError):
+            libc = ''
+        name, _, version = libc.partition(' ')
+        if name != 'glibc' or not version:
+            return [plat]  # musl or unknown libc: only plain linux wheels
+        glibc_major, glibc_minor = (int(part) for part in version.split('.')[:2])
+        legacy = {(2, 17): 'manylinux2014', (2, 12): 'manylinux2010', (2, 5): 'manylinux1'}
+        tags = []
+        for minor in range(glibc_minor, 4, -1):
+            tags.append(f'manylinux_{glibc_major}_{minor}_{arch}')
+            if (glibc_major, minor) in legacy:
+                tags.append(f'{legacy[glibc_major, minor]}_{arch}')
+        return [plat] + tags
+    if plat.startswith('macosx_'):
+        _, major, minor, arch = plat.split('_', 3)
+        # Like packaging, accept wheels up to the running macOS, not just the build target.
+        running = platform.mac_ver()[0].split('.')
+        if running[0]:
+            major, minor = running[0], running[1] if len(running) > 1 and int(running[0]) == 10 else '0'
+        arches = [arch, 'universal2'] + (['universal'] if arch == 'x86_64' else [])
+        versions = [(int(major), m) for m in range(int(minor), -1, -1)] if int(major) == 10 else []
+        versions = [(m, 0) for m in range(int(major), 10, -1)] + (versions or [(10, m) for m in range(16, 8, -1)])
+        return [f'macosx_{ma}_{mi}_{a}' for ma, mi in versions for a in arches]
+    return [plat]
+
+
+def supported_tags() -> List[str]:
+    """This interpreter's wheel tags, most specific first, in the order packaging.tags.sys_tags uses.
+
+    Worked out from sys.implementation and sysconfig so install runs on a
+    Blender Python that has neither packaging nor pip.
+    """
+    major, minor = sys.version_info[:2]
+    platforms = platform_tags()
+    tags: List[str] = []
+    if sys.implementation.name == 'cpython':
+        interpreter = f'cp{major}{minor}'
+        abiflags = getattr(sys, 'abiflags', '')
+        abis = [interpreter + abiflags] + ([] if 't' in abiflags else ['abi3']) + ['none']
+        tags += [f'{interpreter}-{abi}-{plat}' for abi in abis for plat in platforms]
+        if 't' not in abiflags:
+            tags += [f'cp{major}{older}-abi3-{plat}' for older in range(minor - 1, 1, -1) for plat in platforms]
+    else:
+        interpreter = f'{sys.implementation.name}{major}{minor}'
+        tags += [f'{interpreter}-none-{plat}' for plat in platforms]
+    versions = [f'{major}{minor}', f'{major}'] + [f'{major}{older}' for older in range(minor - 1, -1, -1)]
+    tags += [f'py{version}-none-{plat}' for version in versions for plat in platforms]
+    tags.append(f'{interpreter}-none-any')
+    tags += [f'py{version}-none-any' for version in versions]
+    return tags
+
+
+def wheel_tags(path: Path) -> List[str]:
+    # name-version(-build)?-python-abi-platform.whl; each part may be a dotted set.
+    python, abi, platform = path.stem.split('-')[-3:]
+    return [f'{p}-{a}-{pl}' for p in python.split('.') for a in abi.split('.') for pl in platform.split('.')]
+
+
+def select_wheel(name: str, version: str, wheel_dir: Path, ranks: Dict[str, int]) -> Path:
+    candidates = []
+    for path in wheel_dir.glob('*.whl'):
+        dist, dist_version = path.stem.split('-')[:2]
+        if normalise(dist) != normalise(name) or dist_version != version:
+            continue
+        rank = min((ranks[tag] for tag in wheel_tags(path) if tag in ranks), default=None)
+        if rank is not None:
+            candidates.append((rank, path))
+    if not candidates:
+        raise FileNotFoundError(
+            f'No wheel for {name}=={version} compatible with {interpreter_tag()} in {wheel_dir}; '
+            f'run "globe_deps.py -- download" with network access first'
+        )
+    return min(candidates)[1]
+
+
+def download(wheel_dir: Path = WHEEL_DIR, requirements: Path = REQUIREMENTS) -> None:
+    """Fetch the pinned wheels for this interpreter. numpy is Blender's own, so dependencies are not followed."""
+    wheel_dir.mkdir(parents=True, exist_ok=True)
+    subprocess.check_call([
+        sys.executable, '-m', 'pip', 'download',
+        '--only-binary=:all:', '--no-deps',
+        '--dest', str(wheel_dir),
+        '-r', str(requirements),
+    ])
+
+
+def install(wheel_dir: Path = WHEEL_DIR, requirements: Path = REQUIREMENTS, target: Optional[Path] = None) -> Path:
+    """Unpack the pinned wheels into this interpreter's site directory and stamp it.
+
+    The wheels here are plain packages without install scripts, so unzipping
+    is the whole installation; pip is not needed and nothing is resolved.
+    """
+    target = target or site_dir()
+    started = time.perf_counter()
+    ranks = {tag: rank for rank, tag in enumerate(supported_tags())}
+    staging = target.with_name(f'.{target.name}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    wheels = {}
+    for name, version in read_requirements(requirements):
+        wheel = select_wheel(name, version, wheel_dir, ranks)
+        with zipfile.ZipFile(wheel) as zf:
+            zf.extractall(staging)
+        wheels[name] = wheel.name
+    stamp = {
+        'requirements_sha256': requirements_hash(requirements),
+        'interpreter': interpreter_tag(),
+        'python': sys.version.split()[0],
+        'wheels': wheels,
+    }
+    (staging / STAMP_NAME).write_text(json.dumps(stamp, indent=2))
+    shutil.rmtree(target, ignore_errors=True)
+    staging.replace(target)
+    print(f'Installed {len(wheels)} wheels into {target} in {(time.perf_counter() - started) * 1000:.0f} ms')
+    return target
+
+
+def activate(requirements: Path = REQUIREMENTS) -> bool:
+    """Put the installed site directory on sys.path; False when it is missing or stale."""
+    if _ACTIVATED:
+        return True
+    started = time.perf_counter()
+    target = site_dir()
+    try:
+        stamp = json.loads((target / STAMP_NAME).read_text())
+    except (OSError, ValueError):
+        return False
+    if stamp.get('requirements_sha256') != requirements_hash(requirements):
+        print(f'WARNING: {target} was installed for other requirements; run "globe_deps.py -- install"')
+        return False
+    sys.path.insert(0, str(target))
+    _ACTIVATED['ms'] = (time.perf_counter() - started) * 1000
+    return True
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a module's loader to record how long executing it takes."""
+
+    def __init__(self, name: str, loader: importlib.abc.Loader) -> None:
+        self.name = name
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        started = time.perf_counter()
+        self.loader.exec_module(module)
+        LOAD_TIMES[self.name] = (time.perf_counter() - started) * 1000
+
+
+class _MissingModule(types.ModuleType):
+    def __getattr__(self, attr: str):
+        raise ModuleNotFoundError(
+            f'{self.__name__} is not installed for this interpreter ({interpreter_tag()}); '
+            f'run "blender --background --python scripts/globe_deps.py -- install"',
+            name=self.__name__,
+        )
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module object for name whose code runs on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return _MissingModule(name)
+    spec.loader = importlib.util.LazyLoader(_TimedLoader(name, spec.loader))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def startup_report(startup_ms: float) -> str:
+    """Import-time cost of the calling script, plus what each deferred import cost when it was first used."""
+    loads = ', '.join(f'{name} {ms:.0f} ms' for name, ms in LOAD_TIMES.items()) or 'none'
+    site = f'vendored site added in {_ACTIVATED["ms"]:.1f} ms' if _ACTIVATED else 'no vendored site'
+    return f'Startup: {startup_ms:.0f} ms to import ({site}); loaded on first use: {loads}'
+
+
+if __name__ == '__main__':
+    # Under Blender the script's arguments follow a bare "--".
+    args = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    command = args[0] if args else 'install'
+    if command == 'download':
+        download()
+    elif command == 'install':
+        install()
+    else:
+        raise SystemExit(f'Unknown command {command}; expected download or install')
@@ -0,0 +1,231 @@
+"""
+Minimal glTF 2.0 binary (GLB) writer/reader for assets built outside Blender.
+
+Only what the globe pipeline needs: typed accessors from numpy arrays, meshes
+with one or more primitives, flat node lists and extras. Coordinates passed to
+the builder are expected in glTF's Y-up convention; use to_gltf_yup for
+positions produced by lonlat_to_xyz_array (Blender's Z-up), matching the
+export_yup=True conversion used for globe_interactive.glb.
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+GLB_MAGIC = 0x46546C67  # b'glTF'
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+MODE_LINES = 1
+MODE_TRIANGLES = 4
+
+COMPONENT_TYPES = {
+    np.dtype(np.int8): 5120,
+    np.dtype(np.uint8): 5121,
+    np.dtype(np.int16): 5122,
+    np.dtype(np.uint16): 5123,
+    np.dtype(np.uint32): 5125,
+    np.dtype(np.float32): 5126,
+}
+COMPONENT_SIZES = {5120: 1, 5121: 1, 5122: 2, 5123: 2, 5125: 4, 5126: 4}
+ACCESSOR_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4'}
+TYPE_WIDTHS = {name: width for width, name in ACCESSOR_TYPES.items()}
+TYPE_WIDTHS.update({'MAT2': 4, 'MAT3': 9, 'MAT4': 16})
+
+
+def to_gltf_yup(positions: np.ndarray) -> np.ndarray:
+    """Convert Z-up globe coordinates to glTF Y-up, as Blender's exporter does."""
+    positions = np.asarray(positions, dtype=np.float32)
+    return np.column_stack([positions[:, 0], positions[:, 2], -positions[:, 1]]).astype(np.float32)
+
+
+def smallest_index_dtype(vertex_count: int) -> np.dtype:
+    return np.dtype(np.uint16) if vertex_count <= 0xFFFF else np.dtype(np.uint32)
+
+
+class GlbBuilder:
+    def __init__(self, generator: str = 'galligo globe pipeline') -> None:
+        self.gltf: Dict[str, Any] = {
+            'asset': {'version': '2.0', 'generator': generator},
+            'scene': 0,
+            'scenes': [{'nodes': []}],
+            'nodes': [],
+            'meshes': [],
+            'materials': [],
+            'accessors': [],
+            'bufferViews': [],
+            'buffers': [],
+        }
+        self.blob = bytearray()
+
+    def add_accessor(
+        self,
+        array: np.ndarray,
+        target: Optional[int] = None,
+        with_bounds: bool = False,
+    ) -> int:
+        array = np.ascontiguousarray(array)
+        component_type = COMPONENT_TYPES[array.dtype]
+        width = 1 if array.ndim == 1 else array.shape[1]
+        self._align(4)
+        view: Dict[str, Any] = {
+            'buffer': 0,
+            'byteOffset': len(self.blob),
+            'byteLength': array.nbytes,
+        }
+        if target is not None:
+            view['target'] = target
+        self.blob.extend(array.tobytes())
+        self.gltf['bufferViews'].append(view)
+
+        accessor: Dict[str, Any] = {
+            'bufferView': len(self.gltf['bufferViews']) - 1,
+            'componentType': component_type,
+            'count': int(array.shape[0]),
+            'type': ACCESSOR_TYPES[width],
+        }
+        if with_bounds and array.size:
+            flat = array.reshape(array.shape[0], width)
+            accessor['min'] = [float(v) for v in flat.min(axis=0)]
+            accessor['max'] = [float(v) for v in flat.max(axis=0)]
+        self.gltf['accessors'].append(accessor)
+        return len(self.gltf['accessors']) - 1
+
+    def add_material(self, name: str, base_color: Tuple[float, float, float, float], **extra: Any) -> int:
+        material: Dict[str, Any] = {
+            'name': name,
+            'pbrMetallicRoughness': {
+                'baseColorFactor': list(base_color),
+                'metallicFactor': 0.0,
+                'roughnessFactor': 0.65,
+            },
+        }
+        if base_color[3] < 1.0:
+            material['alphaMode'] = 'BLEND'
+        material.update(extra)
+        self.gltf['materials'].append(material)
+        return len(self.gltf['materials']) - 1
+
+    def add_primitive(
+        self,
+        positions: np.ndarray,
+        indices: np.ndarray,
+        mode: int = MODE_TRIANGLES,
+        normals: Optional[np.ndarray] = None,
+        material: Optional[int] = None,
+        attributes: Optional[Dict[str, np.ndarray]] = None,
+    ) -> Dict[str, Any]:
+        prim_attributes = {
+            'POSITION': self.add_accessor(positions.astype(np.float32), ARRAY_BUFFER, with_bounds=True),
+        }
+        if normals is not None:
+            prim_attributes['NORMAL'] = self.add_accessor(normals.astype(np.float32), ARRAY_BUFFER)
+        for name, values in (attributes or {}).items():
+            prim_attributes[name] = self.add_accessor(values, ARRAY_BUFFER)
+        index_dtype = smallest_index_dtype(len(positions))
+        primitive: Dict[str, Any] = {
+            'attributes': prim_attributes,
+            'indices': self.add_accessor(indices.reshape(-1).astype(index_dtype), ELEMENT_ARRAY_BUFFER),
+            'mode': mode,
+        }
+        if material is not None:
+            primitive['material'] = material
+        return primitive
+
+    def add_mesh(self, name: str, primitives: List[Dict[str, Any]], extras: Optional[Dict[str, Any]] = None) -> int:
+        mesh: Dict[str, Any] = {'name': name, 'primitives': primitives}
+        if extras:
+            mesh['extras'] = extras
+        self.gltf['meshes'].append(mesh)
+        return len(self.gltf['meshes']) - 1
+
+    def add_node(
+        self,
+        name: str,
+        mesh: Optional[int] = None,
+        children: Optional[List[int]] = None,
+        extras: Optional[Dict[str, Any]] = None,
+        root: bool = True,
+    ) -> int:
+        node: Dict[str, Any] = {'name': name}
+        if mesh is not None:
+            node['mesh'] = mesh
+        if children:
+            node['children'] = children
+        if extras:
+            node['extras'] = extras
+        self.gltf['nodes'].append(node)
+        index = len(self.gltf['nodes']) - 1
+        if root:
+            self.gltf['scenes'][0]['nodes'].append(index)
+        return index
+
+    def to_bytes(self) -> bytes:
+        self._align(4)
+        gltf = {key: value for key, value in self.gltf.items() if value != []}
+        gltf['buffers'] = [{'byteLength': len(self.blob)}]
+        json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+        json_chunk += b' ' * (-len(json_chunk) % 4)
+        total = 12 + 8 + len(json_chunk) + 8 + len(self.blob)
+        return b''.join([
+            struct.pack('<III', GLB_MAGIC, GLB_VERSION, total),
+            struct.pack('<II', len(json_chunk), CHUNK_JSON),
+            json_chunk,
+            struct.pack('<II', len(self.blob), CHUNK_BIN),
+            bytes(self.blob),
+        ])
+
+    def write(self, path: Path) -> int:
+        data = self.to_bytes()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return len(data)
+
+    def _align(self, alignment: int) -> None:
+        self.blob.extend(b'\0' * (-len(self.blob) % alignment))
+
+
+def read_glb(path: Path) -> Tuple[Dict[str, Any], bytes]:
+    """Return the glTF JSON document and the BIN chunk of a GLB file."""
+    data = path.read_bytes()
+    magic, version, _ = struct.unpack_from('<III', data, 0)
+    if magic != GLB_MAGIC or version != GLB_VERSION:
+        raise ValueError(f'{path} is not a glTF 2.0 binary')
+    offset = 12
+    gltf: Optional[Dict[str, Any]] = None
+    blob = b''
+    while offset < len(data):
+        length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk)
+        elif chunk_type == CHUNK_BIN:
+            blob = chunk
+        offset += 8 + length
+    if gltf is None:
+        raise ValueError(f'{path} has no JSON chunk')
+    return gltf, blob
+
+
+def read_accessor(gltf: Dict[str, Any], blob: bytes, index: int) -> np.ndarray:
+    accessor = gltf['accessors'][index]
+    view = gltf['bufferViews'][accessor['bufferView']]
+    dtype = next(dt for dt, code in COMPONENT_TYPES.items() if code == accessor['componentType'])
+    width = TYPE_WIDTHS[accessor['type']]
+    offset = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    stride = view.get('byteStride')
+    array = np.ndarray(
+        shape=(accessor['count'], width),
+        dtype=dtype,
+        buffer=blob,
+        offset=offset,
+        strides=(stride or dtype.itemsize * width, dtype.itemsize),
+    )
+    return array[:, 0] if width == 1 else array
@@ -0,0 +1,422 @@
+"""
+Make-style runner for the globe toolchain.
+
+Each stage of the toolchain is a Stage with a command, declared input and
+output files, parameters and the stages it depends on:
+
+  dataset   download Natural Earth admin-0 (build_globe.download_dataset, in Blender)
+  meshes    clean, triangulate and tessellate (build_globe_meshes.py)
+  validate  subset sanity checks (globe_pipeline_test.py)
+  scene     Blender scene and GLB export (build_globe_scene.py)
+  report    GLB budget report (globe_asset_report.py)
+
+A stage's key is the SHA-256 of its command, parameters and the contents of
+its inputs (stage scripts included). A stage is skipped when its key matches
+the last successful run and its outputs still hash to what that run wrote.
+Inputs are hashed by content, so an upstream stage that reruns but writes
+identical bytes does not invalidate anything downstream. Independent stages
+run concurrently (validate alongside meshes and scene). Hashes are cached by
+size and mtime in the state file, so unchanged files are not re-read.
+
+  python scripts/globe_make.py globe            # everything that is stale
+  python scripts/globe_make.py scene --dry-run  # what would run for scene
+  python scripts/globe_make.py meshes --force   # rebuild regardless of state
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+CACHE_ROOT = Path(tempfile.gettempdir()) / 'galligo_globe_cache'
+DEFAULT_STATE = CACHE_ROOT / 'globe_make_state.json'
+DEFAULT_LOG_DIR = BASE_DIR / 'diagnostics/make_logs'
+DEFAULT_RESOLUTION = '50m'
+DEFAULT_LAKES_SHP = Path('/Users/joe/Desktop/ne_admin0_50m/ne_50m_lakes.shp')
+SHAPEFILE_SIDECARS = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+STATE_VERSION = 1
+ALIASES = {'globe': ['report', 'validate']}
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+@dataclass
+class Stage:
+    name: str
+    command: List[str]
+    inputs: List[Path] = field(default_factory=list)
+    outputs: List[Path] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    deps: List[str] = field(default_factory=list)
+    blender: bool = False
+
+
+class FileHasher:
+    """Content hashes memoised on (size, mtime_ns), persisted with the run state."""
+
+    def __init__(self, cache: Optional[Dict[str, List[Any]]] = None) -> None:
+        self.cache = cache or {}
+        self.lock = threading.Lock()
+
+    def digest(self, path: Path) -> Optional[str]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with path.open('rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with self.lock:
+            self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+
+def shapefile_components(path: Path) -> List[Path]:
+    return [path.with_suffix(suffix) for suffix in SHAPEFILE_SIDECARS]
+
+
+def dataset_shapefile(resolution: str) -> Path:
+    # Mirrors the cache layout of build_globe.download_dataset.
+    return CACHE_ROOT / resolution / f'ne_{resolution}_admin_0_countries.shp'
+
+
+def default_stages(
+    resolution: str = DEFAULT_RESOLUTION,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    blender: str = 'blender',
+) -> Dict[str, Stage]:
+    python = sys.executable
+    shapefile = dataset_shapefile(resolution)
+    mesh_data = BASE_DIR / 'assets/3d/globe_mesh_data.json'
+    adjacency = BASE_DIR / 'assets/3d/globe_adjacency.json'
+    glb = BASE_DIR / 'assets/3d/globe_interactive.glb'
+    report = BASE_DIR / 'diagnostics/globe_asset_report.json'
+    mesh_code = [
+        SCRIPTS_DIR / name
+        for name in ('build_globe_meshes.py', 'globe_geodesy.py', 'globe_adjacency.py', 'globe_triangulators.py')
+    ]
+    lakes = shapefile_components(lakes_shapefile) if lakes_shapefile else []
+    lakes_args = ['--lakes-shapefile', str(lakes_shapefile)] if lakes_shapefile else []
+
+    stages = [
+        Stage(
+            name='dataset',
+            command=[
+                blender, '--background', '--python-expr',
+                f'import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); '
+                f'import build_globe; build_globe.download_dataset({resolution!r})',
+            ],
+            outputs=[path for path in shapefile_components(shapefile) if path.suffix != '.cpg'],
+            params={'resolution': resolution},
+            blender=True,
+        ),
+        Stage(
+            name='meshes',
+            command=[
+                python, str(SCRIPTS_DIR / 'build_globe_meshes.py'),
+                '--shapefile', str(shapefile), '--output', str(mesh_data),
+                '--adjacency-output', str(adjacency), *lakes_args,
+            ],
+            inputs=[*shapefile_components(shapefile), *lakes, *mesh_code],
+            outputs=[mesh_data, adjacency],
+            deps=['dataset'],
+        ),
+        Stage(
+            name='validate',
+            command=[python, str(SCRIPTS_DIR / 'globe_pipeline_test.py'), '--shapefile', str(shapefile)],
+            inputs=[*shapefile_components(shapefile), *mesh_code, SCRIPTS_DIR / 'globe_pipeline_test.py'],
+            deps=['dataset'],
+        ),
+        Stage(
+            name='scene',
+            command=[blender, '--background', '--python', str(SCRIPTS_DIR / 'build_globe_scene.py')],
+            inputs=[mesh_data, SCRIPTS_DIR / 'build_globe_scene.py'],
+            outputs=[glb],
+            deps=['meshes'],
+            blender=True,
+        ),
+        Stage(
+            name='report',
+            command=[python, str(SCRIPTS_DIR / 'globe_asset_report.py'), str(glb), '--report', str(report)],
+            inputs=[glb, SCRIPTS_DIR / 'globe_asset_report.py', SCRIPTS_DIR / 'globe_glb.py'],
+            outputs=[report],
+            deps=['scene'],
+        ),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+def stage_key(stage: Stage, hasher: FileHasher) -> str:
+    # The interpreter/Blender path is left out so upgrading either does not invalidate every stage.
+    payload = {
+        'command': stage.command[1:],
+        'params': stage.params,
+        'inputs': {str(path): hasher.digest(path) for path in stage.inputs},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def output_digests(stage: Stage, hasher: FileHasher) -> Dict[str, Optional[str]]:
+    return {str(path): hasher.digest(path) for path in stage.outputs}
+
+
+def resolve_targets(stages: Dict[str, Stage], targets: Sequence[str]) -> List[str]:
+    """Requested stages plus everything upstream, in dependency order."""
+    ordered: List[str] = []
+    visiting: Set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f'Dependency cycle through stage {name}')
+        if name not in stages:
+            raise ValueError(f"Unknown stage {name}; known: {', '.join([*stages, *ALIASES])}")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(name)
+
+    for target in targets:
+        for name in ALIASES.get(target, [target]):
+            visit(name)
+    return ordered
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    if path.exists():
+        with path.open() as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+
+
+def save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with tmp.open('w') as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(path)
+
+
+def is_fresh(stage: Stage, key: str, record: Optional[Dict[str, Any]], hasher: FileHasher) -> bool:
+    if not record or record.get('key') != key:
+        return False
+    outputs = output_digests(stage, hasher)
+    return None not in outputs.values() and outputs == record.get('outputs')
+
+
+def run_stage(stage: Stage, log_dir: Path) -> int:
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_path = log_dir / f'{stage.name}.log'
+    env = dict(os.environ, GALLIGO_PROJECT_ROOT=str(BASE_DIR))
+    with log_path.open('w') as log:
+        result = subprocess.run(stage.command, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if result.returncode:
+        lines = log_path.read_text(errors='replace').splitlines()
+        logging.error('%s failed (exit %d); last lines of %s:\n%s', stage.name, result.returncode, log_path,
+                      '\n'.join(lines[-20:]))
+    return result.returncode
+
+
+def run_pipeline(
+    targets: Sequence[str] = ('globe',),
+    stages: Optional[Dict[str, Stage]] = None,
+    state_path: Path = DEFAULT_STATE,
+    log_dir: Path = DEFAULT_LOG_DIR,
+    jobs: int = 2,
+    force: Sequence[str] = (),
+    dry_run: bool = False,
+) -> int:
+    stages = stages or default_stages()
+    order = resolve_targets(stages, targets)
+    forced = set(order) if 'all' in force else set(force)
+    state = load_state(state_path)
+    hasher = FileHasher(state.get('files'))
+
+    done: Set[str] = set()
+    failed: Set[str] = set()
+    skipped: Set[str] = set()
+    ran: List[str] = []
+    running: Dict[Future, Tuple[str, str, float]] = {}
+    pending = list(order)
+
+    def ready(name: str) -> bool:
+        return all(dep in done for dep in stages[name].deps)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for name in [name for name in pending if ready(name)]:
+                pending.remove(name)
+                stage = stages[name]
+                key = stage_key(stage, hasher)
+                if name not in forced and is_fresh(stage, key, state['stages'].get(name), hasher):
+                    logging.info('%s: up to date', name)
+                    done.add(name)
+                    continue
+                if dry_run:
+                    logging.info('%s: would run %s', name, ' '.join(stage.command))
+                    done.add(name)
+                    continue
+                if stage.blender and not shutil.which(stage.command[0]):
+                    logging.error('%s: Blender executable %r not found (set --blender or $BLENDER)', name, stage.command[0])
+                    failed.add(name)
+                    continue
+                logging.info('%s: running', name)
+                running[pool.submit(run_stage, stage, log_dir)] = (name, key, time.perf_counter())
+
+            # Anything downstream of a failure can never become ready; pending is in
+            # dependency order, so one pass reaches the whole downstream closure.
+            for name in list(pending):
+                if any(dep in failed or dep in skipped for dep in stages[name].deps):
+                    logging.warning('%s: skipped because a dependency failed', name)
+                    pending.remove(name)
+                    skipped.add(name)
+            if not running:
+                if pending and not any(ready(name) for name in pending):
+                    for name in pending:
+                        logging.warning('%s: skipped, its dependencies can never finish', name)
+                    skipped.update(pending)
+                    break
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, key, started = running.pop(future)
+                elapsed = time.perf_counter() - started
+                if future.result():
+                    failed.add(name)
+                    continue
+                stage = stages[name]
+                missing = [str(path) for path in stage.outputs if not path.exists()]
+                if missing:
+                    logging.error('%s: finished but did not write %s', name, ', '.join(missing))
+                    failed.add(name)
+                    continue
+                # Keyed on the inputs seen at launch, so an input edited mid-run makes the stage stale again.
+                state['stages'][name] = {
+                    'key': key,
+                    'outputs': output_digests(stage, hasher),
+                    'seconds': round(elapsed, 2),
+                    'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                }
+                logging.info('%s: done in %.1fs', name, elapsed)
+                done.add(name)
+                ran.append(name)
+            if not dry_run:
+                state['files'] = hasher.cache
+                save_state(state_path, state)
+
+    if failed or skipped:
+        logging.error(
+            'Failed: %s; skipped: %s',
+            ', '.join(sorted(failed)) or 'none',
+            ', '.join(sorted(skipped)) or 'none',
+        )
+        return 1
+    logging.info('Ran %d of %d stages%s', len(ran), len(order), ' (dry run)' if dry_run else '')
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rebuild only the stale stages of the globe toolchain.')
+    parser.add_argument(
+        'targets',
+        nargs='*',
+        default=['globe'],
+        help="Stages to bring up to date; 'globe' is every stage (default: %(default)s)",
+    )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=2,
+        help='Stages to run at once (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--force',
+        nargs='*',
+        default=[],
+        help="Stages to run even when fresh; 'all' forces every stage in the build",
+    )
+    parser.add_argument(
+        '--dry-run',
+        '-n',
+        action='store_true',
+        help='Only report which stages would run.',
+    )
+    parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List stages with their inputs, outputs and dependencies, then exit.',
+    )
+    parser.add_argument(
+        '--resolution',
+        choices=['110m', '50m'],
+        default=DEFAULT_RESOLUTION,
+        help='Natural Earth resolution downloaded by the dataset stage (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--lakes-shapefile',
+        type=Path,
+        default=DEFAULT_LAKES_SHP,
+        help='Lakes shapefile passed to the mesh stage (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--blender',
+        default=os.environ.get('BLENDER', 'blender'),
+        help='Blender executable for the dataset and scene stages (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--state',
+        type=Path,
+        default=DEFAULT_STATE,
+        help='Where stage keys and file hashes are recorded (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--log-dir',
+        type=Path,
+        default=DEFAULT_LOG_DIR,
+        help='Per-stage output logs (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    pipeline = default_stages(args.resolution, args.lakes_shapefile, args.blender)
+    if args.list:
+        for stage in pipeline.values():
+            print(f"{stage.name}: deps={stage.deps} inputs={[str(p) for p in stage.inputs]} "
+                  f"outputs={[str(p) for p in stage.outputs]}")
+        sys.exit(0)
+    sys.exit(run_pipeline(
+        targets=args.targets,
+        stages=pipeline,
+        state_path=args.state,
+        log_dir=args.log_dir,
+        jobs=args.jobs,
+        force=args.force,
+        dry_run=args.dry_run,
+    ))
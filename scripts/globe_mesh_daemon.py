@@ -0,0 +1,451 @@
+"""
+Long-running mesh builder that keeps the expensive pipeline inputs warm.
+
+The daemon loads the dissolved countries, centroid lookup and lakes index once,
+then serves rebuild requests for individual ISO codes over a local TCP socket
+and rewrites only those entries in the output JSON. It polls the shapefiles,
+the enclave config and the rules modules (build_globe_meshes.py and the
+geodesy, adjacency and triangulator helpers it imports), so edits to hole rules
+are picked up without paying the start-up cost again; a rules edit rebuilds
+every country. Serve takes the same input and tolerance options as
+build_globe_meshes.py, so a daemon rebuild matches the CLI build.
+
+  python scripts/globe_mesh_daemon.py serve
+  python scripts/globe_mesh_daemon.py rebuild BRA ZAF
+  python scripts/globe_mesh_daemon.py status
+  python scripts/globe_mesh_daemon.py stop
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import build_globe_meshes
+import globe_adjacency
+import globe_geodesy
+import globe_triangulators
+from build_globe_meshes import (
+    DEFAULT_AREA_WARNING_THRESHOLD,
+    DEFAULT_CHORD_TOLERANCE,
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_TRIANGULATOR,
+    OUTPUT,
+    TRIANGULATORS,
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_POLL_INTERVAL = 1.0  # seconds
+CLIENT_TIMEOUT = 600.0  # a full rebuild after a shapefile change can take minutes
+# Reloaded in this order, so each module re-imports the already reloaded helpers it depends on.
+RULE_MODULES = (globe_geodesy, globe_adjacency, globe_triangulators, build_globe_meshes)
+
+
+class MeshDaemon:
+    def __init__(
+        self,
+        output_path: Path = OUTPUT,
+        shapefile: Path = DEFAULT_SHAPEFILE,
+        lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+        enclaves_config: Optional[Path] = None,
+        simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+        chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+        area_warning_threshold: float = DEFAULT_AREA_WARNING_THRESHOLD,
+        triangulator: str = DEFAULT_TRIANGULATOR,
+        simplify_tolerance_m: Optional[float] = None,
+    ) -> None:
+        self.module = build_globe_meshes
+        self.output_path = output_path
+        self.shapefile = shapefile
+        self.lakes_shapefile = lakes_shapefile
+        self.enclaves_config = enclaves_config
+        self.simplify_tolerance = simplify_tolerance
+        self.chord_tolerance = chord_tolerance
+        self.area_warning_threshold = area_warning_threshold
+        self.triangulator = triangulator
+        self.simplify_tolerance_m = simplify_tolerance_m
+        self.lock = threading.RLock()
+        self.inputs: Any = None
+        self.rows: Dict[str, Any] = {}
+        self.fragments: Dict[str, str] = {}
+        self.diagnostics: Dict[str, Dict[str, Any]] = {}
+        self.mtimes: Dict[Path, Optional[float]] = {}
+        self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Inputs and cache
+    # ------------------------------------------------------------------
+
+    def watched_paths(self) -> Dict[str, List[Path]]:
+        shapefile = Path(self.shapefile)
+        groups: Dict[str, List[Path]] = {
+            'shapefile': [shapefile, shapefile.with_suffix('.dbf')],
+            'lakes': [],
+            'enclaves': [],
+            'rules': [Path(module.__file__) for module in RULE_MODULES],
+        }
+        if self.lakes_shapefile:
+            groups['lakes'] = [self.lakes_shapefile, self.lakes_shapefile.with_suffix('.dbf')]
+        if self.enclaves_config:
+            groups['enclaves'] = [self.enclaves_config]
+        return groups
+
+    def snapshot_mtimes(self) -> None:
+        self.mtimes = {
+            path: _mtime(path)
+            for paths in self.watched_paths().values()
+            for path in paths
+        }
+
+    def load_inputs(self) -> None:
+        started = time.perf_counter()
+        self.inputs = self.module.load_pipeline_inputs(self.shapefile, self.lakes_shapefile, self.enclaves_config)
+        iso_col = self.inputs.iso_col
+        self.rows = {row[iso_col]: row for _, row in self.inputs.geodataframe.iterrows()}
+        logging.info(
+            'Loaded %d countries in %.1f ms',
+            len(self.rows),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def warm_cache(self, rebuild_all: bool = False) -> None:
+        if not rebuild_all and self.output_path.exists():
+            with self.output_path.open() as f:
+                existing = json.load(f)
+            self.fragments = {
+                iso: json.dumps(entry)
+                for iso, entry in existing.items()
+                if iso in self.rows
+            }
+            logging.info('Seeded cache with %d countries from %s', len(self.fragments), self.output_path)
+            stale = sorted(set(self.rows) - set(self.fragments))
+            if stale:
+                self.rebuild(stale)
+            return
+        self.rebuild(sorted(self.rows))
+
+    def start(self, rebuild_all: bool = False) -> None:
+        with self.lock:
+            self.load_inputs()
+            self.warm_cache(rebuild_all=rebuild_all)
+            self.snapshot_mtimes()
+
+    # ------------------------------------------------------------------
+    # Rebuilds
+    # ------------------------------------------------------------------
+
+    def rebuild(self, iso_codes: Iterable[str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        rebuilt: List[str] = []
+        skipped: List[str] = []
+        missing: List[str] = []
+        diagnostics: Dict[str, Dict[str, Any]] = {}
+        with self.lock:
+            for iso in iso_codes:
+                iso = iso.upper()
+                row = self.rows.get(iso)
+                if row is None:
+                    missing.append(iso)
+                    continue
+                entry, diag = self.module.build_country_entry(
+                    iso,
+                    row,
+                    self.inputs,
+                    simplify_tolerance=self.simplify_tolerance,
+                    chord_tolerance=self.chord_tolerance,
+                    triangulator=self.triangulator,
+                    simplify_tolerance_m=self.simplify_tolerance_m,
+                )
+                self.module.log_country_diagnostics(diag, self.area_warning_threshold)
+                self.diagnostics[iso] = diag
+                diagnostics[iso] = diag
+                if entry is None:
+                    self.fragments.pop(iso, None)
+                    skipped.append(iso)
+                    continue
+                self.fragments[iso] = json.dumps(self.module.to_json_entry(entry))
+                rebuilt.append(iso)
+            if rebuilt or skipped:
+                self.write_output()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logging.info('Rebuilt %d countries in %.1f ms', len(rebuilt), elapsed_ms)
+        return {
+            'rebuilt': rebuilt,
+            'skipped': skipped,
+            'missing': missing,
+            'elapsed_ms': round(elapsed_ms, 2),
+            'diagnostics': diagnostics,
+        }
+
+    def write_output(self) -> None:
+        # Entries are kept pre-serialised, so only rebuilt countries pay for json.dumps.
+        body = ', '.join(
+            f'{json.dumps(iso)}: {self.fragments[iso]}'
+            for iso in sorted(self.fragments)
+        )
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.output_path.with_name(self.output_path.name + '.tmp')
+        with tmp_path.open('w') as f:
+            f.write('{' + body + '}')
+        os.replace(tmp_path, self.output_path)
+
+    # ------------------------------------------------------------------
+    # Watching
+    # ------------------------------------------------------------------
+
+    def changed_groups(self) -> List[str]:
+        changed = []
+        for group, paths in self.watched_paths().items():
+            if any(_mtime(path) != self.mtimes.get(path) for path in paths):
+                changed.append(group)
+        return changed
+
+    def reload_rules(self) -> None:
+        for module in RULE_MODULES:
+            importlib.reload(module)
+            logging.info('Reloaded %s', module.__file__)
+        # Every cached entry was built by the old rules.
+        self.fragments.clear()
+
+    def poll_once(self) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            changed = self.changed_groups()
+            if not changed:
+                return None
+            logging.info('Detected changes in: %s', ', '.join(changed))
+            if 'rules' in changed:
+                self.reload_rules()
+            targets: List[str] = []
+            if 'shapefile' in changed or 'lakes' in changed:
+                self.load_inputs()
+                targets = sorted(self.rows)
+            elif 'enclaves' in changed:
+                previous = self.inputs.enclave_host_map
+                current = self.module.build_enclave_host_map(
+                    self.module.load_enclave_pairs(self.enclaves_config, self.inputs.enclave_pairs)
+                )
+                self.inputs.enclave_host_map = current
+                targets = sorted(
+                    host for host in set(previous) | set(current)
+                    if previous.get(host) != current.get(host)
+                )
+            if 'rules' in changed:
+                targets = sorted(self.rows)
+            self.snapshot_mtimes()
+            return self.rebuild(targets) if targets else {'rebuilt': [], 'reloaded': changed}
+
+    def watch(self, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(interval):
+            try:
+                self.poll_once()
+            except Exception:  # keep serving after a bad edit
+                logging.exception('Watch cycle failed')
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'countries': len(self.rows),
+                'cached': len(self.fragments),
+                'output': str(self.output_path),
+                'triangulator': self.triangulator,
+                'simplify_tolerance_m': self.simplify_tolerance_m,
+                'uptime_s': round(time.time() - self.started_at, 1),
+                'watched': {
+                    group: [str(path) for path in paths]
+                    for group, paths in self.watched_paths().items()
+                },
+            }
+
+
+# ----------------------------------------------------------------------
+# Socket protocol: one JSON object per line in, one JSON object per line out
+# ----------------------------------------------------------------------
+
+
+class DaemonServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, daemon: MeshDaemon) -> None:
+        super().__init__(address, DaemonRequestHandler)
+        self.daemon = daemon
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line or b'{}')
+            response = dispatch(self.server, request)
+        except Exception as exc:
+            logging.exception('Request failed')
+            response = {'error': str(exc)}
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+def dispatch(server: DaemonServer, request: Dict[str, Any]) -> Dict[str, Any]:
+    daemon = server.daemon
+    cmd = request.get('cmd')
+    if cmd == 'rebuild':
+        return daemon.rebuild(request.get('iso') or [])
+    if cmd == 'status':
+        return daemon.status()
+    if cmd == 'reload':
+        return daemon.poll_once() or {'rebuilt': [], 'reloaded': []}
+    if cmd == 'shutdown':
+        threading.Thread(target=server.shutdown, daemon=True).start()
+        return {'stopping': True}
+    raise ValueError(f'Unknown command: {cmd!r}')
+
+
+def send_command(payload: Dict[str, Any], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Dict[str, Any]:
+    with socket.create_connection((host, port), timeout=CLIENT_TIMEOUT) as sock:
+        sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as stream:
+            return json.loads(stream.readline())
+
+
+def serve(args: argparse.Namespace) -> None:
+    daemon = MeshDaemon(
+        output_path=args.output,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        enclaves_config=args.enclaves_config,
+        simplify_tolerance=args.simplify_tolerance,
+        chord_tolerance=args.chord_tolerance,
+        area_warning_threshold=args.area_warning_threshold,
+        triangulator=args.triangulator,
+        simplify_tolerance_m=args.simplify_tolerance_m,
+    )
+    daemon.start(rebuild_all=args.rebuild_all)
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=daemon.watch, args=(args.poll_interval, stop), daemon=True)
+    watcher.start()
+    with DaemonServer((args.host, args.port), daemon) as server:
+        logging.info('Mesh daemon listening on %s:%d', args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+    logging.info('Mesh daemon stopped')
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Keep the globe mesh pipeline warm and rebuild countries on demand.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Bind/connect address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Bind/connect port (default: %(default)s)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='Load inputs once and serve rebuild requests.')
+    serve_parser.add_argument('--output', type=Path, default=OUTPUT, help='Output JSON path (default: %(default)s)')
+    serve_parser.add_argument(
+        '--shapefile',
+        type=Path,
+        default=DEFAULT_SHAPEFILE,
+        help='Natural Earth admin-0 countries shapefile; watched for changes (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--simplify-tolerance',
+        type=float,
+        default=DEFAULT_SIMPLIFY_TOLERANCE,
+        help='Simplification tolerance in degrees (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--simplify-tolerance-m',
+        type=float,
+        help='Simplify with this error in metres on the sphere instead of --simplify-tolerance degrees.',
+    )
+    serve_parser.add_argument(
+        '--triangulator',
+        choices=['auto', *TRIANGULATORS],
+        default=DEFAULT_TRIANGULATOR,
+        help='Polygon triangulation backend (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--chord-tolerance',
+        type=float,
+        default=DEFAULT_CHORD_TOLERANCE,
+        help='Max chord sag below the sphere before edges are split (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--area-warning-threshold',
+        type=float,
+        default=DEFAULT_AREA_WARNING_THRESHOLD,
+        help='Relative area loss fraction that triggers warnings (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--lakes-shapefile',
+        type=Path,
+        default=DEFAULT_LAKES_SHP,
+        help='Optional Natural Earth lakes shapefile (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--enclaves-config',
+        type=Path,
+        help='Optional JSON list of [child_iso, host_iso] pairs; watched for changes.',
+    )
+    serve_parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help='Seconds between input file checks (default: %(default)s)',
+    )
+    serve_parser.add_argument(
+        '--rebuild-all',
+        action='store_true',
+        help='Rebuild every country at start-up instead of seeding from the existing output.',
+    )
+
+    rebuild_parser = sub.add_parser('rebuild', help='Ask a running daemon to rebuild ISO codes.')
+    rebuild_parser.add_argument('iso', nargs='+', help='ISO3 codes to rebuild')
+    sub.add_parser('status', help='Show daemon state.')
+    sub.add_parser('reload', help='Check watched inputs now instead of waiting for the next poll.')
+    sub.add_parser('stop', help='Shut the daemon down.')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.command == 'serve':
+        serve(args)
+        return
+
+    if args.command == 'rebuild':
+        payload = {'cmd': 'rebuild', 'iso': [code.upper() for code in args.iso]}
+    elif args.command == 'stop':
+        payload = {'cmd': 'shutdown'}
+    else:
+        payload = {'cmd': args.command}
+    try:
+        response = send_command(payload, host=args.host, port=args.port)
+    except OSError as exc:
+        raise SystemExit(f'Could not reach mesh daemon at {args.host}:{args.port}: {exc}')
+    json.dump(response, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if response.get('error') or response.get('missing'):
+        raise SystemExit(1)
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+if __name__ == '__main__':
+    main()
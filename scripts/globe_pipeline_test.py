@@ -1,16 +1,16 @@
 import argparse
 import logging
+from pathlib import Path
 from typing import Sequence
 
 from build_globe_meshes import (
+    DEFAULT_CHORD_TOLERANCE,
     DEFAULT_SIMPLIFY_TOLERANCE,
     DEFAULT_LAKES_SHP,
-    build_centroid_lookup,
-    build_enclave_host_map,
-    load_lakes_index,
-    load_shapefile,
-    make_valid_geometry,
+    DEFAULT_SHAPEFILE,
+    load_pipeline_inputs,
     prepare_country_geometry,
+    tessellate_spherical_mesh,
     triangulate_geometry,
 )
 
@@ -28,13 +28,17 @@ DEFAULT_TEST_ISOS = [
 ]
 
 
-def run_subset_checks(simplify_tolerance: float, iso_codes: Sequence[str]) -> None:
-    gdf, iso_col = load_shapefile()
-    gdf = gdf.copy()
-    gdf['geometry'] = gdf['geometry'].apply(make_valid_geometry)
-    centroids = build_centroid_lookup(gdf, iso_col)
-    enclave_map = build_enclave_host_map()
-    lakes_index = load_lakes_index(DEFAULT_LAKES_SHP)
+def run_subset_checks(
+    simplify_tolerance: float,
+    iso_codes: Sequence[str],
+    chord_tolerance: float = DEFAULT_CHORD_TOLERANCE,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+) -> None:
+    inputs = load_pipeline_inputs(shapefile, DEFAULT_LAKES_SHP, iso_filter=iso_codes)
+    gdf, iso_col = inputs.geodataframe, inputs.iso_col
+    centroids = inputs.centroid_lookup
+    enclave_map = inputs.enclave_host_map
+    lakes_index = inputs.lakes_index
 
     processed = []
     iso_values = set(gdf[iso_col].tolist())
@@ -55,15 +59,15 @@ def run_subset_checks(simplify_tolerance: float, iso_codes: Sequence[str]) -> No
         assert diag['final_holes'] == diag['expected_enclaves'], (
             f"{iso} unexpected hole count {diag['final_holes']} vs enclaves {diag['expected_enclaves']}"
         )
-        tri = triangulate_geometry(geom, iso=iso)
-        assert tri is not None, f'{iso} triangulation returned nothing'
-        verts, faces = tri
-        assert verts and faces, f'{iso} produced empty mesh'
+        mesh = triangulate_geometry(geom, iso=iso)
+        assert mesh is not None, f'{iso} triangulation returned nothing'
+        assert mesh.vertex_count and mesh.face_count, f'{iso} produced empty mesh'
+        mesh = tessellate_spherical_mesh(mesh, chord_tolerance)
         processed.append(
             {
                 'iso': iso,
-                'vertices': len(verts),
-                'triangles': len(faces),
+                'vertices': mesh.vertex_count,
+                'triangles': mesh.face_count,
                 'islands': diag['island_count'],
             }
         )
@@ -84,6 +88,12 @@ def run_subset_checks(simplify_tolerance: float, iso_codes: Sequence[str]) -> No
 
 def main():
     parser = argparse.ArgumentParser(description='Sanity check the globe mesh pipeline on a subset of countries.')
+    parser.add_argument(
+        '--shapefile',
+        type=Path,
+        default=DEFAULT_SHAPEFILE,
+        help='Natural Earth admin-0 countries shapefile (default: %(default)s)',
+    )
     parser.add_argument(
         '--simplify-tolerance',
         type=float,
@@ -96,9 +106,20 @@ def main():
         default=DEFAULT_TEST_ISOS,
         help='ISO codes to test (default subset covers enclaves + large countries)',
     )
+    parser.add_argument(
+        '--chord-tolerance',
+        type=float,
+        default=DEFAULT_CHORD_TOLERANCE,
+        help='Max chord sag below the sphere before edges are split; 0 disables (default: %(default)s)',
+    )
     args = parser.parse_args()
     logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
-    run_subset_checks(args.simplify_tolerance, [code.upper() for code in args.iso])
+    run_subset_checks(
+        args.simplify_tolerance,
+        [code.upper() for code in args.iso],
+        chord_tolerance=args.chord_tolerance,
+        shapefile=args.shapefile,
+    )
 
 
 if __name__ == '__main__':
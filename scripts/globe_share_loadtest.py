@@ -0,0 +1,240 @@
+"""
+Local load test for globe_share_service.py.
+
+Starts the service in-process on a free port (or targets --url), then fires
+--requests GET /globe.glb requests from --concurrency threads. Visited sets
+are drawn from a pool of --unique sets with Zipf-like popularity, so popular
+sets repeat and exercise the caches while the tail keeps building. Latency
+is measured client side, per request, including transfer, next to the
+service's own render time (X-Render-Ms); the report gives p50/p90/p99/max
+overall and per cache source (X-Globe-Cache: memory, disk, built, shared),
+throughput, errors and the service's cache counters. The in-process client
+shares the interpreter with the service, so its numbers include that
+contention; point --url at a separate process for cleaner client figures.
+
+  python scripts/globe_share_loadtest.py --requests 2000 --concurrency 16
+  python scripts/globe_share_loadtest.py --cold
+  python scripts/globe_share_loadtest.py --url http://127.0.0.1:8766
+"""
+
+import argparse
+import json
+import logging
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import numpy as np
+
+from globe_share_service import DEFAULT_MEMORY_MB, MESH_DATA, STYLES, PersonalGlobeService, ShareServer
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT = BASE_DIR / 'diagnostics/globe_share_loadtest.json'
+DEFAULT_REQUESTS = 1000
+DEFAULT_CONCURRENCY = 8
+DEFAULT_UNIQUE = 200
+ZIPF_EXPONENT = 1.1
+MAX_VISITED = 60
+REQUEST_TIMEOUT = 30.0
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def fetch_json(url: str) -> Any:
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        return json.load(response)
+
+
+def make_workload(
+    codes: Sequence[str],
+    styles: Sequence[str],
+    requests: int,
+    unique: int,
+    seed: int,
+) -> List[Tuple[List[str], str]]:
+    rng = random.Random(seed)
+    pool = [
+        (sorted(rng.sample(codes, rng.randint(1, min(MAX_VISITED, len(codes))))), rng.choice(styles))
+        for _ in range(unique)
+    ]
+    weights = [1.0 / (rank + 1) ** ZIPF_EXPONENT for rank in range(unique)]
+    return rng.choices(pool, weights=weights, k=requests)
+
+
+def timed_request(base_url: str, visited: List[str], style: str) -> Tuple[float, float, str, int]:
+    url = f"{base_url}/globe.glb?{urlencode({'visited': ','.join(visited), 'style': style})}"
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+            size = len(response.read())
+            source = response.headers.get('X-Globe-Cache', 'unknown')
+            render_ms = float(response.headers.get('X-Render-Ms', 'nan'))
+    except (urllib.error.URLError, OSError) as exc:
+        logging.warning('Request failed: %s', exc)
+        return (time.perf_counter() - started) * 1000, float('nan'), 'error', 0
+    return (time.perf_counter() - started) * 1000, render_ms, source, size
+
+
+def percentiles(latencies: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray(latencies, dtype=np.float64)
+    if not len(values):
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        'count': int(len(values)),
+        'p50_ms': round(float(p50), 2),
+        'p90_ms': round(float(p90), 2),
+        'p99_ms': round(float(p99), 2),
+        'max_ms': round(float(values.max()), 2),
+    }
+
+
+def run_load_test(
+    base_url: str,
+    requests: int = DEFAULT_REQUESTS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    unique: int = DEFAULT_UNIQUE,
+    styles: Sequence[str] = tuple(STYLES),
+    seed: int = 0,
+    output_path: Optional[Path] = DEFAULT_OUTPUT,
+) -> Dict[str, Any]:
+    codes = fetch_json(f'{base_url}/countries')
+    workload = make_workload(codes, styles, requests, unique, seed)
+    logging.info('Sending %d requests (%d distinct) with %d threads to %s', requests, unique, concurrency, base_url)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda item: timed_request(base_url, *item), workload))
+    wall_s = time.perf_counter() - started
+
+    by_source: Dict[str, List[float]] = {}
+    for latency, _, source, _ in results:
+        by_source.setdefault(source, []).append(latency)
+    ok = [latency for latency, _, source, _ in results if source != 'error']
+    render = [render_ms for _, render_ms, source, _ in results if source != 'error']
+    report = {
+        'requests': requests,
+        'concurrency': concurrency,
+        'unique_sets': unique,
+        'styles': list(styles),
+        'seed': seed,
+        'wall_s': round(wall_s, 3),
+        'throughput_rps': round(requests / wall_s, 1) if wall_s else None,
+        'errors': len(by_source.get('error', [])),
+        'mean_bytes': round(float(np.mean([size for _, _, source, size in results if source != 'error'] or [0]))),
+        'latency': percentiles(ok),
+        'render_latency': percentiles(render),
+        'by_source': {source: percentiles(values) for source, values in sorted(by_source.items())},
+        'service': fetch_json(f'{base_url}/status'),
+    }
+
+    latency = report['latency']
+    print(f"{'source':<10}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for source, stats in [('all', latency), ('server', report['render_latency']), *report['by_source'].items()]:
+        if stats:
+            print(f"{source:<10}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+                  f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    logging.info('%.1f requests/s over %.2f s, %d errors', report['throughput_rps'] or 0, wall_s, report['errors'])
+
+    if output_path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open('w') as f:
+            json.dump(report, f, indent=2)
+        logging.info('Load test report saved to %s', output_path)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure globe share service latency under concurrent load.')
+    parser.add_argument(
+        '--url',
+        help='Running service to test; by default one is started in-process on a free port',
+    )
+    parser.add_argument(
+        '--mesh-data',
+        type=Path,
+        default=MESH_DATA,
+        help='Mesh data for the in-process service (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--cold',
+        action='store_true',
+        help='Give the in-process service an empty temporary disk cache instead of the shared one.',
+    )
+    parser.add_argument(
+        '--memory-mb',
+        type=int,
+        default=DEFAULT_MEMORY_MB,
+        help='In-memory LRU budget of the in-process service (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--requests',
+        type=int,
+        default=DEFAULT_REQUESTS,
+        help='Total requests (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help='Client threads (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--unique',
+        type=int,
+        default=DEFAULT_UNIQUE,
+        help='Distinct (visited set, style) pairs to draw requests from (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--style',
+        nargs='*',
+        choices=list(STYLES),
+        default=list(STYLES),
+        help='Style presets to mix (default: all)',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Workload seed (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help='JSON report (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    test_args = dict(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        unique=args.unique,
+        styles=args.style,
+        seed=args.seed,
+        output_path=args.output,
+    )
+    if args.url:
+        run_load_test(args.url.rstrip('/'), **test_args)
+    else:
+        with tempfile.TemporaryDirectory() as cold_dir:
+            service_kwargs = {'disk_dir': Path(cold_dir)} if args.cold else {}
+            service = PersonalGlobeService(
+                mesh_data=args.mesh_data, memory_bytes=args.memory_mb << 20, **service_kwargs
+            )
+            with ShareServer(('127.0.0.1', 0), service) as server:
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                try:
+                    run_load_test(f'http://127.0.0.1:{server.server_address[1]}', **test_args)
+                finally:
+                    server.shutdown()
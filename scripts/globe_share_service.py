@@ -0,0 +1,613 @@
+"""
+Personalised globe GLBs for share cards and web embeds, without Blender.
+
+The service loads globe_mesh_data.json once and keeps every country's
+Y-up positions, normals and indices ready to copy into a GLB, so a request
+only assembles buffers: visited countries get MAT_VisitedCountry and, with
+an extruding style, are raised with side walls; the rest keep
+MAT_UnvisitedCountry, and the node layout (GLOBE_Root > GLOBE_Countries >
+GEO-ISO, GLOBE_Ocean) matches globe_interactive.glb.
+
+Results are keyed by the visited set, the style and the mesh data's hash.
+An in-memory LRU (bounded in bytes) sits in front of an on-disk cache, and
+concurrent requests for the same key wait for one build instead of racing.
+
+  python scripts/globe_share_service.py serve --port 8766
+  curl 'http://127.0.0.1:8766/globe.glb?visited=FRA,DEU,JPN&style=extruded' -o globe.glb
+  python scripts/globe_share_service.py render FRA DEU --style visited-only -o globe.glb
+
+POST /globe.glb takes {"visited": [...], "style": name or {field: value}}.
+GET /status reports cache sizes and hit counts, GET /countries the ISO codes.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from globe_glb import GlbBuilder, to_gltf_yup
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+MESH_DATA = BASE_DIR / 'assets/3d/globe_mesh_data.json'
+DEFAULT_DISK_CACHE = Path(tempfile.gettempdir()) / 'galligo_globe_cache' / 'personal_glb'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+DEFAULT_MEMORY_MB = 256
+DEFAULT_DISK_MB = 2048
+SERVICE_FORMAT = 1  # bump when the GLB layout changes so cached files are not reused
+COUNTRY_RADIUS = 10.05  # build_globe_meshes.COUNTRY_RADIUS
+OCEAN_RADIUS = 10.0  # build_globe_scene.OCEAN_RADIUS
+OCEAN_SEGMENTS = 32
+OCEAN_RINGS = 16
+MAX_EXTRUDE = 2.0  # world units
+EXTRUDE_STEP = 0.01  # requested heights are snapped to this, so near-identical styles share a cache key
+
+Color = Tuple[float, float, float, float]
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+@dataclass(frozen=True)
+class GlobeStyle:
+    visited_color: Color = (0.231, 0.510, 0.965, 1.0)
+    unvisited_color: Color = (0.878, 0.878, 0.878, 0.85)  # MAT_UnvisitedCountry in build_globe_scene.py
+    ocean_color: Color = (0.082, 0.106, 0.129, 1.0)  # MAT_Ocean
+    extrude: float = 0.0  # world units visited countries are raised by, with side walls
+    include_unvisited: bool = True
+    include_ocean: bool = True
+    normals: bool = True
+
+
+STYLES: Dict[str, GlobeStyle] = {
+    'default': GlobeStyle(),
+    'extruded': GlobeStyle(extrude=0.25),
+    'visited-only': GlobeStyle(include_unvisited=False, include_ocean=False),
+}
+
+
+def parse_style(value: Union[None, str, Dict[str, Any]]) -> GlobeStyle:
+    """A preset name, or a dict of GlobeStyle fields over the preset named by its 'base' (default: default)."""
+    if value is None or isinstance(value, str):
+        name = value or 'default'
+        if name not in STYLES:
+            raise ValueError(f"Unknown style {name!r}; expected one of {', '.join(STYLES)} or a JSON object")
+        return STYLES[name]
+    overrides = dict(value)
+    base = parse_style(overrides.pop('base', None))
+    known = {field.name for field in fields(GlobeStyle)}
+    unknown = sorted(set(overrides) - known)
+    if unknown:
+        raise ValueError(f"Unknown style fields: {', '.join(unknown)}")
+    for name in ('visited_color', 'unvisited_color', 'ocean_color'):
+        if name in overrides:
+            color = tuple(float(channel) for channel in overrides[name])
+            if len(color) != 4 or not all(0.0 <= channel <= 1.0 for channel in color):
+                raise ValueError(f'{name} must be four values in [0, 1]')
+            overrides[name] = color
+    if 'extrude' in overrides:
+        overrides['extrude'] = round(round(float(overrides['extrude']) / EXTRUDE_STEP) * EXTRUDE_STEP, 6)
+        if not 0.0 <= overrides['extrude'] <= MAX_EXTRUDE:
+            raise ValueError(f'extrude must be in [0, {MAX_EXTRUDE}]')
+    for name in ('include_unvisited', 'include_ocean', 'normals'):
+        if name in overrides:
+            overrides[name] = bool(overrides[name])
+    return replace(base, **overrides)
+
+
+def uv_sphere(segments: int, rings: int, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Z-up UV sphere like Blender's primitive_uv_sphere_add, triangles wound outward."""
+    lat = np.linspace(np.pi / 2, -np.pi / 2, rings + 1)[1:-1]
+    lon = np.linspace(0.0, 2 * np.pi, segments, endpoint=False)
+    lat_grid, lon_grid = np.meshgrid(lat, lon, indexing='ij')
+    ring_points = np.column_stack([
+        (np.cos(lat_grid) * np.cos(lon_grid)).ravel(),
+        (np.cos(lat_grid) * np.sin(lon_grid)).ravel(),
+        np.sin(lat_grid).ravel(),
+    ])
+    positions = np.vstack([[0.0, 0.0, 1.0], ring_points, [0.0, 0.0, -1.0]]) * radius
+    south = len(positions) - 1
+    nxt = (np.arange(segments) + 1) % segments
+    cur = np.arange(segments)
+    faces = [np.column_stack([np.zeros(segments, dtype=np.int64), 1 + cur, 1 + nxt])]
+    for ring in range(rings - 2):
+        top, bottom = 1 + ring * segments, 1 + (ring + 1) * segments
+        faces.append(np.column_stack([top + cur, bottom + cur, bottom + nxt]))
+        faces.append(np.column_stack([top + cur, bottom + nxt, top + nxt]))
+    last = 1 + (rings - 2) * segments
+    faces.append(np.column_stack([np.full(segments, south), last + nxt, last + cur]))
+    return positions, np.vstack(faces)
+
+
+def boundary_edges(indices: np.ndarray) -> np.ndarray:
+    """Directed edges (a, b) of faces whose reverse edge does not exist: the outline, interior on the left."""
+    edges = np.concatenate([indices[:, [0, 1]], indices[:, [1, 2]], indices[:, [2, 0]]]).astype(np.int64)
+    count = int(edges.max()) + 1
+    codes = edges[:, 0] * count + edges[:, 1]
+    reverse = edges[:, 1] * count + edges[:, 0]
+    return edges[~np.isin(reverse, codes)]
+
+
+@dataclass
+class CountryBuffers:
+    """One country's GLB-ready arrays; the outline is kept so extruded variants are cheap to build per request."""
+
+    iso: str
+    name: str
+    positions: np.ndarray  # float32, Y-up
+    normals: np.ndarray
+    indices: np.ndarray  # uint32
+    outline: np.ndarray  # directed boundary edges
+
+    def extruded(self, height: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Raised cap plus outward-facing walls down to the surface, walls with flat normals."""
+        top = self.positions * np.float32((COUNTRY_RADIUS + height) / COUNTRY_RADIUS)
+        a, b = self.outline[:, 0], self.outline[:, 1]
+        base_a, base_b, top_a, top_b = self.positions[a], self.positions[b], top[a], top[b]
+        # Interior lies left of a->b seen from outside, so (b - a) x up points away from the country.
+        wall_normal = np.cross(base_b - base_a, top_a - base_a)
+        wall_normal /= np.maximum(np.linalg.norm(wall_normal, axis=1, keepdims=True), 1e-12)
+        wall_positions = np.stack([base_a, base_b, top_b, top_a], axis=1).reshape(-1, 3)
+        wall_normals = np.repeat(wall_normal, 4, axis=0)
+        first = len(top) + 4 * np.arange(len(self.outline), dtype=np.uint32)[:, None]
+        wall_indices = (first + np.array([[0, 1, 2, 0, 2, 3]], dtype=np.uint32)).reshape(-1, 3)
+        return (
+            np.vstack([top, wall_positions]).astype(np.float32),
+            np.vstack([self.normals, wall_normals]).astype(np.float32),
+            np.vstack([self.indices, wall_indices]),
+        )
+
+
+def load_country_buffers(path: Path) -> Tuple[Dict[str, CountryBuffers], str]:
+    """Country buffers keyed by ISO code, and the SHA-256 of the mesh data they came from."""
+    raw = path.read_bytes()
+    countries: Dict[str, CountryBuffers] = {}
+    for iso, entry in sorted(json.loads(raw).items()):
+        verts = np.asarray(entry.get('verts') or entry.get('vertices') or [], dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(entry.get('faces') or [], dtype=np.uint32).reshape(-1, 3)
+        if not len(verts) or not len(faces):
+            continue
+        positions = to_gltf_yup(verts)
+        countries[iso.upper()] = CountryBuffers(
+            iso=iso.upper(),
+            name=entry.get('name', iso),
+            positions=positions,
+            normals=positions / np.linalg.norm(positions, axis=1, keepdims=True),
+            indices=faces,
+            outline=boundary_edges(faces),
+        )
+    return countries, hashlib.sha256(raw).hexdigest()
+
+
+class LruCache:
+    """Thread-safe LRU of GLB bytes bounded by total size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            data = self.entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class DiskCache:
+    """GLBs as <dir>/<key[:2]>/<key>.glb, written atomically; the least recently read go first when full."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        self.size = sum(path.stat().st_size for path in directory.glob('*/*.glb'))
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.glb'
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.size += len(data)
+            if self.size > self.max_bytes:
+                self.prune()
+
+    def prune(self) -> None:
+        files = sorted(self.directory.glob('*/*.glb'), key=lambda path: path.stat().st_mtime)
+        self.size = sum(path.stat().st_size for path in files)
+        while files and self.size > self.max_bytes * 0.9:
+            path = files.pop(0)
+            self.size -= path.stat().st_size
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'directory': str(self.directory),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+@dataclass
+class RenderResult:
+    key: str
+    glb: bytes
+    source: str  # memory, disk, built or shared (waited for a concurrent build)
+    elapsed_ms: float
+
+
+class PersonalGlobeService:
+    def __init__(
+        self,
+        mesh_data: Path = MESH_DATA,
+        memory_bytes: int = DEFAULT_MEMORY_MB << 20,
+        disk_dir: Optional[Path] = DEFAULT_DISK_CACHE,
+        disk_bytes: int = DEFAULT_DISK_MB << 20,
+    ) -> None:
+        started = time.perf_counter()
+        self.countries, self.data_hash = load_country_buffers(mesh_data)
+        ocean_positions, ocean_indices = uv_sphere(OCEAN_SEGMENTS, OCEAN_RINGS, OCEAN_RADIUS)
+        self.ocean = (to_gltf_yup(ocean_positions), ocean_indices.astype(np.uint32))
+        self.memory = LruCache(memory_bytes)
+        self.disk = DiskCache(disk_dir, disk_bytes) if disk_dir else None
+        self.lock = threading.Lock()
+        self.inflight: Dict[str, Future] = {}
+        self.builds = self.shared = 0
+        logging.info('Loaded %d countries from %s in %.1f ms', len(self.countries), mesh_data,
+                     (time.perf_counter() - started) * 1000)
+
+    def normalise_visited(self, visited: Iterable[str]) -> List[str]:
+        codes = sorted({code.strip().upper() for code in visited if code.strip()})
+        unknown = [code for code in codes if code not in self.countries]
+        if unknown:
+            raise ValueError(f"Unknown ISO codes: {', '.join(unknown)}")
+        return codes
+
+    def cache_key(self, visited: List[str], style: GlobeStyle) -> str:
+        payload = {'format': SERVICE_FORMAT, 'data': self.data_hash, 'visited': visited, 'style': asdict(style)}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def render(
+        self,
+        visited: Iterable[str],
+        style: Union[None, str, Dict[str, Any], GlobeStyle] = None,
+    ) -> RenderResult:
+        started = time.perf_counter()
+        style = style if isinstance(style, GlobeStyle) else parse_style(style)
+        codes = self.normalise_visited(visited)
+        key = self.cache_key(codes, style)
+
+        data = self.memory.get(key)
+        if data is not None:
+            return RenderResult(key, data, 'memory', (time.perf_counter() - started) * 1000)
+
+        # Single flight: the first request for a key builds it, concurrent ones wait for that build.
+        with self.lock:
+            pending = self.inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.inflight[key] = Future()
+        if not owner:
+            data, _ = pending.result()
+            with self.lock:
+                self.shared += 1
+            return RenderResult(key, data, 'shared', (time.perf_counter() - started) * 1000)
+
+        try:
+            data = self.disk.get(key) if self.disk else None
+            source = 'disk'
+            if data is None:
+                data = self.assemble(codes, style)
+                source = 'built'
+                with self.lock:
+                    self.builds += 1
+                if self.disk:
+                    self.disk.put(key, data)
+            self.memory.put(key, data)
+            pending.set_result((data, source))
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+        return RenderResult(key, data, source, (time.perf_counter() - started) * 1000)
+
+    def assemble(self, visited: List[str], style: GlobeStyle) -> bytes:
+        builder = GlbBuilder(generator='galligo globe share service')
+        visited_set = set(visited)
+        visited_mat = builder.add_material('MAT_VisitedCountry', style.visited_color, doubleSided=True)
+        unvisited_mat = None
+        if style.include_unvisited:
+            unvisited_mat = builder.add_material('MAT_UnvisitedCountry', style.unvisited_color, doubleSided=True)
+
+        children: List[int] = []
+        for iso, country in self.countries.items():
+            is_visited = iso in visited_set
+            if not is_visited and unvisited_mat is None:
+                continue
+            if is_visited and style.extrude > 0:
+                # Not cached: heights come from clients, and extruding is cheap next to GLB assembly.
+                positions, normals, indices = country.extruded(style.extrude)
+            else:
+                positions, normals, indices = country.positions, country.normals, country.indices
+            primitive = builder.add_primitive(
+                positions,
+                indices,
+                normals=normals if style.normals else None,
+                material=visited_mat if is_visited else unvisited_mat,
+            )
+            mesh = builder.add_mesh(f'Mesh_{iso}', [primitive])
+            children.append(builder.add_node(
+                f'GEO-{iso}',
+                mesh=mesh,
+                root=False,
+                extras={'country_code': iso, 'country_name': country.name, 'visited': is_visited},
+            ))
+
+        root_children = [builder.add_node('GLOBE_Countries', children=children, root=False)]
+        if style.include_ocean:
+            ocean_mat = builder.add_material('MAT_Ocean', style.ocean_color, doubleSided=True)
+            positions, indices = self.ocean
+            normals = positions / np.linalg.norm(positions, axis=1, keepdims=True)
+            primitive = builder.add_primitive(
+                positions, indices, normals=normals if style.normals else None, material=ocean_mat
+            )
+            root_children.append(builder.add_node('GLOBE_Ocean', mesh=builder.add_mesh('Mesh_Ocean', [primitive]),
+                                                  root=False))
+        builder.add_node('GLOBE_Root', children=root_children, extras={'visited': visited, 'style': asdict(style)})
+        return builder.to_bytes()
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            builds, shared, inflight = self.builds, self.shared, len(self.inflight)
+        return {
+            'countries': len(self.countries),
+            'data_hash': self.data_hash,
+            'builds': builds,
+            'shared': shared,
+            'inflight': inflight,
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats() if self.disk else None,
+        }
+
+
+# ----------------------------------------------------------------------
+# HTTP front end
+# ----------------------------------------------------------------------
+
+
+class ShareServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: PersonalGlobeService) -> None:
+        super().__init__(address, ShareRequestHandler)
+        self.service = service
+
+
+class ShareRequestHandler(BaseHTTPRequestHandler):
+    server: ShareServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == '/status':
+            self.send_json(200, self.server.service.status())
+        elif url.path == '/countries':
+            self.send_json(200, sorted(self.server.service.countries))
+        elif url.path == '/globe.glb':
+            query = parse_qs(url.query)
+            visited = ','.join(query.get('visited', [])).split(',')
+            self.send_globe(visited, query.get('style', [None])[0])
+        else:
+            self.send_json(404, {'error': f'Unknown path {url.path}'})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != '/globe.glb':
+            self.send_json(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError as exc:
+            self.send_json(400, {'error': f'Invalid JSON: {exc}'})
+            return
+        self.send_globe(request.get('visited') or [], request.get('style'))
+
+    def send_globe(self, visited: List[str], style: Any) -> None:
+        try:
+            if isinstance(style, str) and style.startswith('{'):
+                style = json.loads(style)
+            result = self.server.service.render(visited, style)
+        except ValueError as exc:
+            self.send_json(400, {'error': str(exc)})
+            return
+        except Exception as exc:
+            logging.exception('Render failed')
+            self.send_json(500, {'error': str(exc)})
+            return
+        etag = f'"{result.key}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'model/gltf-binary')
+        self.send_header('Content-Length', str(len(result.glb)))
+        # The key covers the mesh data hash, so a URL's bytes only change when its key does.
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.send_header('X-Globe-Cache', result.source)
+        self.send_header('X-Render-Ms', f'{result.elapsed_ms:.2f}')
+        self.end_headers()
+        self.wfile.write(result.glb)
+
+    def send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug('%s %s', self.address_string(), format % args)
+
+
+def build_service(args: argparse.Namespace) -> PersonalGlobeService:
+    return PersonalGlobeService(
+        mesh_data=args.mesh_data,
+        memory_bytes=args.memory_mb << 20,
+        disk_dir=None if args.no_disk_cache else args.disk_cache,
+        disk_bytes=args.disk_mb << 20,
+    )
+
+
+def serve(args: argparse.Namespace) -> None:
+    service = build_service(args)
+    with ShareServer((args.host, args.port), service) as server:
+        logging.info('Globe share service listening on http://%s:%d', args.host, server.server_address[1])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    logging.info('Globe share service stopped')
+
+
+def add_service_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        '--mesh-data',
+        type=Path,
+        default=MESH_DATA,
+        help='Pre-triangulated country meshes from build_globe_meshes.py (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--memory-mb',
+        type=int,
+        default=DEFAULT_MEMORY_MB,
+        help='In-memory LRU budget for rendered GLBs (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--disk-cache',
+        type=Path,
+        default=DEFAULT_DISK_CACHE,
+        help='On-disk GLB cache directory (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--disk-mb',
+        type=int,
+        default=DEFAULT_DISK_MB,
+        help='On-disk cache budget; least recently read files are removed first (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-disk-cache',
+        action='store_true',
+        help='Keep rendered GLBs in memory only.',
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Serve personalised globe GLBs assembled from cached country buffers.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='Run the HTTP service.')
+    add_service_arguments(serve_parser)
+    serve_parser.add_argument('--host', default=DEFAULT_HOST, help='Bind address (default: %(default)s)')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Bind port (default: %(default)s)')
+
+    render_parser = sub.add_parser('render', help='Write one personalised GLB without starting the service.')
+    add_service_arguments(render_parser)
+    render_parser.add_argument('visited', nargs='*', help='ISO3 codes of visited countries')
+    render_parser.add_argument(
+        '--style',
+        default='default',
+        help=f"Preset ({', '.join(STYLES)}) or a JSON object of style fields (default: %(default)s)",
+    )
+    render_parser.add_argument(
+        '--output',
+        '-o',
+        type=Path,
+        default=Path('globe_personal.glb'),
+        help='GLB path (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        service = build_service(args)
+        result = service.render(args.visited, json.loads(args.style) if args.style.startswith('{') else args.style)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_bytes(result.glb)
+        logging.info('Wrote %s (%.1f KB, %s in %.1f ms)', args.output, len(result.glb) / 1024, result.source,
+                     result.elapsed_ms)
@@ -0,0 +1,184 @@
+"""
+Benchmark the triangulation backends on the same cleaned country geometry.
+
+Countries are loaded and cleaned once (hole filtering and simplification as
+in build_globe_meshes.py); every backend then triangulates the identical
+rings. Per backend the report gives the best-of-N wall time, triangle count,
+the minimum angle of the projected triangles (median, 5th percentile and the
+share of slivers under SLIVER_DEGREES) and coverage, the triangulated
+lon/lat area over the polygon's area: below 1 means parts were lost, above
+1 means holes were dropped.
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from build_globe_meshes import (
+    DEFAULT_LAKES_SHP,
+    DEFAULT_SHAPEFILE,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_SNAPSHOT_DIR,
+    DIAGNOSTICS_DIR,
+    add_pipeline_input_arguments,
+    load_pipeline_inputs,
+    lonlat_to_xyz_array,
+    polygon_to_earcut_paths,
+    prepare_country_geometry,
+)
+from globe_triangulators import TRIANGULATORS, rings_polygon, signed_areas, triangulate_with_fallback
+
+DEFAULT_OUTPUT = DIAGNOSTICS_DIR / 'triangulation_benchmark.json'
+DEFAULT_REPEAT = 3
+SLIVER_DEGREES = 10.0
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+
+def min_angles_degrees(positions: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    corners = positions[triangles.astype(np.int64)]
+    angles = []
+    for k in range(3):
+        u = corners[:, (k + 1) % 3] - corners[:, k]
+        v = corners[:, (k + 2) % 3] - corners[:, k]
+        cos = np.einsum('ij,ij->i', u, v) / (np.linalg.norm(u, axis=1) * np.linalg.norm(v, axis=1) + 1e-300)
+        angles.append(np.degrees(np.arccos(np.clip(cos, -1.0, 1.0))))
+    return np.min(angles, axis=0)
+
+
+def benchmark_backend(name: str, polygons: Dict[str, List[List[np.ndarray]]], repeat: int) -> Dict[str, Any]:
+    backend = TRIANGULATORS[name]
+    seconds = 0.0
+    triangles = 0
+    min_angles: List[np.ndarray] = []
+    covered = expected = 0.0
+    slowest = ('', 0.0)
+    for iso, paths in polygons.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = [triangulate_with_fallback(rings, backend, label=iso) for rings in paths]
+            best = min(best, time.perf_counter() - started)
+        seconds += best
+        if best > slowest[1]:
+            slowest = (iso, best)
+        for rings, (vertices, tris) in zip(paths, results):
+            if not len(tris):
+                continue
+            triangles += len(tris)
+            min_angles.append(min_angles_degrees(lonlat_to_xyz_array(vertices), tris))
+            covered += float(np.abs(signed_areas(vertices, tris)).sum())
+            expected += rings_polygon(rings).area
+    angles = np.concatenate(min_angles) if min_angles else np.zeros(0)
+    return {
+        'backend': name,
+        'seconds': round(seconds, 4),
+        'slowest_country': slowest[0],
+        'slowest_seconds': round(slowest[1], 4),
+        'triangles': triangles,
+        'min_angle_median': round(float(np.median(angles)), 3) if len(angles) else None,
+        'min_angle_p5': round(float(np.percentile(angles, 5)), 3) if len(angles) else None,
+        'sliver_share': round(float((angles < SLIVER_DEGREES).mean()), 4) if len(angles) else None,
+        'coverage': round(covered / expected, 6) if expected else None,
+    }
+
+
+def run_benchmark(
+    backends: Sequence[str],
+    iso_filter: Sequence[str] = (),
+    simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+    shapefile: Path = DEFAULT_SHAPEFILE,
+    lakes_shapefile: Optional[Path] = DEFAULT_LAKES_SHP,
+    snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+    repeat: int = DEFAULT_REPEAT,
+    output_path: Optional[Path] = DEFAULT_OUTPUT,
+) -> List[Dict[str, Any]]:
+    inputs = load_pipeline_inputs(shapefile, lakes_shapefile, snapshot_dir=snapshot_dir, iso_filter=iso_filter or None)
+    wanted = {code.upper() for code in iso_filter}
+    polygons: Dict[str, List[List[np.ndarray]]] = {}
+    for _, row in inputs.geodataframe.iterrows():
+        iso = row[inputs.iso_col]
+        if wanted and iso not in wanted:
+            continue
+        geom, _ = prepare_country_geometry(
+            iso=iso,
+            geom=row.geometry,
+            centroid_lookup=inputs.centroid_lookup,
+            enclave_host_map=inputs.enclave_host_map,
+            simplify_tolerance=simplify_tolerance,
+            lakes_index=inputs.lakes_index,
+        )
+        polygons[iso] = [[path.exterior, *path.holes] for path in polygon_to_earcut_paths(geom)]
+    logging.info(
+        'Benchmarking %d backends on %d countries (%d polygons)',
+        len(backends),
+        len(polygons),
+        sum(len(paths) for paths in polygons.values()),
+    )
+
+    results = [benchmark_backend(name, polygons, repeat) for name in backends]
+    print(f"{'backend':<14}{'seconds':>10}{'slowest':>16}{'triangles':>12}{'min∠ med':>10}{'min∠ p5':>10}"
+          f"{'slivers':>10}{'coverage':>12}")
+    for item in results:
+        print(
+            f"{item['backend']:<14}{item['seconds']:>10.3f}"
+            f"{item['slowest_country'] + ' ' + format(item['slowest_seconds'], '.3f'):>16}"
+            f"{item['triangles']:>12,}{item['min_angle_median'] or 0:>10.2f}{item['min_angle_p5'] or 0:>10.2f}"
+            f"{item['sliver_share'] or 0:>10.2%}{item['coverage'] or 0:>12.6f}"
+        )
+    if output_path:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open('w') as f:
+            json.dump({'repeat': repeat, 'countries': len(polygons), 'results': results}, f, indent=2)
+        logging.info('Benchmark saved to %s', output_path)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare triangulation backends on the cleaned country geometry.')
+    add_pipeline_input_arguments(parser, enclaves=False, chord_tolerance=False)
+    parser.add_argument(
+        '--backend',
+        nargs='*',
+        choices=list(TRIANGULATORS),
+        default=list(TRIANGULATORS),
+        help='Backends to compare (default: all)',
+    )
+    parser.add_argument(
+        '--iso',
+        nargs='*',
+        default=[],
+        help='Optional ISO codes to limit the benchmark',
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=DEFAULT_REPEAT,
+        help='Runs per country and backend; the fastest is kept (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help='JSON results (default: %(default)s)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    run_benchmark(
+        backends=args.backend,
+        iso_filter=args.iso,
+        simplify_tolerance=args.simplify_tolerance,
+        shapefile=args.shapefile,
+        lakes_shapefile=args.lakes_shapefile,
+        snapshot_dir=None if args.no_snapshot else args.snapshot_dir,
+        repeat=args.repeat,
+        output_path=args.output,
+    )
@@ -0,0 +1,190 @@
+"""
+Pluggable polygon triangulators for the globe mesh pipeline.
+
+Every backend takes one polygon as lon/lat rings (exterior counter-clockwise
+first, then holes, no closing vertex) and returns (vertices, triangles): an
+(N, 2) float64 lon/lat array and (M, 3) uint32 indices wound
+counter-clockwise in lon/lat, the contract mapbox_earcut already has.
+
+  earcut       mapbox_earcut. Fastest on ordinary outlines, but hole
+               elimination makes it superlinear in rings x vertices, and it
+               favours slivers.
+  cdt          GEOS constrained Delaunay (shapely). Holes are constraints, so
+               they cannot be dropped, and triangles maximise their minimum
+               angle. No Steiner points are added, so vertices are the ring
+               vertices as with earcut.
+  partitioned  Polygons above PARTITION_VERTEX_THRESHOLD vertices are clipped
+               into a lon/lat grid, cells are triangulated concurrently with
+               a cell backend and seam vertices are merged, so shared cut
+               edges keep shared indices and tessellation stays watertight.
+
+'auto' is earcut, switching to partitioned for huge polygons. Whatever the
+backend, a polygon that fails is retried with cdt before holes are ever
+dropped.
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from mapbox_earcut import triangulate_float64 as earcut
+from shapely.geometry import Polygon
+from shapely.geometry.polygon import orient
+
+from globe_geodesy import iter_polygons
+
+MIN_RING_LEN = 3
+PARTITION_VERTEX_THRESHOLD = 20000
+PARTITION_CELL_DEGREES = 10.0
+PARTITION_WORKERS = 4
+SEAM_DECIMALS = 9  # cut vertices computed in neighbouring cells agree far below this
+
+Rings = Sequence[np.ndarray]
+Triangulation = Tuple[np.ndarray, np.ndarray]
+Triangulator = Callable[[Rings], Triangulation]
+
+
+def empty_triangulation() -> Triangulation:
+    return np.zeros((0, 2), dtype=np.float64), np.zeros((0, 3), dtype=np.uint32)
+
+
+def flatten_rings(rings: Rings) -> Tuple[np.ndarray, np.ndarray]:
+    """Stacked vertices and cumulative ring ends in mapbox_earcut's layout."""
+    arrays = [np.asarray(ring, dtype=np.float64).reshape(-1, 2) for ring in rings if len(ring) >= MIN_RING_LEN]
+    if not arrays:
+        return np.zeros((0, 2), dtype=np.float64), np.zeros(0, dtype=np.uint32)
+    ring_ends = np.cumsum([len(ring) for ring in arrays]).astype(np.uint32)
+    return np.concatenate(arrays), ring_ends
+
+
+def polygon_rings(poly: Polygon) -> List[np.ndarray]:
+    """Exterior CCW then holes, without closing vertices; degenerate holes dropped."""
+    oriented = orient(poly, sign=1.0)
+    rings = [np.asarray(oriented.exterior.coords, dtype=np.float64)[:-1]]
+    for interior in oriented.interiors:
+        ring = np.asarray(interior.coords, dtype=np.float64)[:-1]
+        if len(ring) >= MIN_RING_LEN:
+            rings.append(ring)
+    return rings
+
+
+def rings_polygon(rings: Rings) -> Polygon:
+    return Polygon(rings[0], [ring for ring in rings[1:] if len(ring) >= MIN_RING_LEN])
+
+
+def signed_areas(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    a, b, c = vertices[triangles[:, 0]], vertices[triangles[:, 1]], vertices[triangles[:, 2]]
+    return ((b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0]) / 2
+
+
+def earcut_triangulate(rings: Rings) -> Triangulation:
+    vertices, ring_ends = flatten_rings(rings)
+    if not len(vertices):
+        return empty_triangulation()
+    return vertices, np.asarray(earcut(vertices, ring_ends), dtype=np.uint32).reshape(-1, 3)
+
+
+def cdt_triangulate(rings: Rings) -> Triangulation:
+    poly = rings_polygon(rings)
+    if poly.is_empty:
+        return empty_triangulation()
+    triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(poly))
+    if not len(triangles):
+        return empty_triangulation()
+    corners = shapely.get_coordinates(shapely.get_exterior_ring(triangles)).reshape(-1, 4, 2)[:, :3]
+    vertices, inverse = np.unique(corners.reshape(-1, 2), axis=0, return_inverse=True)
+    indices = inverse.reshape(-1, 3).astype(np.uint32)
+    # GEOS winds its triangles clockwise; flip to match earcut.
+    areas = signed_areas(vertices, indices)
+    indices[areas < 0] = indices[areas < 0][:, ::-1]
+    return vertices, indices[areas != 0]
+
+
+def merge_triangulations(parts: Sequence[Triangulation]) -> Triangulation:
+    """Concatenate cell triangulations, welding vertices that coincide on cell seams."""
+    parts = [part for part in parts if len(part[1])]
+    if not parts:
+        return empty_triangulation()
+    offsets = np.cumsum([0] + [len(vertices) for vertices, _ in parts[:-1]])
+    vertices = np.concatenate([vertices for vertices, _ in parts])
+    indices = np.concatenate([tris.astype(np.int64) + offset for (_, tris), offset in zip(parts, offsets)])
+    welded, first, inverse = np.unique(
+        np.round(vertices, SEAM_DECIMALS), axis=0, return_index=True, return_inverse=True
+    )
+    indices = inverse.reshape(-1)[indices]
+    keep = (indices[:, 0] != indices[:, 1]) & (indices[:, 1] != indices[:, 2]) & (indices[:, 0] != indices[:, 2])
+    return vertices[first], indices[keep].astype(np.uint32)
+
+
+def partition_cells(bounds: Tuple[float, float, float, float], cell_degrees: float) -> np.ndarray:
+    minx, miny, maxx, maxy = bounds
+    xs = np.arange(math.floor(minx / cell_degrees) * cell_degrees, maxx, cell_degrees)
+    ys = np.arange(math.floor(miny / cell_degrees) * cell_degrees, maxy, cell_degrees)
+    gx, gy = np.meshgrid(xs, ys)
+    return shapely.box(gx.ravel(), gy.ravel(), gx.ravel() + cell_degrees, gy.ravel() + cell_degrees)
+
+
+def partitioned_triangulate(
+    rings: Rings,
+    cell_triangulator: Optional[Triangulator] = None,
+    vertex_threshold: int = PARTITION_VERTEX_THRESHOLD,
+    cell_degrees: float = PARTITION_CELL_DEGREES,
+    workers: int = PARTITION_WORKERS,
+) -> Triangulation:
+    cell_triangulator = cell_triangulator or earcut_triangulate
+    if sum(len(ring) for ring in rings) <= vertex_threshold:
+        return triangulate_with_fallback(rings, cell_triangulator)
+    poly = rings_polygon(rings)
+    pieces = shapely.intersection(poly, partition_cells(poly.bounds, cell_degrees))
+    cell_rings = [
+        polygon_rings(part)
+        for piece in pieces if not piece.is_empty
+        for part in iter_polygons(piece) if part.area > 0
+    ]
+    # GEOS calls in cdt release the GIL, so threads are enough for the cells to overlap.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        parts = list(pool.map(lambda item: triangulate_with_fallback(item, cell_triangulator), cell_rings))
+    return merge_triangulations(parts)
+
+
+TRIANGULATORS: Dict[str, Triangulator] = {
+    'earcut': earcut_triangulate,
+    'cdt': cdt_triangulate,
+    'partitioned': partitioned_triangulate,
+}
+
+
+def resolve_triangulator(name: str, rings: Rings) -> Triangulator:
+    if name == 'auto':
+        huge = sum(len(ring) for ring in rings) > PARTITION_VERTEX_THRESHOLD
+        return partitioned_triangulate if huge else earcut_triangulate
+    try:
+        return TRIANGULATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown triangulator {name}; expected auto or one of {', '.join(TRIANGULATORS)}")
+
+
+def triangulate_with_fallback(
+    rings: Rings,
+    triangulator: Triangulator,
+    label: Optional[str] = None,
+) -> Triangulation:
+    """Run triangulator, then cdt, and only drop the holes when both fail."""
+    try:
+        return triangulator(rings)
+    except Exception:
+        if triangulator is not cdt_triangulate:
+            logging.warning('%s failed for %s; retrying with constrained Delaunay',
+                            getattr(triangulator, '__name__', 'triangulator'), label or 'polygon')
+            try:
+                return cdt_triangulate(rings)
+            except Exception:
+                pass
+        if len(rings) > 1:
+            logging.warning('Triangulation failed for %s with holes; retrying without %d holes',
+                            label or 'polygon', len(rings) - 1)
+            return earcut_triangulate(rings[:1])
+        raise
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import Polygon, box
+
+# The pipeline modules are flat scripts that import each other by name.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def write_countries():
+    """Writes (iso, geometry) rows as a countries shapefile and returns its path."""
+
+    def write(path: Path, rows) -> Path:
+        gdf = gpd.GeoDataFrame(
+            {'ISO_A3': [iso for iso, _ in rows], 'ADMIN': [iso for iso, _ in rows]},
+            geometry=[geom for _, geom in rows],
+            crs='EPSG:4326',
+        )
+        gdf.to_file(path)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def countries_shapefile(tmp_path, write_countries):
+    """Three neighbouring boxes and an enclave."""
+    enclave = box(2, 2, 3, 3)
+    rows = [
+        ('AAA', Polygon(box(0, 0, 5, 5).exterior, [enclave.exterior.coords])),
+        ('BBB', box(5, 0, 10, 5)),
+        ('CCC', box(0, 5, 10, 8)),
+        ('DDD', enclave),
+    ]
+    return write_countries(tmp_path / 'countries.shp', rows)
@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+from shapely.geometry import Polygon, box
+
+from globe_geodesy import EARTH_RADIUS_KM, geodesic_measures, ring_areas_km2
+
+SPHERE_KM2 = 4 * math.pi * EARTH_RADIUS_KM ** 2
+
+
+def test_octant_is_an_eighth_of_the_sphere():
+    area = ring_areas_km2([[(0, 0), (90, 0), (0, 90)]])[0]
+    assert area == pytest.approx(SPHERE_KM2 / 8, rel=1e-9)
+
+
+def test_lat_lon_box_matches_the_zone_formula():
+    lat0, lat1 = 10.0, 20.0
+    expected = EARTH_RADIUS_KM ** 2 * math.radians(15) * (math.sin(math.radians(lat1)) - math.sin(math.radians(lat0)))
+    # Box edges are great circles, not parallels, so allow for the sag of the long sides.
+    assert ring_areas_km2([box(0, lat0, 15, lat1).exterior.coords])[0] == pytest.approx(expected, rel=5e-3)
+
+
+def test_ring_around_the_pole_measures_the_cap():
+    lons = np.arange(-180, 180, 1.0)
+    ring = np.column_stack([lons, np.full_like(lons, 60.0)])
+    cap = 2 * math.pi * EARTH_RADIUS_KM ** 2 * (1 - math.sin(math.radians(60)))
+    assert ring_areas_km2([ring])[0] == pytest.approx(cap, rel=1e-3)
+
+
+def test_antimeridian_box_equals_the_same_box_elsewhere():
+    crossing = [(179, -10), (-179, -10), (-179, 10), (179, 10)]
+    shifted = [(0, -10), (2, -10), (2, 10), (0, 10)]
+    assert ring_areas_km2([crossing])[0] == pytest.approx(ring_areas_km2([shifted])[0], rel=1e-9)
+
+
+def test_holes_are_subtracted_and_counted_in_the_perimeter():
+    shell, hole = box(0, 0, 4, 4), box(1, 1, 2, 2)
+    (area,), (perimeter,) = geodesic_measures([Polygon(shell.exterior, [hole.exterior])])
+    (shell_area, hole_area), (shell_perimeter, hole_perimeter) = geodesic_measures([shell, hole])
+    assert area == pytest.approx(shell_area - hole_area)
+    assert perimeter == pytest.approx(shell_perimeter + hole_perimeter)
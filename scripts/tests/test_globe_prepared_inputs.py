@@ -0,0 +1,65 @@
+import pytest
+from shapely.geometry import box
+
+import build_globe_meshes
+from build_globe_meshes import shapefile_fingerprint
+
+
+def count_shapefile_reads(monkeypatch):
+    reads = []
+    original = build_globe_meshes.load_shapefile
+
+    def counting(*args, **kwargs):
+        reads.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(build_globe_meshes, 'load_shapefile', counting)
+    return reads
+
+
+def test_snapshot_is_reused_until_the_shapefile_changes(countries_shapefile, write_countries, tmp_path, monkeypatch):
+    pytest.importorskip('pyarrow')  # snapshots are skipped without it
+    reads = count_shapefile_reads(monkeypatch)
+    snapshot_dir = tmp_path / 'snapshots'
+
+    gdf, iso_col, _ = build_globe_meshes.load_prepared_countries(countries_shapefile, snapshot_dir)
+    assert len(reads) == 1
+    assert sorted(gdf[iso_col]) == ['AAA', 'BBB', 'CCC', 'DDD']
+
+    cached, _, centroids = build_globe_meshes.load_prepared_countries(countries_shapefile, snapshot_dir)
+    assert len(reads) == 1
+    assert sorted(cached[iso_col]) == sorted(gdf[iso_col])
+    assert set(centroids) == set(gdf[iso_col])
+
+    write_countries(countries_shapefile, [('AAA', box(0, 0, 5, 5)), ('EEE', box(20, 20, 25, 25))])
+    rebuilt, _, _ = build_globe_meshes.load_prepared_countries(countries_shapefile, snapshot_dir)
+    assert len(reads) == 2
+    assert sorted(rebuilt[iso_col]) == ['AAA', 'EEE']
+
+
+def test_fingerprint_covers_every_sidecar_and_the_snapshot_version(countries_shapefile, monkeypatch):
+    before = shapefile_fingerprint(countries_shapefile)
+    assert {'countries.shp', 'countries.dbf', 'countries.shx'} <= set(before)
+
+    dbf = countries_shapefile.with_suffix('.dbf')
+    dbf.write_bytes(dbf.read_bytes() + b' ')
+    after = shapefile_fingerprint(countries_shapefile)
+    assert after['countries.dbf'] != before['countries.dbf']
+    assert after['countries.shp'] == before['countries.shp']
+
+    monkeypatch.setattr(build_globe_meshes, 'SNAPSHOT_VERSION', build_globe_meshes.SNAPSHOT_VERSION + 1)
+    assert shapefile_fingerprint(countries_shapefile) != after
+
+
+def test_subset_reads_filter_the_snapshot_to_enclave_partners(countries_shapefile, tmp_path):
+    pytest.importorskip('pyarrow')
+    snapshot_dir = tmp_path / 'snapshots'
+    build_globe_meshes.load_prepared_countries(countries_shapefile, snapshot_dir)
+    subset, iso_col, _ = build_globe_meshes.load_prepared_countries(countries_shapefile, snapshot_dir, iso_filter=['DDD'])
+    assert sorted(subset[iso_col]) == ['AAA', 'DDD']
+
+
+def test_subset_reads_without_a_snapshot_pick_up_the_host(countries_shapefile):
+    subset, iso_col, centroids = build_globe_meshes.load_prepared_countries(countries_shapefile, None, iso_filter=['DDD'])
+    assert sorted(subset[iso_col]) == ['AAA', 'DDD']
+    assert set(centroids) == {'AAA', 'DDD'}
@@ -0,0 +1,101 @@
+import hashlib
+import json
+
+import pytest
+
+import build_globe_meshes
+from build_globe_meshes import merge_mesh_shards, parse_shard, shard_of
+
+
+def test_shard_of_is_stable_and_in_range():
+    for iso in ('AAA', 'BRA', 'USA', 'ZAF'):
+        expected = int(hashlib.sha256(iso.encode()).hexdigest()[:8], 16) % 4
+        assert shard_of(iso, 4) == expected
+        assert shard_of(iso, 1) == 0
+
+
+@pytest.mark.parametrize('value', ['2/2', '-1/3', '1/0', 'x/2', '3'])
+def test_parse_shard_rejects_bad_values(value):
+    import argparse
+
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def make_partials(isos, count):
+    partials = []
+    for index in range(count):
+        assigned = [iso for iso in isos if shard_of(iso, count) == index]
+        partials.append({
+            'shard': {'index': index, 'count': count},
+            'dataset': {'countries.shp': 'abc'},
+            'params': {'simplify_tolerance': 0.01},
+            'assigned': assigned,
+            'order': {iso: isos.index(iso) for iso in assigned},
+            'countries': {iso: {'name': iso, 'verts': [], 'faces': []} for iso in assigned},
+            'skipped': [],
+            'diagnostics': [{'iso': iso} for iso in assigned],
+        })
+    return partials
+
+
+def write_partials(tmp_path, partials):
+    paths = []
+    for partial in partials:
+        path = tmp_path / f"part-{partial['shard']['index']}.json"
+        path.write_text(json.dumps(partial))
+        paths.append(path)
+    return paths
+
+
+ISOS = ['ZAF', 'LSO', 'ITA', 'SMR', 'AAA', 'BBB', 'CCC', 'RUS']
+
+
+def test_merge_restores_row_order(tmp_path):
+    paths = write_partials(tmp_path, make_partials(ISOS, 3))
+    merged = merge_mesh_shards(paths[::-1], output_path=tmp_path / 'out.json', diagnostics_dir=tmp_path)
+    assert list(merged) == ISOS
+    assert list(json.loads((tmp_path / 'out.json').read_text())) == ISOS
+    report = json.loads((tmp_path / build_globe_meshes.DIAGNOSTICS_FILENAME).read_text())
+    assert [diag['iso'] for diag in report] == ISOS
+
+
+def test_merge_refuses_a_missing_shard(tmp_path):
+    paths = write_partials(tmp_path, make_partials(ISOS, 3))
+    with pytest.raises(ValueError):
+        merge_mesh_shards(paths[:2], output_path=tmp_path / 'out.json', diagnostics_dir=tmp_path)
+    assert not (tmp_path / 'out.json').exists()
+
+
+def test_merge_refuses_mismatched_params(tmp_path):
+    partials = make_partials(ISOS, 2)
+    partials[1]['params'] = {'simplify_tolerance': 0.05}
+    with pytest.raises(ValueError):
+        merge_mesh_shards(write_partials(tmp_path, partials), output_path=tmp_path / 'out.json')
+
+
+def test_enclave_config_digest_follows_the_pairs_not_the_formatting(tmp_path):
+    config = tmp_path / 'enclaves.json'
+    config.write_text('[["smr", "ita"], ["VAT", "ITA"]]')
+    digest = build_globe_meshes.enclave_config_digest(config)
+    config.write_text('[\n  ["VAT", "ITA"],\n  ["SMR", "ITA"]\n]')
+    assert build_globe_meshes.enclave_config_digest(config) == digest
+    config.write_text('[["VAT", "ITA"]]')
+    assert build_globe_meshes.enclave_config_digest(config) != digest
+    assert build_globe_meshes.enclave_config_digest(None) is None
+
+
+def test_merge_refuses_a_country_built_by_the_wrong_shard(tmp_path):
+    partials = make_partials(ISOS, 2)
+    moved = partials[0]['assigned'][0]
+    partials[1]['assigned'].append(moved)
+    partials[1]['countries'][moved] = partials[0]['countries'][moved]
+    with pytest.raises(ValueError):
+        merge_mesh_shards(write_partials(tmp_path, partials), output_path=tmp_path / 'out.json')
+
+
+def test_merge_refuses_an_unreported_country(tmp_path):
+    partials = make_partials(ISOS, 2)
+    partials[0]['countries'].pop(partials[0]['assigned'][0])
+    with pytest.raises(ValueError):
+        merge_mesh_shards(write_partials(tmp_path, partials), output_path=tmp_path / 'out.json')